@@ -0,0 +1,99 @@
+"""Change generations shared by every worker process.
+
+    python -m backend.app.coherence bump KEY...
+
+Keys are "<kind>:<absolute path>", e.g. catalog:/srv/data/imdb_reviews; bump
+one after editing its files by hand so every worker re-reads them at once.
+
+A small file of 64-bit counters is mapped into each process. A writer
+holds an fcntl lock on the key it changes while it writes, and bumps the
+key's counter before releasing it. Readers compare the counter with the
+one they saw when they last validated their copy. That is a memory read
+instead of a stat() or a re-read. Keys are hashed onto a fixed number of
+slots, so unrelated keys can share a counter; that only costs an extra
+revalidation. The file must not be deleted while workers are running.
+"""
+import fcntl, mmap, os, struct, sys, threading, zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+GENERATIONS_FILE = os.getenv(
+    "GENERATIONS_FILE", os.path.join(os.path.dirname(__file__), "..", "data", ".generations")
+)
+GENERATION_SLOTS = 4096
+
+_SLOT = struct.Struct("=Q")
+
+
+class Generations:
+    def __init__(self, path: str, slots: int = GENERATION_SLOTS):
+        self.path = path
+        self.slots = slots
+        self.bumps = 0
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._open_lock = threading.Lock()
+        # fcntl locks are per process, so threads of one process also need these
+        self._slot_locks: Dict[int, threading.Lock] = {}
+
+    def _get_map(self) -> mmap.mmap:
+        if self._map is None:
+            with self._open_lock:
+                if self._map is None:
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                    size = self.slots * _SLOT.size
+                    if os.fstat(fd).st_size < size:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                        try:
+                            # Growing a file never clears counters another process already wrote
+                            if os.fstat(fd).st_size < size:
+                                os.ftruncate(fd, size)
+                        finally:
+                            fcntl.flock(fd, fcntl.LOCK_UN)
+                    self._fd = fd
+                    self._map = mmap.mmap(fd, size)
+        return self._map
+
+    def _slot(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % self.slots
+
+    def current(self, key: str) -> int:
+        """The key's generation; changes whenever the data behind it was written"""
+        return _SLOT.unpack_from(self._get_map(), self._slot(key) * _SLOT.size)[0]
+
+    @contextmanager
+    def writing(self, key: str) -> Iterator[None]:
+        """Hold the key's write lock across threads and processes; bumps its generation on exit"""
+        data = self._get_map()
+        slot = self._slot(key)
+        offset = slot * _SLOT.size
+        with self._open_lock:
+            lock = self._slot_locks.setdefault(slot, threading.Lock())
+        with lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, _SLOT.size, offset)
+            try:
+                yield
+            finally:
+                # Bumped even if the write failed part-way: readers must revalidate either way
+                _SLOT.pack_into(data, offset, _SLOT.unpack_from(data, offset)[0] + 1)
+                self.bumps += 1
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, _SLOT.size, offset)
+
+    def bump(self, key: str) -> int:
+        """Mark the key as changed; returns its new generation"""
+        with self.writing(key):
+            pass
+        return self.current(key)
+
+    def stats(self) -> dict:
+        return {"path": os.path.abspath(self.path), "slots": self.slots, "bumps": self.bumps}
+
+
+generations = Generations(GENERATIONS_FILE)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "bump":
+        sys.exit(__doc__.strip().splitlines()[0].strip())
+    for key in sys.argv[2:]:
+        print(key, generations.bump(key))
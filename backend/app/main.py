@@ -1,12 +1,51 @@
 from dotenv import load_dotenv
 load_dotenv()
-from fastapi import FastAPI
+import asyncio, contextlib, time
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from backend.app import metrics
+from backend.app.coherence import generations
+from backend.app.ratelimit import admission
 from backend.authentication import router as authentication_router
+from backend.authentication import security
+from backend.authentication import utils as auth_utils
+from backend.authentication.schemas import TokenData, UserRole
+from backend.authentication.migrate import migrate_refresh_tokens
+from backend.authentication.token_store import prune_periodically
+from backend.dashboard.counters import counters
 from backend.dashboard import router as dashboard_router
 from backend.movies import router as movie_router
+from backend.movies import utils as movie_utils
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+startup: dict = {}  # how long the catalog took to load, and whether a snapshot was used
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the movie catalog once so the first request doesn't pay for it
+    started = time.perf_counter()
+    snapshot = movie_utils.load_snapshot()
+    movie_utils.catalog.refresh(force=True)
+    startup.update(seconds=round(time.perf_counter() - started, 4), snapshot=snapshot is not None)
+    # Refresh tokens still listed on user records keep working without running the migrate CLI
+    migrate_refresh_tokens(auth_utils.get_user_repository(), auth_utils.get_token_store())
+    counters.seed(auth_utils.get_user_repository(), auth_utils.get_token_store())
+    pruner = asyncio.create_task(
+        prune_periodically(auth_utils.get_token_store(), on_pruned=counters.sessions_ended)
+    )
+    if metrics.PROFILE_SLOW_REQUESTS_MS > 0:
+        metrics.enable_profiler(metrics.PROFILE_SLOW_REQUESTS_MS)
+    yield
+    metrics.disable_profiler()
+    pruner.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await pruner
+    movie_utils.review_writer.stop()
+    movie_utils.data_io.shutdown()
+    security.password_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(authentication_router.router)
 app.include_router(dashboard_router.router)
 app.include_router(movie_router.router)
@@ -18,7 +57,68 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.TimingMiddleware)
 
 @app.get('/')
 async def read_root():
-    return { "message": "Backed is up"}
\ No newline at end of file
+    return { "message": "Backed is up"}
+
+def collect_stats() -> dict:
+    return {
+        "startup": startup,
+        "movie_catalog": movie_utils.catalog.stats(),
+        "snapshot": movie_utils.review_store.snapshot.stats() if movie_utils.review_store.snapshot else None,
+        "reviews": movie_utils.review_store.stats(),
+        "review_writer": movie_utils.review_writer.stats(),
+        "responses": movie_utils.response_cache.stats(),
+        "data_io": movie_utils.data_io.stats(),
+        "generations": generations.stats(),
+        "user_reviews": movie_utils.user_reviews.stats(),
+        "similar_movies": movie_utils.similar_movies.stats(),
+        "admission": admission.stats(),
+        "password_pool": security.password_pool.stats(),
+        "token_cache": security.token_cache.stats(),
+        "refresh_tokens": auth_utils.get_token_store().stats(),
+        "access_revocations": auth_utils.get_access_revocations().stats(),
+    }
+
+async def metrics_reader(request: Request) -> None:
+    """Admin only, unless METRICS_PUBLIC is set"""
+    if metrics.METRICS_PUBLIC:
+        return
+    current_user = await security.get_current_user(await security.security_scheme(request))
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can read metrics.")
+
+@app.get('/stats', dependencies=[Depends(metrics_reader)])
+async def read_stats():
+    """In-process cache counters, for checking the caches under load"""
+    return collect_stats()
+
+@app.get('/metrics', response_class=PlainTextResponse, dependencies=[Depends(metrics_reader)])
+async def read_metrics():
+    """Prometheus scrape endpoint"""
+    return metrics.metrics.render(collect_stats())
+
+@app.get('/metrics/slow')
+async def read_slow_requests(current_user: TokenData = Depends(security.get_current_user)):
+    """Stack samples of recent slow requests (collapsed, flame graph ready)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can read profiles.")
+    profiler = metrics.profiler
+    return {"enabled": profiler is not None, "requests": list(profiler.slow) if profiler else []}
+
+@app.post('/metrics/profiler')
+async def toggle_profiler(
+    enabled: bool,
+    threshold_ms: float = 500,
+    current_user: TokenData = Depends(security.get_current_user),
+):
+    """Turn the slow-request sampling profiler on or off at runtime"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can toggle the profiler.")
+    if enabled:
+        metrics.enable_profiler(threshold_ms)
+    else:
+        metrics.disable_profiler()
+    return {"enabled": enabled, "threshold_ms": threshold_ms if enabled else None}
@@ -0,0 +1,237 @@
+"""Request latency histograms, data-layer spans and a slow-request profiler.
+
+Everything is kept in process memory and rendered in the Prometheus text
+format by GET /metrics, which (like GET /stats) needs an admin token unless
+METRICS_PUBLIC=1 opts in to serving it without one. The profiler is off unless PROFILE_SLOW_REQUESTS_MS
+is set (or enable_profiler() is called): it then samples every thread's
+stack and keeps the samples that overlap requests slower than the threshold.
+"""
+import bisect, functools, os, sys, threading, time
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILE_SLOW_REQUESTS_MS = float(os.getenv("PROFILE_SLOW_REQUESTS_MS", "0"))  # 0 = profiler off
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_KEEP = 20  # slow requests whose profiles are kept
+# Serve /metrics and /stats without authentication (e.g. to a scraper on a private network)
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "0") == "1"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+class Metrics:
+    """Per-route/status request histograms and per-span call counts and time"""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], Histogram] = {}
+        self.spans: Dict[str, List[float]] = {}  # name -> [calls, seconds, errors]
+        self._lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        with self._lock:
+            hist = self.requests.get(key)
+            if hist is None:
+                hist = self.requests[key] = Histogram()
+            hist.observe(seconds)
+
+    def observe_span(self, name: str, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                span = self.spans[name] = [0, 0.0, 0]
+            span[0] += 1
+            span[1] += seconds
+            span[2] += failed
+
+    def render(self, gauges: Optional[Dict[str, dict]] = None) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            requests = {k: (list(h.counts), h.count, h.total) for k, h in self.requests.items()}
+            spans = {k: list(v) for k, v in self.spans.items()}
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route and status.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), (counts, count, total) in sorted(requests.items()):
+            labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {count}")
+
+        for metric, kind, index, help_text in (
+            ("span_calls_total", "counter", 0, "Calls of instrumented data-layer functions."),
+            ("span_seconds_total", "counter", 1, "Time spent in instrumented data-layer functions."),
+            ("span_errors_total", "counter", 2, "Calls that raised."),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, values in sorted(spans.items()):
+                value = f"{values[index]:.6f}" if index == 1 else str(int(values[index]))
+                lines.append(f'{metric}{{span="{_escape(name)}"}} {value}')
+
+        if gauges:
+            lines.append("# HELP app_stat In-process cache and pool counters (same as GET /stats).")
+            lines.append("# TYPE app_stat gauge")
+            for component, stats in sorted(gauges.items()):
+                for name, value in sorted((stats or {}).items()):
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        lines.append(f'app_stat{{component="{component}",name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+def timed(name: str) -> Callable:
+    """Decorator recording calls and time of a function as span `name`"""
+
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                metrics.observe_span(name, time.perf_counter() - start, failed)
+
+        return wrapper
+
+    return decorate
+
+
+class SlowRequestProfiler:
+    """Stack sampler that keeps the samples taken during slow requests.
+
+    While running, a background thread records the stack of every thread
+    every `interval_ms`, keeping only stacks that pass through this
+    package's code. When a request takes longer than `threshold_ms`, the
+    samples from its time window are folded into collapsed stacks
+    ("outer;inner count", as used by flame graph tools) and kept.
+    """
+
+    def __init__(self, threshold_ms: float, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.samples: Deque[Tuple[float, str]] = deque(maxlen=100_000)
+        self.slow: Deque[dict] = deque(maxlen=PROFILE_KEEP)
+        self._root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack, ours = [], False
+                while frame is not None and len(stack) < 64:
+                    code = frame.f_code
+                    ours = ours or code.co_filename.startswith(self._root)
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if ours:
+                    self.samples.append((now, ";".join(reversed(stack))))
+
+    def request_finished(self, route: str, start: float, end: float) -> None:
+        if end - start < self.threshold:
+            return
+        stacks = Counter(stack for t, stack in list(self.samples) if start <= t <= end)
+        self.slow.append({
+            "route": route,
+            "ms": round((end - start) * 1000, 2),
+            "at": time.time(),
+            "samples": sum(stacks.values()),
+            "stacks": [f"{stack} {n}" for stack, n in stacks.most_common(50)],
+        })
+
+
+profiler: Optional[SlowRequestProfiler] = None
+
+
+def enable_profiler(threshold_ms: float, interval_ms: float = PROFILE_INTERVAL_MS) -> SlowRequestProfiler:
+    global profiler
+    disable_profiler()
+    profiler = SlowRequestProfiler(threshold_ms, interval_ms)
+    profiler.start()
+    return profiler
+
+
+def disable_profiler() -> None:
+    global profiler
+    if profiler is not None:
+        profiler.stop()
+        profiler = None
+
+
+class TimingMiddleware:
+    """ASGI middleware observing each HTTP request's latency.
+
+    Requests are labelled with the matched route's path template (not the
+    raw path), so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end = time.perf_counter()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            metrics.observe_request(scope["method"], route, status, end - start)
+            if profiler is not None:
+                profiler.request_finished(f'{scope["method"]} {route}', start, end)
@@ -0,0 +1,181 @@
+"""Admission control for the CPU-heavy auth routes and review writes.
+
+Each limited route has token-bucket budgets per client IP and, where the
+route knows it, per user. A request that finds its bucket empty gets 429
+with Retry-After. On top of that, at most EXPENSIVE_CONCURRENCY limited
+requests run at once across all of those routes; the rest get 503. A burst
+of login attempts therefore can't take the whole API down with it, read-only
+routes included.
+
+Login's per-user budget is keyed on (username, client IP), not the
+username alone: otherwise anyone could lock a user out by failing logins
+under their name. The trade-off is that a guesser spread over many IPs
+gets the per-user budget once per IP, each bounded by that IP's own login
+budget.
+
+Buckets live in one LRU table of at most RATE_LIMIT_KEYS entries per
+process. An evicted key simply starts again with a full bucket.
+"""
+import math, os, threading, time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+RATE_LIMIT_KEYS = int(os.getenv("RATE_LIMIT_KEYS", "100000"))
+EXPENSIVE_CONCURRENCY = int(os.getenv("EXPENSIVE_CONCURRENCY", "64"))
+# Use the first X-Forwarded-For address as the client IP (only behind a trusted proxy)
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "0") == "1"
+
+
+def _budget(route: str, kind: str, default: str) -> Tuple[float, float]:
+    # "<requests per minute>/<burst>", e.g. RATE_LIMIT_LOGIN_IP=30/10
+    per_minute, burst = os.getenv(f"RATE_LIMIT_{route.upper()}_{kind.upper()}", default).split("/")
+    return float(per_minute) / 60, float(burst)
+
+
+# route -> key kind ("ip" or "user") -> (tokens per second, bucket size)
+RATE_LIMITS: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "login": {"ip": _budget("login", "ip", "30/10"), "user": _budget("login", "user", "10/5")},
+    "register": {"ip": _budget("register", "ip", "10/5")},
+    "refresh": {"ip": _budget("refresh", "ip", "60/20")},
+    "review_write": {"ip": _budget("review_write", "ip", "120/30"), "user": _budget("review_write", "user", "60/20")},
+}
+
+
+class TokenBuckets:
+    """Token buckets by key in a bounded LRU table"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_KEYS):
+        self.max_keys = max_keys
+        self.evictions = 0
+        self._buckets: "OrderedDict[Tuple[str, str, str], List[float]]" = OrderedDict()  # key -> [tokens, at]
+        self._lock = threading.Lock()
+
+    def take(self, key: Tuple[str, str, str], rate: float, burst: float) -> float:
+        """Take one token; returns 0 if there was one, else seconds until there will be"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [burst, now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimited(HTTPException):
+    """429 raised by Admission.check"""
+
+
+class Admission:
+    def __init__(self, limits: Dict[str, Dict[str, Tuple[float, float]]] = RATE_LIMITS,
+                 concurrency: int = EXPENSIVE_CONCURRENCY, enabled: bool = RATE_LIMIT_ENABLED):
+        self.limits = limits
+        self.concurrency = concurrency
+        self.enabled = enabled
+        self.buckets = TokenBuckets()
+        self.in_flight = 0
+        self.counts: Dict[str, int] = {}  # "<route>.<outcome>" -> requests
+        self._lock = threading.Lock()
+
+    def _count(self, route: str, outcome: str) -> None:
+        name = f"{route}.{outcome}"
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def check(self, route: str, kind: str, value: Optional[str]) -> None:
+        """Spend one token from the (route, kind, value) bucket; 429 if it is empty"""
+        budget = self.limits.get(route, {}).get(kind)
+        if not self.enabled or budget is None or not value:
+            return
+        wait = self.buckets.take((route, kind, value), *budget)
+        if wait:
+            self._count(route, f"limited_{kind}")
+            raise RateLimited(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+    @contextmanager
+    def slot(self, route: str) -> Iterator[None]:
+        """One of the EXPENSIVE_CONCURRENCY request slots; 503 if none is free"""
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            busy = self.in_flight >= self.concurrency
+            if not busy:
+                self.in_flight += 1
+        if busy:
+            self._count(route, "busy")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "concurrency": self.concurrency,
+            "keys": len(self.buckets),
+            "evictions": self.buckets.evictions,
+            **counts,
+        }
+
+
+admission = Admission()
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limited(route: str) -> Callable:
+    """Dependency admitting a request to `route`: its per-IP budget, then a concurrency slot.
+
+    Per-user budgets are checked by the route itself, with
+    admission.check(route, "user", key), once it knows the user. The
+    request is counted as "<route>.admitted" only if that check passed too.
+    """
+
+    async def dependency(request: Request):
+        admission.check(route, "ip", client_ip(request))
+        with admission.slot(route):
+            try:
+                yield
+            except RateLimited:
+                raise
+            except Exception:
+                admission._count(route, "admitted")  # admitted, then failed on its own
+                raise
+            admission._count(route, "admitted")
+
+    return dependency
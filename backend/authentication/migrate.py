@@ -0,0 +1,50 @@
+"""Copy users.json into the SQLite user store.
+
+    python -m backend.authentication.migrate [--json PATH] [--db PATH] [--sessions-db PATH]
+
+Re-running only adds users that are not in the database yet. Unexpired
+refresh tokens still listed in users.json are moved to the refresh-token
+store (the API also does this at startup, for whichever user store it
+uses). Afterwards start the API with USER_STORE=sqlite (and USERS_DB if the
+path is not the default).
+"""
+import argparse
+from backend.authentication import utils
+from backend.authentication.repository import JsonUserRepository, UserRepository, migrate_json_to_sqlite
+from backend.authentication.security import verify_refresh_token
+from backend.authentication.token_store import RefreshTokenStore
+
+
+def legacy_refresh_tokens(users: UserRepository):
+    """(user_id, token, exp) for every still-valid token listed on a user record"""
+    for user in users.all():
+        for token in user.get("refresh_tokens", []):
+            payload = verify_refresh_token(token)
+            if payload and payload.get("sub") == user["user_id"]:
+                yield user["user_id"], token, payload["exp"]
+
+
+def migrate_refresh_tokens(users: UserRepository, store: RefreshTokenStore) -> int:
+    """Move refresh tokens from user records (the pre-store layout) into `store`.
+
+    Safe to run on every startup: a token is imported only once, so one
+    revoked since is not brought back. Returns how many were imported.
+    """
+    return store.import_tokens(legacy_refresh_tokens(users))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate users.json to SQLite")
+    parser.add_argument("--json", default=utils.USERS_FILE, help="source users.json")
+    parser.add_argument("--db", default=utils.USERS_DB, help="target SQLite database")
+    parser.add_argument("--sessions-db", default=utils.SESSIONS_DB, help="refresh-token store")
+    args = parser.parse_args()
+
+    added = migrate_json_to_sqlite(args.json, args.db)
+    print(f"Imported {added} users into {args.db}")
+    tokens = migrate_refresh_tokens(JsonUserRepository(args.json), RefreshTokenStore(args.sessions_db))
+    print(f"Imported {tokens} refresh tokens into {args.sessions_db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import copy, json, os, sqlite3, tempfile, threading, time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.app.coherence import generations
+from backend.app.metrics import timed
+from backend.movies.cache import CATALOG_REVALIDATE_SECONDS, file_stamp
+
+User = Dict[str, Any]
+
+
+class UserExistsError(ValueError):
+    """Raised when a username or email is already registered"""
+
+
+class UserRepository(ABC):
+    """Storage for user records, looked up by user_id, username or email.
+
+    Records are plain dicts in the users.json layout. Every record handed
+    out is the caller's own copy: changing it does not change the store,
+    only update() does.
+    """
+
+    @abstractmethod
+    def get_by_id(self, user_id: str) -> Optional[User]: ...
+
+    @abstractmethod
+    def get_by_username(self, username: str) -> Optional[User]: ...
+
+    @abstractmethod
+    def get_by_email(self, email: str) -> Optional[User]: ...
+
+    @abstractmethod
+    def create(self, user: User) -> None: ...
+
+    @abstractmethod
+    def update(self, user_id: str, **fields: Any) -> Optional[User]:
+        """Set the given fields on one user; returns the updated record"""
+
+    @abstractmethod
+    def all(self) -> List[User]: ...
+
+    def count(self) -> int:
+        return len(self.all())
+
+
+class JsonUserRepository(UserRepository):
+    """users.json kept in memory with id/username/email indexes.
+
+    The file is re-read only when its stamp changes, and every write replaces
+    it atomically (temp file + rename). Writes hold the file's cross-process
+    lock from `generations` around the read-modify-write, so two workers
+    never overwrite each other's changes, and bump its generation; reads
+    skip even the stat while the generation is unchanged (re-stat'ing at
+    least every CATALOG_REVALIDATE_SECONDS for edits made outside the app).
+    Writes are still whole-file, so use the SQLite backend for large user
+    counts.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._users: List[User] = []
+        self._by_id: Dict[str, User] = {}
+        self._by_username: Dict[str, User] = {}
+        self._by_email: Dict[str, User] = {}
+        self._stamp = None
+        self._generation_key = f"users:{os.path.abspath(self.path)}"
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    def _load(self) -> None:
+        generation = generations.current(self._generation_key)
+        if (
+            self._stamp is not None
+            and generation == self._generation
+            and time.monotonic() - self._checked_at < CATALOG_REVALIDATE_SECONDS
+        ):
+            return
+        self._read()
+        self._generation, self._checked_at = generation, time.monotonic()
+
+    @timed("users.json_load")
+    def _read(self) -> None:
+        stamp = file_stamp(self.path)
+        if stamp == self._stamp and self._stamp is not None:
+            return
+        users: List[User] = []
+        if stamp is not None:
+            with open(self.path, "r") as f:
+                try:
+                    users = json.load(f)
+                except json.JSONDecodeError:
+                    users = []
+        for user in users:
+            user.setdefault("refresh_tokens", [])
+        self._index(users)
+        self._stamp = stamp
+
+    def _index(self, users: List[User]) -> None:
+        self._users = users
+        self._by_id = {u["user_id"]: u for u in users}
+        self._by_username = {u["username"]: u for u in users}
+        self._by_email = {u["email"]: u for u in users}
+
+    @timed("users.json_save")
+    def _save(self) -> None:
+        directory = self.path.parent
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".users-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._users, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self._stamp = file_stamp(self.path)
+
+    def get_by_id(self, user_id: str) -> Optional[User]:
+        with self._lock:
+            self._load()
+            return copy.deepcopy(self._by_id.get(user_id))
+
+    def get_by_username(self, username: str) -> Optional[User]:
+        with self._lock:
+            self._load()
+            return copy.deepcopy(self._by_username.get(username))
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        with self._lock:
+            self._load()
+            return copy.deepcopy(self._by_email.get(email))
+
+    @timed("users.json_create")
+    def create(self, user: User) -> None:
+        with generations.writing(self._generation_key), self._lock:
+            self._load()
+            if user["username"] in self._by_username or user["email"] in self._by_email:
+                raise UserExistsError("Username or email already taken")
+            user = copy.deepcopy(user)
+            self._users.append(user)
+            self._by_id[user["user_id"]] = user
+            self._by_username[user["username"]] = user
+            self._by_email[user["email"]] = user
+            self._save()
+
+    @timed("users.json_update")
+    def update(self, user_id: str, **fields: Any) -> Optional[User]:
+        with generations.writing(self._generation_key), self._lock:
+            self._load()
+            user = self._by_id.get(user_id)
+            if user is None:
+                return None
+            user.update(copy.deepcopy(fields))
+            self._save()
+            return copy.deepcopy(user)
+
+    def all(self) -> List[User]:
+        with self._lock:
+            self._load()
+            return copy.deepcopy(self._users)
+
+    def count(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._users)
+
+
+# Columns with their own index; everything else lives in the JSON `data` column
+CORE_FIELDS = ("user_id", "username", "email", "hashed_password", "role")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    hashed_password TEXT NOT NULL,
+    role TEXT NOT NULL,
+    data TEXT NOT NULL DEFAULT '{}'
+)
+"""
+
+
+def sqlite_connection(local: threading.local, path: str) -> sqlite3.Connection:
+    """This thread's connection to `path`: autocommit, WAL, row access by name"""
+    conn = getattr(local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        local.conn = conn
+    return conn
+
+
+class SqliteUserRepository(UserRepository):
+    """SQLite-backed users (stdlib sqlite3) in WAL mode.
+
+    Lookups go through the primary key or unique indexes and updates touch a
+    single row inside a transaction, so concurrent writers (threads or
+    worker processes) don't overwrite each other's changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite_connection(self._local, self.path)
+
+    @staticmethod
+    def _to_user(row: Optional[sqlite3.Row]) -> Optional[User]:
+        if row is None:
+            return None
+        user = json.loads(row["data"])
+        user.update({k: row[k] for k in CORE_FIELDS})
+        user.setdefault("penalties", [])
+        user.setdefault("refresh_tokens", [])
+        return user
+
+    @timed("users.sqlite_get")
+    def _get(self, column: str, value: str) -> Optional[User]:
+        row = self._connect().execute(f"SELECT * FROM users WHERE {column} = ?", (value,)).fetchone()
+        return self._to_user(row)
+
+    def get_by_id(self, user_id: str) -> Optional[User]:
+        return self._get("user_id", user_id)
+
+    def get_by_username(self, username: str) -> Optional[User]:
+        return self._get("username", username)
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        return self._get("email", email)
+
+    def _insert(self, conn: sqlite3.Connection, user: User) -> None:
+        data = {k: v for k, v in user.items() if k not in CORE_FIELDS}
+        conn.execute(
+            "INSERT INTO users (user_id, username, email, hashed_password, role, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (user["user_id"], user["username"], user["email"], user["hashed_password"], user["role"], json.dumps(data)),
+        )
+
+    @timed("users.sqlite_create")
+    def create(self, user: User) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                self._insert(conn, user)
+        except sqlite3.IntegrityError as exc:
+            raise UserExistsError("Username or email already taken") from exc
+
+    def import_users(self, users: Iterable[User]) -> int:
+        """Bulk-insert users, skipping ids that already exist; returns rows added"""
+        conn = self._connect()
+        added = 0
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for user in users:
+                if conn.execute("SELECT 1 FROM users WHERE user_id = ?", (user["user_id"],)).fetchone():
+                    continue
+                self._insert(conn, user)
+                added += 1
+        return added
+
+    @timed("users.sqlite_update")
+    def update(self, user_id: str, **fields: Any) -> Optional[User]:
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            user = self._to_user(conn.execute("SELECT * FROM users WHERE user_id = ?", (user_id,)).fetchone())
+            if user is None:
+                return None
+            user.update(fields)
+            data = {k: v for k, v in user.items() if k not in CORE_FIELDS}
+            conn.execute(
+                "UPDATE users SET username = ?, email = ?, hashed_password = ?, role = ?, data = ? WHERE user_id = ?",
+                (user["username"], user["email"], user["hashed_password"], user["role"], json.dumps(data), user_id),
+            )
+        return user
+
+    def all(self) -> List[User]:
+        return [self._to_user(row) for row in self._connect().execute("SELECT * FROM users")]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: str) -> int:
+    """Copy every user from users.json into a SQLite store; safe to re-run"""
+    users = JsonUserRepository(json_path).all()
+    return SqliteUserRepository(db_path).import_users(users)
@@ -1,15 +1,41 @@
 # router.py - Update login and add refresh endpoint
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
+from backend.app.ratelimit import admission, client_ip, rate_limited
 from backend.authentication import schemas, utils, security
+from backend.authentication.repository import UserExistsError
+from backend.dashboard.counters import counters
+from typing import Optional
 import os, uuid
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post('/register', response_model=schemas.UserResponse)
+# The user and session stores are blocking (file or SQLite I/O); the routes
+# below call them through run_in_threadpool so they never stall the event loop
+
+def _create_user(new_user: dict) -> None:
+    utils.get_user_repository().create(new_user)
+    counters.user_registered(new_user["role"])
+
+def _start_session(user_id: str, refresh_token: str) -> None:
+    # Track the refresh token so it can be rotated and revoked
+    displaced = utils.get_token_store().issue(
+        user_id, refresh_token, security.verify_refresh_token(refresh_token)["exp"]
+    )
+    counters.session_started(displaced)
+
+def _end_session(user_id: str, refresh_token: str, access_token: Optional[str]) -> None:
+    # Only this session: its refresh token, and the access token it was called with
+    if access_token:
+        security.revoke_access_token(access_token, user_id)
+    if utils.get_token_store().revoke(refresh_token):
+        counters.sessions_ended()
+
+@router.post('/register', response_model=schemas.UserResponse, dependencies=[Depends(rate_limited("register"))])
 async def register(user: schemas.UserCreate):
-    users = utils.load_users()
-    exists, message = utils.user_exists(users, user.username, user.email)
+    users = utils.get_user_repository()
+    exists, message = await run_in_threadpool(utils.user_exists, users, user.username, user.email)
     if exists:
         raise HTTPException(status_code=400, detail=message)
     
@@ -17,14 +43,16 @@ async def register(user: schemas.UserCreate):
         "user_id": str(uuid.uuid4()),
         "username": user.username,
         "email": user.email,
-        "hashed_password": security.hash_password(user.password),
+        "hashed_password": await security.hash_password_async(user.password),
         "role": user.role.value,
         "penalties": [],
-        "refresh_tokens": []
     }
 
-    users.append(new_user)
-    utils.save_users(users)
+    try:
+        await run_in_threadpool(_create_user, new_user)
+    except UserExistsError:
+        # Lost a race with a concurrent registration of the same name/email
+        raise HTTPException(status_code=400, detail="Username or Email already taken")
 
     return {
         "user_id": new_user["user_id"],
@@ -34,12 +62,14 @@ async def register(user: schemas.UserCreate):
         "penalties": new_user["penalties"],
     }
 
-@router.post('/login', response_model=schemas.Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    users = utils.load_users()
-    user = next((u for u in users if u["username"] == form_data.username), None)
+@router.post('/login', response_model=schemas.Token, dependencies=[Depends(rate_limited("login"))])
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    # Before bcrypt. Per (username, IP), so failed logins from elsewhere can't lock the user out
+    admission.check("login", "user", f"{form_data.username.casefold()}@{client_ip(request)}")
+    users = utils.get_user_repository()
+    user = await run_in_threadpool(users.get_by_username, form_data.username)
 
-    if not user or not security.verify_password(form_data.password, user["hashed_password"]):
+    if not user or not await security.verify_password_async(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
@@ -54,9 +84,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         data={"sub": user["user_id"]}
     )
     
-    # Store refresh token in user data (optional - for token revocation)
-    user["refresh_tokens"] = user.get("refresh_tokens", []) + [refresh_token]
-    utils.save_users(users)
+    await run_in_threadpool(_start_session, user["user_id"], refresh_token)
 
     return {
         "access_token": access_token,
@@ -64,7 +92,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         "token_type": "bearer",
     }
 
-@router.post('/refresh', response_model=schemas.Token)
+@router.post('/refresh', response_model=schemas.Token, dependencies=[Depends(rate_limited("refresh"))])
 async def refresh_token(token_data: schemas.TokenRefresh):
     payload = security.verify_refresh_token(token_data.refresh_token)
     if not payload:
@@ -74,8 +102,8 @@ async def refresh_token(token_data: schemas.TokenRefresh):
         )
     
     user_id = payload.get("sub")
-    users = utils.load_users()
-    user = next((u for u in users if u["user_id"] == user_id), None)
+    users = utils.get_user_repository()
+    user = await run_in_threadpool(users.get_by_id, user_id)
     
     if not user:
         raise HTTPException(
@@ -83,8 +111,8 @@ async def refresh_token(token_data: schemas.TokenRefresh):
             detail="User not found"
         )
     
-    # Optional: Check if refresh token is in user's valid tokens list
-    if token_data.refresh_token not in user.get("refresh_tokens", []):
+    tokens = utils.get_token_store()
+    if not await run_in_threadpool(tokens.is_valid, token_data.refresh_token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token revoked"
@@ -100,9 +128,16 @@ async def refresh_token(token_data: schemas.TokenRefresh):
         data={"sub": user["user_id"]}
     )
     
-    # Update user's refresh tokens
-    user["refresh_tokens"] = [new_refresh_token]  # Replace old with new
-    utils.save_users(users)
+    # Replace old with new; fails if a concurrent refresh already used the old one
+    rotated = await run_in_threadpool(
+        tokens.rotate, token_data.refresh_token, user["user_id"],
+        new_refresh_token, security.verify_refresh_token(new_refresh_token)["exp"]
+    )
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token revoked"
+        )
 
     return {
         "access_token": new_access_token,
@@ -111,8 +146,14 @@ async def refresh_token(token_data: schemas.TokenRefresh):
     }
 
 @router.post('/logout')
-async def logout(token_data: schemas.TokenRefresh):
-    """Revoke a refresh token"""
+async def logout(
+    token_data: schemas.TokenRefresh,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security.optional_bearer),
+):
+    """Revoke a refresh token, and the access token sent as the bearer token, if any.
+
+    The user's sessions on other devices are left alone.
+    """
     payload = security.verify_refresh_token(token_data.refresh_token)
     if not payload:
         raise HTTPException(
@@ -120,13 +161,7 @@ async def logout(token_data: schemas.TokenRefresh):
             detail="Invalid refresh token"
         )
     
-    user_id = payload.get("sub")
-    users = utils.load_users()
-    user = next((u for u in users if u["user_id"] == user_id), None)
-    
-    if user and token_data.refresh_token in user.get("refresh_tokens", []):
-        # Remove the specific refresh token
-        user["refresh_tokens"].remove(token_data.refresh_token)
-        utils.save_users(users)
+    access_token = credentials.credentials if credentials else None
+    await run_in_threadpool(_end_session, payload.get("sub"), token_data.refresh_token, access_token)
     
     return {"message": "Successfully logged out"}
\ No newline at end of file
@@ -1,13 +1,18 @@
-import os
+import asyncio, os, time, uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional
 import jwt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from backend.authentication import schemas
+from backend.authentication import schemas, utils
+from backend.authentication.token_cache import VerifiedTokenCache
+from backend.app.metrics import timed
 
 security_scheme = HTTPBearer()
+optional_bearer = HTTPBearer(auto_error=False)  # for routes that work with or without a token
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
@@ -17,19 +22,98 @@ SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key")
 REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY", "fallback-refresh-key")
 ALGORITHM = "HS256"
 
+# bcrypt runs on a bounded pool so it never blocks the event loop
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "4"))
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "32"))  # waiting jobs before 503
+PASSWORD_EXECUTOR = os.getenv("PASSWORD_EXECUTOR", "thread")  # "thread" or "process"
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+@timed("password.hash")
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
+@timed("password.verify")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordPool:
+    """Runs password hashing/verification on a worker pool.
+
+    At most `workers` jobs run at once and at most `queue_limit` more may wait;
+    beyond that requests fail fast with 503 instead of piling up.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, kind: str = "thread"):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.kind = kind
+        self.pending = 0
+        self.max_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    async def run(self, fn, *args):
+        # Only touched from the event loop thread, so plain counters are safe
+        if self.pending >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.busy_seconds += time.perf_counter() - start
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": min(self.pending, self.workers),
+            "queued": max(0, self.pending - self.workers),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+password_pool = PasswordPool(PASSWORD_WORKERS, PASSWORD_QUEUE_LIMIT, PASSWORD_EXECUTOR)
+token_cache = VerifiedTokenCache()
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({ 
         "exp": expire,
+        "jti": uuid.uuid4().hex,  # Lets logout revoke this one token
         "type": "access"  # Token type for clarity
     })
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -39,10 +123,12 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
     to_encode.update({
         "exp": expire,
+        "jti": uuid.uuid4().hex,  # Unique per token, so rotation never reissues the same string
         "type": "refresh"  # Token type for clarity
     })
     return jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
 
+@timed("jwt.decode")
 def verify_access_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -52,6 +138,7 @@ def verify_access_token(token: str) -> Optional[dict]:
     except jwt.PyJWTError:
         return None
 
+@timed("jwt.decode")
 def verify_refresh_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
@@ -63,14 +150,37 @@ def verify_refresh_token(token: str) -> Optional[dict]:
     
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security_scheme)):
     token = credentials.credentials
-    payload = verify_access_token(token)
+    revocations = utils.get_access_revocations()
+    if not revocations.is_fresh():
+        await run_in_threadpool(revocations.refresh)
+    cached = token_cache.get(token)
+    if cached is not None:
+        current_user, jti = cached
+        if not revocations.is_revoked(jti):
+            return current_user
+        payload = None
+    else:
+        payload = verify_access_token(token)
+        if payload and revocations.is_revoked(payload.get("jti")):
+            payload = None
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return schemas.TokenData(user_id=payload["sub"], role=payload["role"])
+    current_user = schemas.TokenData(user_id=payload["sub"], role=payload["role"])
+    token_cache.put(token, current_user, payload["exp"], payload.get("jti"))
+    return current_user
+
+def revoke_access_token(token: str, user_id: str) -> bool:
+    """Reject one access token of `user_id` in every worker until it expires; False if it isn't one"""
+    payload = verify_access_token(token)
+    if not payload or payload["sub"] != user_id or not payload.get("jti"):
+        return False
+    utils.get_access_revocations().revoke(payload["jti"], payload["exp"])
+    token_cache.discard(token)
+    return True
 
 
 
@@ -0,0 +1,70 @@
+import hashlib, os, threading, time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from backend.authentication import schemas
+
+# Max verified access tokens kept in memory per process
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+
+def _key(token: str) -> bytes:
+    # Digest instead of the raw token so the cache never holds usable credentials
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class VerifiedTokenCache:
+    """LRU cache of access tokens that already passed jwt.decode.
+
+    Entries expire at the token's own `exp`, so the cache never accepts a
+    token for longer than verification would. Each entry keeps the token's
+    jti, which callers check against AccessRevocations on every hit.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[bytes, Tuple[schemas.TokenData, float, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Tuple[schemas.TokenData, Optional[str]]]:
+        """The token's user and jti, if it was verified before and has not expired"""
+        key = _key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[2]
+
+    def put(self, token: str, data: schemas.TokenData, exp: float, jti: Optional[str]) -> None:
+        key = _key(token)
+        with self._lock:
+            self._entries[key] = (data, exp, jti)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, token: str) -> None:
+        """Forget a token, e.g. once it is revoked"""
+        with self._lock:
+            self._entries.pop(_key(token), None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,222 @@
+import asyncio, hashlib, os, threading, time
+from typing import Callable, Iterable, Optional, Set
+
+from backend.app.coherence import generations
+from backend.authentication.repository import sqlite_connection
+
+# Oldest sessions beyond this are revoked when a user logs in again
+MAX_SESSIONS_PER_USER = int(os.getenv("MAX_SESSIONS_PER_USER", "10"))
+PRUNE_INTERVAL_SECONDS = float(os.getenv("REFRESH_PRUNE_INTERVAL_SECONDS", "300"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    token_hash BLOB PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    issued_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS refresh_tokens_expiry ON refresh_tokens (expires_at);
+CREATE INDEX IF NOT EXISTS refresh_tokens_user ON refresh_tokens (user_id, issued_at);
+CREATE TABLE IF NOT EXISTS imported_tokens (
+    token_hash BLOB PRIMARY KEY,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS revoked_access_tokens (
+    jti TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def token_hash(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class RefreshTokenStore:
+    """Live refresh tokens, keyed by the SHA-256 of the token.
+
+    Validity checks and revocations are single primary-key operations, the
+    expiry index makes pruning touch only expired rows, and user records are
+    never read or written.
+    """
+
+    def __init__(self, path: str, max_sessions: int = MAX_SESSIONS_PER_USER):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.pruned = 0
+        self.capped = 0
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite_connection(self._local, self.path)
+
+    def _insert(self, conn, user_id: str, token: str, expires_at: float) -> int:
+        conn.execute(
+            "INSERT OR REPLACE INTO refresh_tokens (token_hash, user_id, issued_at, expires_at) VALUES (?, ?, ?, ?)",
+            (token_hash(token), user_id, time.time(), expires_at),
+        )
+        # Enforce the per-user session cap by dropping the oldest sessions
+        if self.max_sessions > 0:
+            cur = conn.execute(
+                "DELETE FROM refresh_tokens WHERE token_hash IN ("
+                " SELECT token_hash FROM refresh_tokens WHERE user_id = ?"
+                " ORDER BY issued_at DESC LIMIT -1 OFFSET ?)",
+                (user_id, self.max_sessions),
+            )
+            self.capped += cur.rowcount
+            return cur.rowcount
+        return 0
+
+    def issue(self, user_id: str, token: str, expires_at: float) -> int:
+        """Record a new token; returns how many old sessions the cap displaced"""
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return self._insert(conn, user_id, token, expires_at)
+
+    def is_valid(self, token: str) -> bool:
+        row = self._connect().execute(
+            "SELECT expires_at FROM refresh_tokens WHERE token_hash = ?", (token_hash(token),)
+        ).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def rotate(self, old_token: str, user_id: str, new_token: str, expires_at: float) -> bool:
+        """Swap old_token for new_token; False if old_token was not live"""
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute(
+                "DELETE FROM refresh_tokens WHERE token_hash = ? AND user_id = ? AND expires_at > ?",
+                (token_hash(old_token), user_id, time.time()),
+            )
+            if cur.rowcount == 0:
+                return False
+            self._insert(conn, user_id, new_token, expires_at)
+        return True
+
+    def revoke(self, token: str) -> bool:
+        cur = self._connect().execute("DELETE FROM refresh_tokens WHERE token_hash = ?", (token_hash(token),))
+        return cur.rowcount > 0
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete expired tokens; returns how many were removed"""
+        now = time.time() if now is None else now
+        conn = self._connect()
+        cur = conn.execute("DELETE FROM refresh_tokens WHERE expires_at <= ?", (now,))
+        conn.execute("DELETE FROM imported_tokens WHERE expires_at <= ?", (now,))
+        self.pruned += cur.rowcount
+        return cur.rowcount
+
+    def import_tokens(self, tokens: Iterable[tuple]) -> int:
+        """Bulk-load (user_id, token, expires_at) rows, e.g. from users.json.
+
+        Each token is imported at most once, so importing the same list again
+        never revives a token that was revoked since. Returns how many were added.
+        """
+        conn = self._connect()
+        added = 0
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for user_id, token, expires_at in tokens:
+                if expires_at <= time.time():
+                    continue
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO imported_tokens (token_hash, expires_at) VALUES (?, ?)",
+                    (token_hash(token), expires_at),
+                )
+                if cur.rowcount:
+                    self._insert(conn, user_id, token, expires_at)
+                    added += 1
+        return added
+
+    def count_active(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM refresh_tokens WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+    def stats(self) -> dict:
+        return {
+            "active": self.count_active(),
+            "max_sessions_per_user": self.max_sessions,
+            "pruned": self.pruned,
+            "capped": self.capped,
+        }
+
+
+class AccessRevocations:
+    """Denylist of access tokens, by jti, that were revoked before they expired.
+
+    Rows live next to the refresh tokens, so every worker process sees a
+    revocation, and each is dropped once its token has expired. Each
+    process mirrors the table in a set that is re-read only when the
+    table's generation (see backend.app.coherence) moves on, so a check is
+    a memory read and a set lookup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.revocations = 0
+        self.reloads = 0
+        self._local = threading.local()
+        self._generation_key = f"revocations:{os.path.abspath(path)}"
+        self._generation: Optional[int] = None
+        self._revoked: Set[str] = set()
+        self._lock = threading.Lock()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite_connection(self._local, self.path)
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Reject the access token with this jti until it expires at `expires_at`"""
+        now = time.time()
+        if expires_at <= now:
+            return
+        with generations.writing(self._generation_key):
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM revoked_access_tokens WHERE expires_at <= ?", (now,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO revoked_access_tokens (jti, expires_at) VALUES (?, ?)", (jti, expires_at)
+                )
+        self.revocations += 1
+
+    def is_fresh(self) -> bool:
+        """True while the in-memory copy is current, so is_revoked won't touch the database"""
+        return generations.current(self._generation_key) == self._generation
+
+    def refresh(self) -> None:
+        generation = generations.current(self._generation_key)
+        with self._lock:
+            if generation != self._generation:
+                rows = self._connect().execute(
+                    "SELECT jti FROM revoked_access_tokens WHERE expires_at > ?", (time.time(),)
+                ).fetchall()
+                self._revoked = {jti for jti, in rows}
+                self._generation = generation
+                self.reloads += 1
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        if not self.is_fresh():
+            self.refresh()
+        return jti in self._revoked
+
+    def stats(self) -> dict:
+        return {"tokens": len(self._revoked), "revocations": self.revocations, "reloads": self.reloads}
+
+
+async def prune_periodically(
+    store: RefreshTokenStore,
+    interval: float = PRUNE_INTERVAL_SECONDS,
+    on_pruned: Optional[Callable[[int], None]] = None,
+) -> None:
+    """Background task: drop expired refresh tokens every `interval` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        pruned = await asyncio.to_thread(store.prune)
+        if pruned and on_pruned is not None:
+            on_pruned(pruned)
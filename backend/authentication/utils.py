@@ -1,11 +1,44 @@
-import os, json
-from typing import List, Dict, Any, Optional
+import os
+from typing import Optional
+from backend.authentication.repository import JsonUserRepository, SqliteUserRepository, UserRepository
+from backend.authentication.token_store import AccessRevocations, RefreshTokenStore
 
-USERS_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'users.json')
+USERS_FILE = os.getenv("USERS_FILE", os.path.join(os.path.dirname(__file__), '..', 'data', 'users.json'))
+USERS_DB = os.getenv("USERS_DB", os.path.join(os.path.dirname(__file__), '..', 'data', 'users.db'))
+USER_STORE = os.getenv("USER_STORE", "json")  # "json" or "sqlite"
+SESSIONS_DB = os.getenv("SESSIONS_DB", os.path.join(os.path.dirname(__file__), '..', 'data', 'sessions.db'))
 
-def user_exists(users: List[Dict[str, Any]], username: str, email: str) -> tuple[bool, Optional[str]]:
-    username_taken = any(user["username"] == username for user in users)
-    email_taken = any(user["email"] == email for user in users)
+_repository: Optional[UserRepository] = None
+_token_store: Optional[RefreshTokenStore] = None
+_access_revocations: Optional[AccessRevocations] = None
+
+def get_user_repository() -> UserRepository:
+    """The configured user store, created on first use"""
+    global _repository
+    if _repository is None:
+        if USER_STORE == "sqlite":
+            _repository = SqliteUserRepository(USERS_DB)
+        else:
+            _repository = JsonUserRepository(USERS_FILE)
+    return _repository
+
+def get_token_store() -> RefreshTokenStore:
+    """The refresh-token store, created on first use"""
+    global _token_store
+    if _token_store is None:
+        _token_store = RefreshTokenStore(SESSIONS_DB)
+    return _token_store
+
+def get_access_revocations() -> AccessRevocations:
+    """Access-token revocations shared by every worker, created on first use"""
+    global _access_revocations
+    if _access_revocations is None:
+        _access_revocations = AccessRevocations(SESSIONS_DB)
+    return _access_revocations
+
+def user_exists(repo: UserRepository, username: str, email: str) -> tuple[bool, Optional[str]]:
+    username_taken = repo.get_by_username(username) is not None
+    email_taken = repo.get_by_email(email) is not None
 
     if username_taken and email_taken:
         return True, "Username and Email already taken"
@@ -16,19 +49,3 @@ def user_exists(users: List[Dict[str, Any]], username: str, email: str) -> tuple
     else:
         return False, None
     
-# utils.py - Update user structure handling
-def load_users() -> List[Dict[str, Any]]:
-    with open(USERS_FILE, "r") as f:
-        try:
-            users = json.load(f)
-            # Ensure all users have refresh_tokens field
-            for user in users:
-                if "refresh_tokens" not in user:
-                    user["refresh_tokens"] = []
-            return users
-        except json.JSONDecodeError:
-            return []
-
-def save_users(users: List[Dict[str, Any]]) -> None:
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=4)
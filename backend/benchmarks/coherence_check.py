@@ -0,0 +1,120 @@
+"""Cross-process check of the file-backed caches: no lost updates, no stale reads.
+
+    python -m backend.benchmarks.coherence_check [--workers 4] [--rounds 200]
+
+Starts --workers processes on a scratch users.json and a scratch copy of one
+movie's reviews. Each keeps its caches warm the way an app worker does, with
+the stat fallback turned off so only the shared generations keep it coherent:
+
+* every worker sets its own field on one shared user record --rounds times
+  through JsonUserRepository.update; each whole-file rewrite must keep every
+  other worker's latest field (no lost updates);
+* every worker appends --rounds reviews through ReviewStore.append_many;
+* after each write, and without sleeping, a worker reads the other file
+  through its warm cache. It must see at least every write any worker had
+  acknowledged before the read started (no stale reads).
+
+Exits non-zero on the first violation.
+"""
+import argparse, json, multiprocessing, os, shutil, sys, tempfile, time
+from pathlib import Path
+
+MOVIE = "Pulp Fiction"
+SOURCE = Path(__file__).resolve().parent.parent / "data" / "imdb_reviews" / MOVIE / "movieReviews.csv"
+USER_ID = "coherence-check"
+
+
+def worker(n: int, rounds: int, scratch: str, base: int, acked_updates, acked_reviews) -> None:
+    os.environ["GENERATIONS_FILE"] = os.path.join(scratch, ".generations")
+    os.environ["CATALOG_REVALIDATE_SECONDS"] = "3600"  # never fall back to stat()
+    from backend.authentication.repository import JsonUserRepository
+    from backend.movies.reviews import ReviewStore
+
+    users = JsonUserRepository(os.path.join(scratch, "users.json"))
+    store = ReviewStore(Path(scratch) / "imdb_reviews")
+    users.get_by_id(USER_ID)
+    store.get(MOVIE)
+
+    def fail(message: str) -> None:
+        print(f"worker {n}: {message}", file=sys.stderr)
+        sys.exit(1)
+
+    def check_users() -> None:
+        floor = acked_updates.value
+        user = users.get_by_id(USER_ID)
+        seen = sum(v for k, v in user.items() if k.startswith("worker_"))
+        if seen < floor:
+            fail(f"stale users.json: {seen} updates visible, {floor} acknowledged")
+
+    def check_reviews() -> None:
+        floor = acked_reviews.value
+        rows = len(store.get(MOVIE)) - base
+        if rows < floor:
+            fail(f"stale reviews: {rows} appended rows visible, {floor} acknowledged")
+
+    # Each write is followed by a read of the *other* file, which this worker
+    # has not just re-validated while writing
+    for i in range(rounds):
+        users.update(USER_ID, **{f"worker_{n}": i + 1})
+        with acked_updates.get_lock():
+            acked_updates.value += 1
+        check_reviews()
+
+        store.append_many(MOVIE, [{"user": f"worker{n}", "rating": 5, "title": f"w{n}-{i}", "review": "x"}],
+                          fsync=False)
+        with acked_reviews.get_lock():
+            acked_reviews.value += 1
+        check_users()
+
+def main(workers: int, rounds: int) -> int:
+    scratch = tempfile.mkdtemp()
+    try:
+        (Path(scratch) / "imdb_reviews" / MOVIE).mkdir(parents=True)
+        shutil.copy(SOURCE, Path(scratch) / "imdb_reviews" / MOVIE / "movieReviews.csv")
+        with open(os.path.join(scratch, "users.json"), "w") as f:
+            json.dump([{"user_id": USER_ID, "username": USER_ID, "email": f"{USER_ID}@example.com",
+                        "hashed_password": "", "role": "user", "penalties": []}], f)
+
+        from backend.movies.reviews import ReviewColumns
+        base = len(ReviewColumns.load(MOVIE, Path(scratch) / "imdb_reviews" / MOVIE / "movieReviews.csv"))
+
+        ctx = multiprocessing.get_context("spawn")
+        acked_updates, acked_reviews = ctx.Value("i", 0), ctx.Value("i", 0)
+        started = time.perf_counter()
+        procs = [ctx.Process(target=worker, args=(n, rounds, scratch, base, acked_updates, acked_reviews))
+                 for n in range(workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - started
+        if any(p.exitcode for p in procs):
+            print("FAILED: a worker saw stale data")
+            return 1
+
+        with open(os.path.join(scratch, "users.json")) as f:
+            user = json.load(f)[0]
+        lost = [n for n in range(workers) if user.get(f"worker_{n}") != rounds]
+        columns = ReviewColumns.load(MOVIE, Path(scratch) / "imdb_reviews" / MOVIE / "movieReviews.csv")
+        titles = [title for title, _ in columns.text(list(range(base, len(columns))))]
+        expected = {f"w{n}-{i}" for n in range(workers) for i in range(rounds)}
+        print(f"{workers} workers x {rounds} rounds in {elapsed:.2f}s: "
+              f"{len(titles)} reviews appended, user fields {[user.get(f'worker_{n}') for n in range(workers)]}")
+        if lost:
+            print(f"FAILED: lost user updates from workers {lost}")
+            return 1
+        if len(titles) != len(expected) or set(titles) != expected:
+            print(f"FAILED: expected {len(expected)} distinct appended reviews, found {len(titles)}")
+            return 1
+        print("ok: no lost updates, no stale reads")
+        return 0
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(main(args.workers, args.rounds))
@@ -0,0 +1,159 @@
+"""Synthetic dataset in the imdb_reviews layout, at any scale.
+
+    python -m backend.benchmarks.generate OUT [--movies 10000] [--reviews 10000000]
+                                              [--users 100000] [--user-store sqlite] [--seed 0]
+
+Writes OUT/imdb_reviews/<movie>/metadata.json and movieReviews.csv in the
+same schema as the bundled data, plus OUT/users.db (or users.json with
+--user-store json). Review counts per movie are skewed like real data: a few
+movies hold most of the reviews. Reviews are written by the generated users,
+and every user's password is PASSWORD. Point the app at the result with
+IMDB_DATA_PATH=OUT/imdb_reviews USER_STORE=sqlite USERS_DB=OUT/users.db
+(or USERS_FILE=OUT/users.json).
+"""
+import argparse, csv, json, random, time, uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+from backend.movies.reviews import CSV_HEADER
+
+PASSWORD = "Benchmark1"
+
+GENRES = ["Action", "Adventure", "Animation", "Comedy", "Crime", "Drama", "Fantasy", "Horror",
+          "Mystery", "Romance", "Sci-Fi", "Thriller", "War", "Western"]
+FIRST = ["Ava", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kira", "Liam",
+         "Maya", "Nico", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tariq", "Uma", "Victor", "Wen", "Yusuf", "Zoe"]
+LAST = ["Abbott", "Becker", "Castillo", "Dubois", "Eriksen", "Fischer", "Garcia", "Haddad", "Ivanova",
+        "Jensen", "Kowalski", "Lindqvist", "Moreau", "Nakamura", "Okafor", "Petrov", "Rossi", "Silva",
+        "Tanaka", "Umarov", "Varga", "Weber", "Yilmaz", "Zhou"]
+WORDS = ("the film story plot acting actor actress director scene scenes music score visual effects "
+         "character characters ending beginning pacing slow fast brilliant terrible boring great good bad "
+         "masterpiece mess funny dark violent emotional sequel original script dialogue camera performance "
+         "cast villain hero action drama comedy moments twist predictable fresh classic overrated underrated "
+         "watch again never recommend everyone nobody cinema theater screen hours minutes long short").split()
+
+
+def words(rng: random.Random, lo: int, hi: int) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(lo, hi)))
+
+
+def person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+
+
+def review_counts(rng: random.Random, movies: int, reviews: int) -> list:
+    """Split `reviews` over `movies` with a Zipf-like skew"""
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(movies)]
+    rng.shuffle(weights)
+    total = sum(weights)
+    counts = [int(reviews * w / total) for w in weights]
+    for i in rng.sample(range(movies), reviews - sum(counts)):
+        counts[i] += 1
+    return counts
+
+
+def metadata(rng: random.Random, title: str) -> dict:
+    published = date(1970, 1, 1) + timedelta(days=rng.randrange(55 * 365))
+    return {
+        "title": title,
+        "movieIMDbRating": round(rng.uniform(1.5, 9.5), 1),
+        "totalRatingCount": rng.randrange(100, 2_500_000),
+        "totalUserReviews": f"{rng.randrange(1, 999)}",
+        "totalCriticReviews": f"{rng.randrange(1, 999)}",
+        "metaScore": f"{rng.randrange(10, 100)}",
+        "movieGenres": sorted(rng.sample(GENRES, rng.randint(1, 3))),
+        "directors": [person(rng)],
+        "datePublished": published.isoformat(),
+        "creators": [person(rng) for _ in range(rng.randint(1, 3))],
+        "mainStars": [person(rng) for _ in range(3)],
+        "description": words(rng, 12, 30).capitalize() + ".",
+        "duration": rng.randint(75, 210),
+    }
+
+
+def write_reviews(rng: random.Random, path: Path, count: int, usernames: list) -> None:
+    first_day = date(2000, 1, 1).toordinal()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for _ in range(count):
+            total = rng.randrange(0, 2000)
+            rating = rng.choices(range(1, 11), weights=(4, 2, 3, 4, 6, 8, 11, 14, 13, 12))[0]
+            writer.writerow([
+                date.fromordinal(first_day + rng.randrange(9000)).strftime("%d %B %Y"),
+                rng.choice(usernames),
+                rng.randint(0, total),
+                total,
+                "" if rng.random() < 0.05 else rating,
+                words(rng, 2, 8).capitalize(),
+                words(rng, 20, 150).capitalize() + ".",
+            ])
+
+
+def make_users(n: int, hashed_password: str) -> list:
+    return [
+        {
+            "user_id": str(uuid.uuid4()),
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "hashed_password": hashed_password,
+            "role": "user",
+            "penalties": [],
+        }
+        for i in range(n)
+    ]
+
+
+def generate(out: Path, movies: int, reviews: int, users: int, user_store: str, seed: int) -> None:
+    from backend.authentication.repository import SqliteUserRepository
+    from backend.authentication.security import hash_password
+
+    rng = random.Random(seed)
+    data = out / "imdb_reviews"
+    data.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    records = make_users(users, hash_password(PASSWORD))
+    if user_store == "sqlite":
+        SqliteUserRepository(str(out / "users.db")).import_users(records)
+    else:
+        with open(out / "users.json", "w") as f:
+            json.dump(records, f)
+    print(f"{users} users in {time.perf_counter() - started:.1f}s")
+
+    usernames = [u["username"] for u in records] or ["anonymous"]
+    started = time.perf_counter()
+    written = 0
+    for i, count in enumerate(review_counts(rng, movies, reviews)):
+        title = f"Movie {i:06d} {rng.choice(WORDS).capitalize()}"
+        movie_dir = data / title
+        movie_dir.mkdir(exist_ok=True)
+        with open(movie_dir / "metadata.json", "w", encoding="utf-8") as f:
+            json.dump(metadata(rng, title), f)
+        if count:
+            write_reviews(rng, movie_dir / "movieReviews.csv", count, usernames)
+        written += count
+        if (i + 1) % 1000 == 0:
+            print(f"  {i + 1} movies, {written} reviews ({time.perf_counter() - started:.0f}s)")
+    print(f"{movies} movies, {written} reviews in {time.perf_counter() - started:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--reviews", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--user-store", choices=["sqlite", "json"], default="sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.out, args.movies, args.reviews, args.users, args.user_store, args.seed)
+    if args.user_store == "sqlite":
+        users = f"USER_STORE=sqlite USERS_DB={args.out / 'users.db'}"
+    else:
+        users = f"USERS_FILE={args.out / 'users.json'}"
+    print(f"Run with IMDB_DATA_PATH={args.out / 'imdb_reviews'} {users}")
+
+
+if __name__ == "__main__":
+    main()
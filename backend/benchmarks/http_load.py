@@ -0,0 +1,190 @@
+"""Per-endpoint throughput and latency of the API, driven in-process.
+
+    python -m backend.benchmarks.http_load [--data DIR] [--users-db PATH] [--requests 500]
+                                           [--concurrency 16] [--out benchmark-results.jsonl]
+
+Sends a fixed mix of catalog, search, review, stats and auth requests
+through httpx's ASGI transport (no network, no server process) and reports
+requests/s and p50/p95/p99 latency per endpoint. Without --data it runs on
+a scratch copy of the bundled dataset; use backend.benchmarks.generate for
+large ones (the POST scenario appends a few reviews to a --data dataset).
+
+Each run is appended to --out as one JSON line (with the git commit), and
+the report shows the change against the previous run on the same dataset.
+"""
+import argparse, asyncio, json, os, random, shutil, subprocess, tempfile, time
+from pathlib import Path
+
+SCRATCH = tempfile.mkdtemp()
+BUNDLED = Path(__file__).resolve().parent.parent / "data" / "imdb_reviews"
+USERNAME, PASSWORD = "loadbench", "Loadbench1"
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def scenarios(movie_ids: list, words: list, genres: list, headers: dict):
+    """name -> (weight, factory of (method, url, kwargs)) for each endpoint measured"""
+    rng = random.Random(0)
+    movie = lambda: rng.choice(movie_ids)
+    return {
+        "GET /movies/": (1, lambda: ("GET", "/movies/", {})),
+        "GET /movies/?genre&sort_by": (2, lambda: (
+            "GET", "/movies/", {"params": {"genre": rng.choice(genres), "sort_by": "rating", "order": "desc"}})),
+        "GET /movies/search/": (3, lambda: ("GET", "/movies/search/", {"params": {"q": rng.choice(words)}})),
+        "GET /movies/{id}": (3, lambda: ("GET", f"/movies/{movie()}", {})),
+        "GET /movies/{id}/reviews": (4, lambda: ("GET", f"/movies/{movie()}/reviews", {"params": {"limit": 50}})),
+        "GET /movies/{id}/reviews?filters": (3, lambda: (
+            "GET", f"/movies/{movie()}/reviews", {"params": {"min_rating": rng.randint(1, 9), "limit": 50}})),
+        "GET /movies/{id}/reviews?q": (2, lambda: (
+            "GET", f"/movies/{movie()}/reviews", {"params": {"q": rng.choice(words), "limit": 20}})),
+        "GET /movies/{id}/stats": (2, lambda: ("GET", f"/movies/{movie()}/stats", {})),
+        "POST /movies/{id}/reviews": (1, lambda: ("POST", f"/movies/{movie()}/reviews", {
+            "headers": headers,
+            "json": {"rating": rng.randint(1, 10), "review_title": "Load test", "review_text": "Generated by http_load."},
+        })),
+        "POST /auth/login": (1, lambda: ("POST", "/auth/login", {"data": {"username": USERNAME, "password": PASSWORD}})),
+    }
+
+
+async def run(client, mix: dict, total: int, concurrency: int) -> dict:
+    names = list(mix)
+    weights = [mix[n][0] for n in names]
+    rng = random.Random(1)
+    plan = rng.choices(names, weights=weights, k=total)
+    latencies = {n: [] for n in names}
+    errors = {n: 0 for n in names}
+    queue: asyncio.Queue = asyncio.Queue()
+    for name in plan:
+        queue.put_nowait(name)
+
+    async def worker():
+        while not queue.empty():
+            name = queue.get_nowait()
+            method, url, kwargs = mix[name][1]()
+            start = time.perf_counter()
+            r = await client.request(method, url, **kwargs)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            if r.status_code >= 400:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for name in names:
+        samples = latencies[name]
+        if samples:
+            results[name] = {
+                "requests": len(samples),
+                "errors": errors[name],
+                "rps": round(len(samples) / elapsed, 1),
+                "mean_ms": round(sum(samples) / len(samples), 3),
+                "p50_ms": round(percentile(samples, 50), 3),
+                "p95_ms": round(percentile(samples, 95), 3),
+                "p99_ms": round(percentile(samples, 99), 3),
+            }
+    results["total"] = {"requests": total, "seconds": round(elapsed, 3), "rps": round(total / elapsed, 1)}
+    return results
+
+
+def previous_run(out: Path, dataset: str):
+    if not out.exists():
+        return None
+    last = None
+    with open(out) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get("dataset") == dataset:
+                last = entry
+    return last
+
+
+def report(results: dict, previous) -> None:
+    before = previous["results"] if previous else {}
+    print(f"{'endpoint':<36} {'n':>6} {'err':>4} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in results.items():
+        if name == "total":
+            continue
+        line = (f"{name:<36} {r['requests']:>6} {r['errors']:>4} {r['rps']:>9.1f} "
+                f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+        old = before.get(name)
+        if old and old["p50_ms"]:
+            line += f"   p50 {(r['p50_ms'] / old['p50_ms'] - 1) * 100:+.0f}% vs {previous['commit']}"
+        print(line)
+    print(f"total {results['total']['requests']} requests in {results['total']['seconds']}s "
+          f"({results['total']['rps']} req/s)")
+
+
+async def main(args) -> None:
+    import httpx
+    from backend.app.main import app
+    from backend.movies import utils as movie_utils
+    from backend.movies.search import tokenize
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/auth/register", json={
+                "username": USERNAME, "email": f"{USERNAME}@example.com", "password": PASSWORD})
+            tokens = (await client.post("/auth/login", data={"username": USERNAME, "password": PASSWORD})).json()
+            headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+            movies = movie_utils.load_movies()
+            movie_ids = [m["id"] for m in movies]
+            genres = sorted({g for m in movies for g in m["metadata"]["movieGenres"]})
+            words = sorted({w for m in movies[:200] for w in tokenize(m["metadata"]["description"]) if len(w) > 3})
+            mix = scenarios(movie_ids, words or ["the"], genres, headers)
+
+            await run(client, mix, min(args.requests, 50), args.concurrency)  # warm-up
+            results = await run(client, mix, args.requests, args.concurrency)
+
+    dataset = str(args.data.resolve()) if args.data else "bundled"
+    previous = previous_run(args.out, dataset)
+    report(results, previous)
+    entry = {
+        "commit": git_commit(),
+        "created": time.time(),
+        "dataset": dataset,
+        "movies": len(movie_ids),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    with open(args.out, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    print(f"saved to {args.out}")
+    shutil.rmtree(SCRATCH, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, help="imdb_reviews directory (default: bundled dataset)")
+    parser.add_argument("--users-db", type=Path, help="SQLite user store (default: empty scratch store)")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--out", type=Path, default=Path("benchmark-results.jsonl"))
+    args = parser.parse_args()
+
+    # The app reads its configuration at import time
+    if args.data is None:
+        shutil.copytree(BUNDLED, os.path.join(SCRATCH, "imdb_reviews"))
+    os.environ["IMDB_DATA_PATH"] = str(args.data or os.path.join(SCRATCH, "imdb_reviews"))
+    os.environ["USER_STORE"] = "sqlite"
+    os.environ["USERS_DB"] = str(args.users_db or os.path.join(SCRATCH, "users.db"))
+    os.environ.setdefault("SESSIONS_DB", os.path.join(SCRATCH, "sessions.db"))
+    os.environ.setdefault("GENERATIONS_FILE", os.path.join(SCRATCH, ".generations"))
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # every request comes from one client
+    asyncio.run(main(args))
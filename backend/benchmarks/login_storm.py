@@ -0,0 +1,73 @@
+"""Latency of a read-only endpoint while logins hammer bcrypt.
+
+    python -m backend.benchmarks.login_storm [--storm 32] [--probes 200]
+
+Runs the app in-process through httpx's ASGI transport against throwaway
+SQLite user and session stores. GET /movies/ is probed sequentially, first on an idle app
+and then while `--storm` clients log in back to back; with bcrypt on the
+password pool the two p99s should stay close.
+"""
+import argparse, asyncio, os, tempfile, time
+
+SCRATCH = tempfile.mkdtemp()
+os.environ.setdefault("USER_STORE", "sqlite")
+os.environ.setdefault("USERS_DB", os.path.join(SCRATCH, "users.db"))
+os.environ.setdefault("SESSIONS_DB", os.path.join(SCRATCH, "sessions.db"))
+os.environ.setdefault("GENERATIONS_FILE", os.path.join(SCRATCH, ".generations"))
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # measure the password pool alone; set to 1 to add the limiter
+
+import httpx
+from backend.app.main import app
+
+USERNAME, PASSWORD = "storm_user", "StormPassw0rd"
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def probe(client: httpx.AsyncClient, n: int) -> list:
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        r = await client.get("/movies/")
+        r.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def storm(client: httpx.AsyncClient, stop: asyncio.Event, counts: dict) -> None:
+    while not stop.is_set():
+        r = await client.post("/auth/login", data={"username": USERNAME, "password": PASSWORD})
+        counts[r.status_code] = counts.get(r.status_code, 0) + 1
+        if r.status_code == 503:
+            await asyncio.sleep(0.01)  # brief backoff, as a real client would
+
+
+def report(label: str, latencies: list) -> None:
+    print(f"{label:<12} p50 {percentile(latencies, 50):7.2f} ms   p99 {percentile(latencies, 99):7.2f} ms")
+
+
+async def main(storm_clients: int, probes: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/register", json={"username": USERNAME, "email": "storm@example.com", "password": PASSWORD})
+        await probe(client, 10)  # warm caches
+        report("idle", await probe(client, probes))
+
+        stop, counts = asyncio.Event(), {}
+        tasks = [asyncio.create_task(storm(client, stop, counts)) for _ in range(storm_clients)]
+        await asyncio.sleep(0.5)
+        report("login storm", await probe(client, probes))
+        stop.set()
+        await asyncio.gather(*tasks)
+        print("login responses:", dict(sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--storm", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.storm, args.probes))
@@ -0,0 +1,88 @@
+"""POST /movies/{id}/reviews throughput under concurrent load.
+
+    python -m backend.benchmarks.review_writes [--clients 64] [--seconds 5]
+
+Runs the app in-process (httpx ASGI transport) against a scratch copy of one
+movie and a throwaway SQLite user store. Compares one commit + fsync per
+review (batch size 1) with the default group commit, then checks that the
+CSV holds exactly the acknowledged rows.
+"""
+import argparse, asyncio, os, shutil, tempfile, time
+
+SCRATCH = tempfile.mkdtemp()
+os.environ.setdefault("IMDB_DATA_PATH", os.path.join(SCRATCH, "imdb_reviews"))
+os.environ.setdefault("USER_STORE", "sqlite")
+os.environ.setdefault("USERS_DB", os.path.join(SCRATCH, "users.db"))
+os.environ.setdefault("SESSIONS_DB", os.path.join(SCRATCH, "sessions.db"))
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # every request comes from one client
+
+import httpx
+from backend.app.main import app
+from backend.authentication import security, utils as auth_utils
+from backend.movies import utils as movie_utils
+from backend.movies.reviews import ReviewColumns
+
+MOVIE = "Joker"
+SOURCE = os.path.join(os.path.dirname(__file__), "..", "data", "imdb_reviews", MOVIE)
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def client_loop(client, headers, deadline, latencies, n):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        r = await client.post(
+            f"/movies/{MOVIE}/reviews",
+            json={"rating": 8, "review_title": f"Bench {n}", "review_text": "Throughput, with a comma and \"quotes\"."},
+            headers=headers,
+        )
+        r.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(client, headers, clients: int, seconds: float, label: str) -> int:
+    latencies: list = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client_loop(client, headers, deadline, latencies, i) for i in range(clients)))
+    print(
+        f"{label:<14} {len(latencies) / seconds:>8.1f} POST/s   "
+        f"p50 {percentile(latencies, 50):7.2f} ms   p99 {percentile(latencies, 99):7.2f} ms   "
+        f"avg batch {movie_utils.review_writer.stats()['avg_batch']}"
+    )
+    return len(latencies)
+
+
+async def main(clients: int, seconds: float) -> None:
+    os.makedirs(movie_utils.DATA_PATH / MOVIE)
+    shutil.copy(os.path.join(SOURCE, "metadata.json"), movie_utils.DATA_PATH / MOVIE / "metadata.json")
+    auth_utils.get_user_repository().create({
+        "user_id": "bench", "username": "bench", "email": "bench@example.com",
+        "hashed_password": "x", "role": "user", "penalties": [],
+    })
+    headers = {"Authorization": "Bearer " + security.create_access_token({"sub": "bench", "role": "user"})}
+
+    writer = movie_utils.review_writer
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        default_batch = writer.max_batch
+        writer.max_batch = 1
+        total = await run(client, headers, clients, seconds, "no batching")
+        writer.stop()
+        writer.max_batch, writer.commits, writer.written = default_batch, 0, 0
+        total += await run(client, headers, clients, seconds, "group commit")
+    writer.stop()
+
+    rows = len(ReviewColumns.load(MOVIE, movie_utils.review_store.path(MOVIE)))
+    print(f"acknowledged {total}, rows on disk {rows}: {'OK' if rows == total else 'MISMATCH'}")
+    shutil.rmtree(SCRATCH, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.seconds))
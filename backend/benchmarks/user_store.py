@@ -0,0 +1,84 @@
+"""Login throughput of the user stores at a large user count.
+
+    python -m backend.benchmarks.user_store [--users 100000] [--logins 2000]
+
+Each simulated login does what /auth/login does around the password check:
+look the user up by username and record a new refresh token in the
+RefreshTokenStore (the user record itself is not written). bcrypt itself is
+left out (it costs the same on every backend), so the numbers isolate the
+storage layer. The legacy path, which appended the token to the user and
+rewrote the whole users.json, is measured on a handful of logins only.
+"""
+import argparse, json, os, random, tempfile, time, uuid
+
+SCRATCH = tempfile.mkdtemp()
+# Keep the shared generations counters out of the repo's data directory
+os.environ.setdefault("GENERATIONS_FILE", os.path.join(SCRATCH, ".generations"))
+
+from backend.authentication.repository import JsonUserRepository, SqliteUserRepository, migrate_json_to_sqlite
+from backend.authentication.token_store import RefreshTokenStore
+
+FAKE_HASH = "$2b$12$" + "x" * 53
+
+
+def make_users(n: int) -> list:
+    return [
+        {
+            "user_id": str(uuid.uuid4()),
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "hashed_password": FAKE_HASH,
+            "role": "user",
+            "penalties": [],
+            "refresh_tokens": [],
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_login(path: str, username: str) -> None:
+    with open(path) as f:
+        users = json.load(f)
+    user = next(u for u in users if u["username"] == username)
+    user["refresh_tokens"] = user.get("refresh_tokens", []) + [uuid.uuid4().hex]
+    with open(path, "w") as f:
+        json.dump(users, f, indent=4)
+
+
+def repo_login(repo, sessions: RefreshTokenStore, username: str) -> None:
+    user = repo.get_by_username(username)
+    sessions.issue(user["user_id"], uuid.uuid4().hex, time.time() + 7 * 24 * 3600)
+
+
+def run(label: str, fn, names: list) -> None:
+    start = time.perf_counter()
+    for name in names:
+        fn(name)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(names):>6} logins  {len(names) / elapsed:>10.1f} logins/s  {elapsed / len(names) * 1000:>9.3f} ms/login")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--logins", type=int, default=2_000)
+    parser.add_argument("--legacy-logins", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=SCRATCH) as tmp:
+        json_path = os.path.join(tmp, "users.json")
+        db_path = os.path.join(tmp, "users.db")
+        with open(json_path, "w") as f:
+            json.dump(make_users(args.users), f, indent=4)
+        migrate_json_to_sqlite(json_path, db_path)
+        sessions = RefreshTokenStore(os.path.join(tmp, "sessions.db"))
+
+        names = [f"user{random.randrange(args.users)}" for _ in range(args.logins)]
+        print(f"{args.users} users")
+        run("legacy", lambda n: legacy_login(json_path, n), names[: args.legacy_logins])
+        run("json", lambda n, repo=JsonUserRepository(json_path): repo_login(repo, sessions, n), names)
+        run("sqlite", lambda n, repo=SqliteUserRepository(db_path): repo_login(repo, sessions, n), names)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import os, threading, time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from backend.authentication.repository import sqlite_connection
+from backend.authentication.utils import SESSIONS_DB
+
+# Hourly buckets kept for the admin trend charts (one week by default)
+HISTORY_HOURS = int(os.getenv("DASHBOARD_HISTORY_HOURS", "168"))
+
+HISTORY_SERIES = ("registrations", "logins", "reviews")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dashboard_totals (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS dashboard_history (
+    series TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (series, hour)
+) WITHOUT ROWID;
+"""
+
+_ADD = (
+    "INSERT INTO dashboard_totals (name, value) VALUES (?1, max(0, ?2))"
+    " ON CONFLICT (name) DO UPDATE SET value = max(0, value + ?2)"
+)
+# Same, but only once the totals were seeded (seeding counts everything before it)
+_ADD_SEEDED = (
+    "INSERT INTO dashboard_totals (name, value)"
+    " SELECT ?1, max(0, ?2) WHERE EXISTS (SELECT 1 FROM dashboard_totals WHERE name = 'seeded')"
+    " ON CONFLICT (name) DO UPDATE SET value = max(0, value + ?2)"
+)
+
+
+class DashboardCounters:
+    """Admin dashboard figures maintained at write time.
+
+    The figures live in two small tables of the sessions database, so every
+    worker process adds to, and reads, the same totals. Totals are seeded
+    from the user repository and token store (one scan) at startup, then
+    register/login/logout/review routes adjust them, so reads are a handful
+    of primary-key rows. Events that arrive before the first seeding only
+    feed the history, since the seeding scan already includes them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = sqlite_connection(self._local, self.path)
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    @property
+    def seeded(self) -> bool:
+        return self._connect().execute("SELECT 1 FROM dashboard_totals WHERE name = 'seeded'").fetchone() is not None
+
+    def seed(self, users, token_store) -> None:
+        """Recompute the totals from the source of truth"""
+        all_users = users.all()
+        totals = {
+            "total_users": len(all_users),
+            "active_penalties": sum(len(u.get("penalties", [])) for u in all_users),
+            "active_sessions": token_store.count_active(),
+            "seeded": 1,
+        }
+        for user in all_users:
+            name = f"role:{user.get('role', 'user')}"
+            totals[name] = totals.get(name, 0) + 1
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # reviews_posted counts API posts since the tables were created; it has no other source
+            conn.execute("DELETE FROM dashboard_totals WHERE name != 'reviews_posted'")
+            conn.executemany("INSERT INTO dashboard_totals (name, value) VALUES (?, ?)", totals.items())
+
+    def _record(self, series: Optional[str], totals: Dict[str, int], seeded_only: bool = True) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if series is not None:
+                hour = int(time.time() // 3600)
+                conn.execute(
+                    "INSERT INTO dashboard_history (series, hour, count) VALUES (?, ?, 1)"
+                    " ON CONFLICT (series, hour) DO UPDATE SET count = count + 1",
+                    (series, hour),
+                )
+                conn.execute(
+                    "DELETE FROM dashboard_history WHERE series = ? AND hour <= ?", (series, hour - HISTORY_HOURS)
+                )
+            conn.executemany(_ADD_SEEDED if seeded_only else _ADD, totals.items())
+
+    def user_registered(self, role: str) -> None:
+        self._record("registrations", {"total_users": 1, f"role:{role}": 1})
+
+    def session_started(self, displaced: int = 0) -> None:
+        """A login; `displaced` older sessions were dropped by the session cap"""
+        self._record("logins", {"active_sessions": 1 - displaced})
+
+    def sessions_ended(self, n: int = 1) -> None:
+        self._record(None, {"active_sessions": -n})
+
+    def review_posted(self) -> None:
+        self._record("reviews", {"reviews_posted": 1}, seeded_only=False)
+
+    def snapshot(self, users=None, token_store=None) -> dict:
+        if not self.seeded and users is not None and token_store is not None:
+            self.seed(users, token_store)
+        totals = dict(self._connect().execute("SELECT name, value FROM dashboard_totals").fetchall())
+        return {
+            "total_users": totals.get("total_users", 0),
+            "users_by_role": {
+                name[len("role:"):]: value for name, value in totals.items() if name.startswith("role:") and value
+            },
+            "active_penalties": totals.get("active_penalties", 0),
+            "active_sessions": totals.get("active_sessions", 0),
+            "reviews_posted": totals.get("reviews_posted", 0),
+        }
+
+    def trends(self) -> dict:
+        first_hour = int(time.time() // 3600) - HISTORY_HOURS
+        points: Dict[str, List[dict]] = {series: [] for series in HISTORY_SERIES}
+        rows = self._connect().execute(
+            "SELECT series, hour, count FROM dashboard_history WHERE hour > ? ORDER BY series, hour", (first_hour,)
+        )
+        for series, hour, count in rows:
+            points.setdefault(series, []).append(
+                {"hour": datetime.fromtimestamp(hour * 3600, tz=timezone.utc).isoformat(), "count": count}
+            )
+        return points
+
+
+counters = DashboardCounters(SESSIONS_DB)
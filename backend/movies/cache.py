@@ -0,0 +1,155 @@
+import hashlib, json, os, threading, time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.app.coherence import generations
+from backend.app.metrics import timed
+
+# How long validated data is trusted before its files are stat'ed again. Writes
+# made through the app, in any worker, are seen at once through `generations`.
+CATALOG_REVALIDATE_SECONDS = float(os.getenv("CATALOG_REVALIDATE_SECONDS", "2"))
+
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int, int]]:
+    """(inode, mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class MovieCatalog:
+    """In-memory copy of every movie's metadata.json.
+
+    Entries are keyed by movie id (the folder name) and carry the stamp of the
+    metadata file they were parsed from, so a refresh only re-parses files
+    that were added, removed or modified since the last scan.
+    """
+
+    def __init__(self, data_path: Path):
+        self.data_path = data_path
+        self.version = 0
+        self.etag = ""  # digest of every metadata stamp, identical across worker processes
+        self.last_modified = 0.0  # newest metadata.json mtime, in seconds
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._movies: Dict[str, dict] = {}
+        self._stamps: Dict[str, Tuple[int, int, int]] = {}
+        self._ordered: List[dict] = []
+        self._checked_at: Optional[float] = None
+        self._generation_key = f"catalog:{os.path.abspath(data_path)}"
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        """True while the last scan is recent enough, and unchanged since, to skip re-validation"""
+        return (
+            self._checked_at is not None
+            and time.monotonic() - self._checked_at < CATALOG_REVALIDATE_SECONDS
+            and generations.current(self._generation_key) == self._generation
+        )
+
+    def _parse(self, movie_id: str) -> dict:
+        with open(self.data_path / movie_id / "metadata.json", "r", encoding="utf-8") as f:
+            return {"id": movie_id, "metadata": json.load(f)}
+
+    @timed("catalog.refresh")
+    def refresh(self, force: bool = False) -> bool:
+        """Re-scan the data directory and re-parse changed metadata files.
+
+        Returns True when the catalog contents changed.
+        """
+        with self._lock:
+            if not force and self.is_fresh():
+                self.hits += 1
+                return False
+            self.misses += 1
+            generation = generations.current(self._generation_key)
+
+            seen = {}
+            for movie_dir in self.data_path.iterdir():
+                if movie_dir.is_dir():
+                    stamp = file_stamp(movie_dir / "metadata.json")
+                    if stamp is not None:
+                        seen[movie_dir.name] = stamp
+
+            changed = False
+            for movie_id in list(self._movies):
+                if movie_id not in seen:
+                    del self._movies[movie_id]
+                    del self._stamps[movie_id]
+                    changed = True
+            for movie_id, stamp in seen.items():
+                if self._stamps.get(movie_id) != stamp:
+                    try:
+                        self._movies[movie_id] = self._parse(movie_id)
+                    except (FileNotFoundError, json.JSONDecodeError):
+                        # Removed or half-written between the stat and the read; retry next scan
+                        self._movies.pop(movie_id, None)
+                        self._stamps.pop(movie_id, None)
+                        continue
+                    self._stamps[movie_id] = stamp
+                    self.reloads += 1
+                    changed = True
+
+            if changed or self._checked_at is None:
+                self._ordered = [self._movies[k] for k in sorted(self._movies)]
+                self.version += 1
+                digest = hashlib.sha1()
+                for movie_id in sorted(self._stamps):
+                    _, mtime_ns, size = self._stamps[movie_id]
+                    digest.update(f"{movie_id}:{mtime_ns}:{size};".encode("utf-8"))
+                self.etag = digest.hexdigest()
+                self.last_modified = max((s[1] for s in self._stamps.values()), default=0) / 1e9
+            self._checked_at = time.monotonic()
+            self._generation = generation
+            return changed
+
+    def invalidate(self, movie_id: Optional[str] = None) -> None:
+        """Force the next access to re-validate (one movie, or the whole catalog)"""
+        with self._lock:
+            if movie_id is not None:
+                self._stamps.pop(movie_id, None)
+            self._checked_at = None
+
+    def seed(self, entries: Iterable[Tuple[dict, Tuple[int, int, int]]]) -> None:
+        """Pre-load (movie, stamp) pairs, e.g. from a snapshot.
+
+        The next refresh still stats every metadata file and re-parses the
+        ones whose stamp differs, so stale entries never survive it.
+        """
+        with self._lock:
+            for movie, stamp in entries:
+                self._movies[movie["id"]] = movie
+                self._stamps[movie["id"]] = tuple(stamp)
+            self._checked_at = None
+
+    def stamp(self, movie_id: str) -> Optional[Tuple[int, int, int]]:
+        """Stamp of the movie's metadata.json as of the last refresh"""
+        self.refresh()
+        return self._stamps.get(movie_id)
+
+    def all(self) -> List[dict]:
+        self.refresh()
+        return self._ordered
+
+    def versioned(self) -> Tuple[int, List[dict]]:
+        """(version, all()) taken together, so the list is exactly that version's"""
+        self.refresh()
+        with self._lock:
+            return self.version, self._ordered
+
+    def get(self, movie_id: str) -> Optional[dict]:
+        self.refresh()
+        return self._movies.get(movie_id)
+
+    def stats(self) -> dict:
+        return {
+            "movies": len(self._movies),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+        }
@@ -0,0 +1,49 @@
+import hashlib, os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+# Cache-Control per route group, overridable from the environment
+CACHE_CONTROL: Dict[str, str] = {
+    "catalog": os.getenv("CACHE_CONTROL_CATALOG", "public, max-age=60"),
+    "movie": os.getenv("CACHE_CONTROL_MOVIE", "public, max-age=300"),
+    "reviews": os.getenv("CACHE_CONTROL_REVIEWS", "public, max-age=0, must-revalidate"),
+}
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag for a data version made of the given parts"""
+    return '"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def validator_headers(route: str, etag: str, last_modified: float) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL[route]}
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Whether the request's validators still match (If-None-Match wins over If-Modified-Since)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def conditional(request: Request, response: Response, route: str, etag: str, last_modified: float) -> Optional[Response]:
+    """304 response if the client's copy is current; otherwise tags `response` and returns None"""
+    headers = validator_headers(route, etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
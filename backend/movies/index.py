@@ -0,0 +1,152 @@
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set
+
+from backend.movies.cache import MovieCatalog
+
+
+def _key(value: str) -> str:
+    return value.strip().casefold()
+
+
+class SortedColumn:
+    """Movie ids pre-sorted by one metadata field, in both directions.
+
+    Ties keep catalog order in either direction, matching a stable sort.
+    """
+
+    def __init__(self, pairs: List[tuple]):
+        # pairs: (value, catalog position, movie id)
+        asc = sorted(pairs, key=lambda p: (p[0], p[1]))
+        desc = sorted(pairs, key=lambda p: (_negate(p[0]), p[1]))
+        self.asc_keys = [p[0] for p in asc]
+        self.asc_ids = [p[2] for p in asc]
+        self.desc_keys = [_negate(p[0]) for p in desc]
+        self.desc_ids = [p[2] for p in desc]
+
+    def range(self, lo=None, hi=None, descending: bool = False) -> List[str]:
+        """Ids whose value lies in [lo, hi], found by bisection"""
+        if descending:
+            keys, ids = self.desc_keys, self.desc_ids
+            lo, hi = (None if hi is None else _negate(hi)), (None if lo is None else _negate(lo))
+        else:
+            keys, ids = self.asc_keys, self.asc_ids
+        start = 0 if lo is None else bisect_left(keys, lo)
+        stop = len(keys) if hi is None else bisect_right(keys, hi)
+        return ids[start:stop]
+
+
+def _negate(value):
+    # Descending order for numbers and ISO date strings alike
+    if isinstance(value, str):
+        return tuple(-ord(c) for c in value)
+    return -value
+
+
+class CatalogIndex:
+    """Secondary indexes over one version of the movie catalog"""
+
+    def __init__(self, movies: List[dict], version: int):
+        self.version = version
+        self.movies: Dict[str, dict] = {m["id"]: m for m in movies}
+        self.position: Dict[str, int] = {m["id"]: i for i, m in enumerate(movies)}
+        self.by_genre: Dict[str, Set[str]] = {}
+        self.by_director: Dict[str, Set[str]] = {}
+        self.by_star: Dict[str, Set[str]] = {}
+
+        ratings, dates, durations = [], [], []
+        for i, movie in enumerate(movies):
+            meta, movie_id = movie["metadata"], movie["id"]
+            for genre in meta.get("movieGenres", []):
+                self.by_genre.setdefault(_key(genre), set()).add(movie_id)
+            for director in meta.get("directors", []):
+                self.by_director.setdefault(_key(director), set()).add(movie_id)
+            for star in meta.get("mainStars", []):
+                self.by_star.setdefault(_key(star), set()).add(movie_id)
+            ratings.append((meta.get("movieIMDbRating", 0.0), i, movie_id))
+            dates.append((meta.get("datePublished", ""), i, movie_id))
+            durations.append((meta.get("duration", 0), i, movie_id))
+
+        self.rating = SortedColumn(ratings)
+        self.date = SortedColumn(dates)
+        self.duration = SortedColumn(durations)
+
+    def query(
+        self,
+        genre: Optional[str] = None,
+        director: Optional[str] = None,
+        star: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        min_duration: Optional[int] = None,
+        max_duration: Optional[int] = None,
+        sort_by: Optional[str] = None,
+        order: str = "asc",
+    ) -> List[dict]:
+        """Movies matching every filter, optionally sorted by rating or date.
+
+        The smallest available candidate source drives the scan (an inverted
+        index set, a bisected range, or a pre-sorted order when sorting); the
+        remaining constraints are O(1) checks per candidate.
+        """
+        sets = []
+        for value, index in ((genre, self.by_genre), (director, self.by_director), (star, self.by_star)):
+            if value:
+                sets.append(index.get(_key(value), set()))
+        sets.sort(key=len)
+        descending = order == "desc"
+        has_rating = min_rating is not None or max_rating is not None
+        has_duration = min_duration is not None or max_duration is not None
+
+        if sort_by == "rating":
+            driver: Iterable[str] = self.rating.range(min_rating, max_rating, descending)
+            has_rating = False
+        elif sort_by == "date":
+            driver = self.date.range(descending=descending)
+        elif sets:
+            driver = sorted(sets.pop(0), key=self.position.__getitem__)
+        elif has_rating:
+            driver = sorted(self.rating.range(min_rating, max_rating), key=self.position.__getitem__)
+            has_rating = False
+        elif has_duration:
+            driver = sorted(self.duration.range(min_duration, max_duration), key=self.position.__getitem__)
+            has_duration = False
+        else:
+            driver = self.movies.keys()
+
+        result = []
+        for movie_id in driver:
+            if any(movie_id not in s for s in sets):
+                continue
+            meta = self.movies[movie_id]["metadata"]
+            if has_rating:
+                rating = meta.get("movieIMDbRating", 0.0)
+                if (min_rating is not None and rating < min_rating) or (max_rating is not None and rating > max_rating):
+                    continue
+            if has_duration:
+                duration = meta.get("duration", 0)
+                if (min_duration is not None and duration < min_duration) or (max_duration is not None and duration > max_duration):
+                    continue
+            result.append(self.movies[movie_id])
+        return result
+
+
+class CatalogIndexCache:
+    """Rebuilds the CatalogIndex whenever the catalog version moves"""
+
+    def __init__(self, catalog: MovieCatalog):
+        self.catalog = catalog
+        self.rebuilds = 0
+        self._index: Optional[CatalogIndex] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> CatalogIndex:
+        version, movies = self.catalog.versioned()
+        index = self._index
+        if index is not None and index.version >= version:
+            return index
+        with self._lock:
+            if self._index is None or self._index.version < version:
+                self._index = CatalogIndex(movies, version)
+                self.rebuilds += 1
+            return self._index
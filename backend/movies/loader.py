@@ -0,0 +1,66 @@
+import asyncio, os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+# Threads doing file reads and parsing for the async routes
+DATA_IO_WORKERS = int(os.getenv("DATA_IO_WORKERS", "4"))
+
+
+class SingleFlight:
+    """Blocking data loads for async code, on a dedicated bounded thread pool.
+
+    load() coalesces concurrent calls with the same key: the first caller
+    starts the load and everyone arriving while it is in flight awaits the
+    same result, so a burst of cold requests for one movie parses its CSV
+    once. A waiter that is cancelled does not cancel the shared load.
+    run() just offloads a call without coalescing. Both must be awaited from
+    the event loop thread.
+    """
+
+    def __init__(self, workers: int = DATA_IO_WORKERS):
+        self.workers = workers
+        self.loads = 0
+        self.coalesced = 0
+        self.offloaded = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="data-io")
+        return self._executor
+
+    async def load(self, key: Hashable, fn: Callable, *args):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.loads += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, done: asyncio.Future) -> None:
+        if self._inflight.get(key) is done:
+            del self._inflight[key]
+        if not done.cancelled():
+            done.exception()  # retrieved, even if every waiter went away
+
+    async def run(self, fn: Callable, *args):
+        self.offloaded += 1
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": len(self._inflight),
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "offloaded": self.offloaded,
+        }
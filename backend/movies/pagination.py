@@ -0,0 +1,25 @@
+import base64, binascii, hashlib, json
+
+
+def encode_cursor(state: dict) -> str:
+    """Opaque, URL-safe cursor for the given scan state"""
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Inverse of encode_cursor; raises ValueError for anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(state, dict):
+        raise ValueError("Malformed cursor")
+    return state
+
+
+def query_fingerprint(**params) -> str:
+    """Short digest of the query parameters a cursor belongs to"""
+    raw = json.dumps(params, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
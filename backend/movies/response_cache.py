@@ -0,0 +1,92 @@
+import os, threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+# Total size of the cached JSON bodies; one body may take at most a quarter of it
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+
+class ResponseCache:
+    """Serialized JSON responses keyed by route and normalized parameters.
+
+    Each entry remembers the data version (ETag) it was rendered from and is
+    only served while that version is current, so a changed catalog or an
+    appended review is never answered from a stale body. A hit is returned
+    as a raw Response, skipping response_model validation and serialization.
+    """
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(route: str, **params: Any) -> Hashable:
+        """Cache key for a route; parameter order and dict filters don't matter"""
+        return (route,) + tuple(
+            (name, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+            for name, value in sorted(params.items())
+        )
+
+    def get(self, key: Hashable, version: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, version: str, body: bytes) -> None:
+        if len(body) > self.max_bytes // 4:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+            self._entries[key] = (version, body)
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def hit(self, key: Hashable, version: str, response: Response) -> Optional[Response]:
+        """The cached body as a raw Response (with `response`'s headers), or None"""
+        body = self.get(key, version)
+        if body is None:
+            return None
+        return Response(body, media_type="application/json", headers=dict(response.headers))
+
+    def render(
+        self, key: Hashable, version: str, model: Type[BaseModel], payload: dict, response: Response
+    ) -> Response:
+        """Validate and serialize `payload` once, cache the bytes and return them"""
+        body = model.model_validate(payload).model_dump_json().encode("utf-8")
+        self.put(key, version, body)
+        return Response(body, media_type="application/json", headers=dict(response.headers))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,638 @@
+import csv, fcntl, heapq, io, math, mmap, os, sys, threading, time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from backend.app.coherence import generations
+from backend.app.metrics import timed
+from backend.movies.cache import CATALOG_REVALIDATE_SECONDS, file_stamp
+from backend.movies.search import InvertedIndex, review_fields
+
+# Number of movies whose review columns are kept in memory at once
+REVIEW_CACHE_SIZE = int(os.getenv("REVIEW_CACHE_SIZE", "16"))
+
+# Rows filtered per batch when scanning with early termination
+SCAN_BLOCK = 256
+
+MISSING = -1  # sentinel for absent vote counts in the integer columns
+
+# Header names seen in movieReviews.csv, mapped to our field names. The second
+# spelling of each is the layout append_review_to_csv used to write.
+HEADER_FIELDS = {
+    "date of review": "date",
+    "date": "date",
+    "user": "user",
+    "usefulness vote": "usefulness_vote",
+    "usefulness_vote": "usefulness_vote",
+    "total votes": "total_votes",
+    "total_votes": "total_votes",
+    "user's rating out of 10": "rating",
+    "rating": "rating",
+    "review title": "title",
+    "title": "title",
+    "review": "review",
+}
+FIELDS = ["date", "user", "usefulness_vote", "total_votes", "rating", "title", "review"]
+# Header written to new movieReviews.csv files, same layout as the shipped data
+CSV_HEADER = ["Date of Review", "User", "Usefulness Vote", "Total Votes", "User's Rating out of 10", "Review Title", "Review"]
+
+_day_cache: Dict[str, int] = {}
+
+
+def parse_day(value: Optional[str]) -> int:
+    """Day ordinal of a review date ("31 March 2022" or ISO), 0 if unparsable"""
+    if not value:
+        return 0
+    day = _day_cache.get(value)
+    if day is None:
+        day = 0
+        for fmt in ("%d %B %Y", "%Y-%m-%d"):
+            try:
+                day = datetime.strptime(value.strip(), fmt).toordinal()
+                break
+            except ValueError:
+                pass
+        if len(_day_cache) < 100_000:
+            _day_cache[value] = day
+    return day
+
+
+def iso_day(value: str) -> int:
+    """Day ordinal of an ISO YYYY-MM-DD query parameter; raises ValueError"""
+    return date.fromisoformat(value).toordinal()
+
+
+def _to_int(value: Optional[str]) -> int:
+    try:
+        return int(value) if value else MISSING
+    except ValueError:
+        return MISSING
+
+
+def _to_float(value: Optional[str]) -> float:
+    try:
+        return float(value) if value else math.nan
+    except ValueError:
+        return math.nan
+
+
+def _ratio(useful: int, total: int) -> float:
+    return useful / total if useful != MISSING and total > 0 else math.nan
+
+
+def iter_records(f) -> Iterable[Tuple[int, bytes]]:
+    """Yield (offset, raw bytes) for each CSV record of a binary file.
+
+    A record ends at the first newline where its quote count is even, which
+    keeps multi-line quoted reviews together.
+    """
+    offset = f.tell()
+    parts: List[bytes] = []
+    quotes = 0
+    for line in iter(f.readline, b""):
+        parts.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            record = b"".join(parts)
+            yield offset, record
+            offset += len(record)
+            parts, quotes = [], 0
+    if parts:
+        yield offset, b"".join(parts)
+
+
+def parse_record(record: bytes) -> List[str]:
+    return next(csv.reader([record.decode("utf-8")]), [])
+
+
+def encode_row(row: List[str]) -> bytes:
+    """One CSV record, CRLF-terminated like the shipped files"""
+    buf = io.StringIO()
+    csv.writer(buf).writerow(row)
+    return buf.getvalue().encode("utf-8")
+
+
+# sort_by values of the reviews endpoint -> (ReviewColumns attribute, "no value" test)
+SORT_COLUMNS: Dict[str, Tuple[str, Callable[[float], bool]]] = {
+    "date": ("day", lambda v: v == 0),
+    "usefulness": ("usefulness", lambda v: v == MISSING),
+    "rating": ("rating", math.isnan),
+    "helpfulness": ("helpfulness", math.isnan),  # usefulness_vote / total_votes
+}
+
+
+class RowOrder:
+    """Row ids sorted by one column, kept sorted as rows are appended.
+
+    Rows are ordered by (value, row id). Rows without a value are kept
+    apart and always listed last, in row order. Appends are copy-on-write:
+    add() builds new arrays and swaps them in as one snapshot, so a view
+    keeps reading the arrays it was made from while rows are added.
+    """
+
+    def __init__(self, values: array, is_missing: Callable[[float], bool]):
+        self.is_missing = is_missing
+        pairs = sorted((v, i) for i, v in enumerate(values) if not is_missing(v))
+        # (keys, rows, missing), replaced as a whole by add()
+        self.snapshot: Tuple[array, array, array] = (
+            array(values.typecode, (v for v, _ in pairs)),
+            array("i", (i for _, i in pairs)),
+            array("i", (i for i, v in enumerate(values) if is_missing(v))),
+        )
+
+    def add(self, value, row: int) -> None:
+        """Insert a row; calls must be serialized by the caller (ReviewColumns' orders lock)"""
+        keys, rows, missing = self.snapshot
+        if self.is_missing(value):
+            missing = array("i", missing)
+            missing.append(row)
+        else:
+            # New rows have the highest id, so going after equal keys keeps (value, row) order
+            pos = bisect_right(keys, value)
+            keys, rows = array(keys.typecode, keys), array("i", rows)
+            keys.insert(pos, value)
+            rows.insert(pos, row)
+        self.snapshot = (keys, rows, missing)
+
+    def view(self, descending: bool = False, lo=None, hi=None) -> "OrderView":
+        """Rows in order; with lo/hi only those with lo <= value <= hi, found by bisection"""
+        keys, rows, missing = self.snapshot
+        start = 0 if lo is None else bisect_left(keys, lo)
+        stop = len(keys) if hi is None else bisect_right(keys, hi)
+        return OrderView(keys, rows, missing if lo is None and hi is None else None, start, max(start, stop), descending)
+
+
+class OrderView(Sequence):
+    """A slice of one RowOrder snapshot, in either direction, without copying it.
+
+    Descending is the exact reverse of (value, row id) order, which makes
+    (value, row id) of the last row served a stable keyset cursor even
+    while rows are being inserted.
+    """
+
+    def __init__(self, keys: array, rows: array, missing: Optional[array], start: int, stop: int, descending: bool):
+        self.keys = keys
+        self.rows = rows
+        self.missing = missing  # None when the view is bounded and so leaves them out
+        self.start = start
+        self.stop = stop
+        self.descending = descending
+
+    def __len__(self) -> int:
+        return self.stop - self.start + (len(self.missing) if self.missing is not None else 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            sorted_len = self.stop - self.start
+            out: List[int] = []
+            if start < sorted_len:
+                end = min(stop, sorted_len)
+                if self.descending:
+                    part = self.rows[self.stop - end : self.stop - start]
+                    part.reverse()
+                else:
+                    part = self.rows[self.start + start : self.start + end]
+                out = part.tolist()
+            if self.missing is not None and stop > sorted_len:
+                out.extend(self.missing[max(start, sorted_len) - sorted_len : stop - sorted_len])
+            return out
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("order view index out of range")
+        sorted_len = self.stop - self.start
+        if index >= sorted_len:
+            return self.missing[index - sorted_len]
+        if self.descending:
+            return self.rows[self.stop - 1 - index]
+        return self.rows[self.start + index]
+
+    def position_after(self, value, row: int) -> int:
+        """Index in this view of the first row after (value, row)"""
+        keys, rows = self.keys, self.rows
+        sorted_len = self.stop - self.start
+        if value is None:
+            return sorted_len + bisect_right(self.missing, row) if self.missing is not None else sorted_len
+        lo, hi = bisect_left(keys, value, self.start, self.stop), bisect_right(keys, value, self.start, self.stop)
+        if self.descending:
+            return self.stop - bisect_left(rows, row, lo, hi)
+        return bisect_right(rows, row, lo, hi) - self.start
+
+
+class ReviewColumns:
+    """Parse-once, column-oriented reviews of one movie.
+
+    Numbers live in typed arrays, user names and dates are interned, and
+    titles/review bodies stay on disk: each row only remembers the byte
+    offset and length of its CSV record, and text is decoded for the rows a
+    request actually returns. Records are read through a read-only mmap of
+    the CSV, so the bytes live in the OS page cache shared by all workers
+    rather than in each process.
+    """
+
+    def __init__(self, movie_id: str, path: Path):
+        self.movie_id = movie_id
+        self.path = path
+        self.stamp = None
+        self.generation: Optional[int] = None  # generations value when the stamp was last checked
+        self.checked_at = 0.0
+        self.positions: Dict[str, int] = {}
+        self.users: List[str] = []
+        self.dates: List[str] = []
+        self.day = array("i")
+        self.usefulness = array("i")
+        self.total_votes = array("i")
+        self.rating = array("d")
+        self.offsets = array("q")
+        self.lengths = array("i")
+        self._users_lower: Optional[List[str]] = None
+        self._helpfulness: Optional[array] = None
+        self._search: Optional[InvertedIndex] = None
+        self._search_lock = threading.Lock()
+        self._orders: Dict[str, RowOrder] = {}
+        self._orders_lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._map_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @classmethod
+    @timed("reviews.parse")
+    def load(cls, movie_id: str, path: Path) -> "ReviewColumns":
+        columns = cls(movie_id, path)
+        columns.stamp = file_stamp(path)
+        if columns.stamp is None:
+            return columns
+        with open(path, "rb") as f:
+            records = iter_records(f)
+            header = next(records, None)
+            if header is None:
+                return columns
+            columns.set_header(parse_record(header[1]))
+            for offset, record in records:
+                row = parse_record(record)
+                if row:
+                    columns.append_row(row, offset, len(record))
+        return columns
+
+    def set_header(self, header: List[str]) -> None:
+        for i, name in enumerate(header):
+            field = HEADER_FIELDS.get(name.strip().lower())
+            if field and field not in self.positions:
+                self.positions[field] = i
+
+    def _field(self, row: List[str], field: str) -> Optional[str]:
+        i = self.positions.get(field)
+        return row[i] if i is not None and i < len(row) else None
+
+    def append_row(self, row: List[str], offset: int, length: int) -> int:
+        """Add one parsed CSV row; returns its row number"""
+        raw_date = self._field(row, "date") or ""
+        self.dates.append(sys.intern(raw_date))
+        self.users.append(sys.intern(self._field(row, "user") or ""))
+        self.day.append(parse_day(raw_date))
+        self.usefulness.append(_to_int(self._field(row, "usefulness_vote")))
+        self.total_votes.append(_to_int(self._field(row, "total_votes")))
+        self.rating.append(_to_float(self._field(row, "rating")))
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        if self._users_lower is not None:
+            self._users_lower.append(self.users[-1].lower())
+        if self._helpfulness is not None:
+            self._helpfulness.append(_ratio(self.usefulness[-1], self.total_votes[-1]))
+        row_id = len(self.offsets) - 1
+        with self._orders_lock:
+            for sort_by, order in self._orders.items():
+                order.add(getattr(self, SORT_COLUMNS[sort_by][0])[row_id], row_id)
+        with self._search_lock:
+            if self._search is not None:
+                self._search.add(row_id, review_fields(self._field(row, "title") or "", self._field(row, "review") or ""))
+        return row_id
+
+    def search_index(self) -> InvertedIndex:
+        """Full-text index over review titles and bodies, built on first use"""
+        with self._search_lock:
+            if self._search is None:
+                index = InvertedIndex()
+                rows = list(range(len(self)))
+                for i, (title, body) in zip(rows, self.text(rows)):
+                    index.add(i, review_fields(title, body))
+                self._search = index
+            return self._search
+
+    def order_by(self, sort_by: str) -> RowOrder:
+        """Rows sorted by a SORT_COLUMNS key, built on first use and then kept current"""
+        with self._orders_lock:
+            order = self._orders.get(sort_by)
+            if order is None:
+                attribute, is_missing = SORT_COLUMNS[sort_by]
+                order = self._orders[sort_by] = RowOrder(getattr(self, attribute), is_missing)
+            return order
+
+    def sort_value(self, sort_by: str, row: int):
+        """The value `row` is sorted on, None if it has none"""
+        attribute, is_missing = SORT_COLUMNS[sort_by]
+        value = getattr(self, attribute)[row]
+        return None if is_missing(value) else value
+
+    @property
+    def search_ready(self) -> bool:
+        return self._search is not None
+
+    @property
+    def users_lower(self) -> List[str]:
+        if self._users_lower is None:
+            self._users_lower = [u.lower() for u in self.users]
+        return self._users_lower
+
+    @property
+    def helpfulness(self) -> array:
+        """usefulness_vote / total_votes per row, NaN without votes"""
+        if self._helpfulness is None:
+            self._helpfulness = array("d", map(_ratio, self.usefulness, self.total_votes))
+        return self._helpfulness
+
+    def most_useful(self, n: int) -> List[int]:
+        """Row ids of the `n` reviews with the most usefulness votes"""
+        usefulness = self.usefulness
+        return heapq.nlargest(n, range(len(self)), key=usefulness.__getitem__)
+
+    # --- Filters ---
+    def select(
+        self,
+        user: Optional[str] = None,
+        start_day: Optional[int] = None,
+        end_day: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        min_usefulness_vote: Optional[int] = None,
+        min_total_votes: Optional[int] = None,
+        rows: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        """Row numbers matching every given filter.
+
+        Rows come back in the order of `rows` (file order by default).
+        Each predicate runs over the typed column for the rows that survived
+        the previous one, so later passes only touch the remaining candidates.
+        NaN ratings and MISSING vote counts never match a bound.
+        """
+        rows = list(range(len(self))) if rows is None else list(rows)
+        if min_usefulness_vote is not None:
+            col, lo = self.usefulness, min_usefulness_vote
+            rows = [i for i in rows if col[i] != MISSING and col[i] >= lo]
+        if min_total_votes is not None:
+            col, lo = self.total_votes, min_total_votes
+            rows = [i for i in rows if col[i] != MISSING and col[i] >= lo]
+        if min_rating is not None:
+            col, lo = self.rating, min_rating
+            rows = [i for i in rows if col[i] >= lo]
+        if max_rating is not None:
+            col, hi = self.rating, max_rating
+            rows = [i for i in rows if col[i] <= hi]
+        if start_day is not None:
+            col = self.day
+            rows = [i for i in rows if col[i] and col[i] >= start_day]
+        if end_day is not None:
+            col = self.day
+            rows = [i for i in rows if col[i] and col[i] <= end_day]
+        if user:
+            col, needle = self.users_lower, user.lower()
+            rows = [i for i in rows if needle in col[i]]
+        return rows
+
+    def blocks(self, order: Sequence[int], start: int = 0, **filters) -> Iterator[Tuple[int, Sequence[int], List[int]]]:
+        """Walk `order` from index `start` in SCAN_BLOCK batches.
+
+        Yields (block start index, block, matching rows of the block) so
+        callers can stop as soon as they have enough matches.
+        """
+        for pos in range(max(start, 0), len(order), SCAN_BLOCK):
+            block = order[pos : pos + SCAN_BLOCK]
+            yield pos, block, self.select(rows=block, **filters)
+
+    def scan(
+        self, order: Sequence[int], start: int = 0, skip: int = 0, limit: int = 50, **filters
+    ) -> Tuple[List[int], Optional[int]]:
+        """Up to `limit` matching rows of `order`, after skipping `skip` matches.
+
+        Returns the rows and the index in `order` to resume from, or None
+        when the scan reached the end of `order`.
+        """
+        need = skip + limit
+        matched: List[int] = []
+        if limit <= 0:
+            return matched, None
+        for pos, block, hits in self.blocks(order, start, **filters):
+            if len(matched) + len(hits) < need:
+                matched.extend(hits)
+                continue
+            taken = hits[: need - len(matched)]
+            matched.extend(taken)
+            resume = pos + list(block).index(taken[-1]) + 1
+            return matched[skip:], (resume if resume < len(order) else None)
+        return matched[skip:], None
+
+    # --- Materialization ---
+    def mapped(self, end: int) -> mmap.mmap:
+        """Read-only map of the CSV covering at least its first `end` bytes.
+
+        The file only grows by appends, so a map that is too short is replaced
+        by a new one; the old map is released once no reader holds it.
+        """
+        with self._map_lock:
+            if self._map is None or len(self._map) < end:
+                with open(self.path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map
+
+    @timed("reviews.text")
+    def text(self, rows: List[int]) -> List[Tuple[str, str]]:
+        """(title, review) for the given rows, decoded from the mapped CSV on demand"""
+        out = []
+        if not rows:
+            return out
+        offsets, lengths = self.offsets, self.lengths
+        data = self.mapped(max(offsets[i] + lengths[i] for i in rows))
+        for i in rows:
+            start = offsets[i]
+            row = parse_record(data[start : start + lengths[i]])
+            out.append((self._field(row, "title") or "", self._field(row, "review") or ""))
+        return out
+
+    def to_dicts(self, rows: List[int]) -> List[dict]:
+        texts = self.text(rows)
+        reviews = []
+        for i, (title, body) in zip(rows, texts):
+            usefulness, total, rating = self.usefulness[i], self.total_votes[i], self.rating[i]
+            reviews.append({
+                "date": self.dates[i],
+                "user": self.users[i],
+                "usefulness_vote": None if usefulness == MISSING else usefulness,
+                "total_votes": None if total == MISSING else total,
+                "rating": None if math.isnan(rating) else rating,
+                "title": title,
+                "review": body,
+            })
+        return reviews
+
+
+class ReviewStore:
+    """LRU cache of ReviewColumns, re-parsed when the CSV's stamp changes.
+
+    Cached columns are trusted without a stat while the CSV's generation is
+    unchanged, which every append (from any worker process) bumps, and are
+    re-stat'ed at least every CATALOG_REVALIDATE_SECONDS for edits made
+    outside the app.
+    """
+
+    def __init__(self, data_path: Path, max_movies: int = REVIEW_CACHE_SIZE):
+        self.data_path = data_path
+        self.max_movies = max_movies
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Called as fn(movie_id, columns, new_row_ids) after rows are appended
+        self.on_append: List[Callable[[str, "ReviewColumns", List[int]], None]] = []
+        self.snapshot = None  # compiled Snapshot consulted before parsing a CSV
+        self._cache: "OrderedDict[str, ReviewColumns]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, movie_id: str) -> Path:
+        return self.data_path / movie_id / "movieReviews.csv"
+
+    def generation_key(self, movie_id: str) -> str:
+        return f"reviews:{os.path.abspath(self.path(movie_id))}"
+
+    def _current(self, movie_id: str) -> Optional[ReviewColumns]:
+        generation = generations.current(self.generation_key(movie_id))
+        with self._lock:
+            columns = self._cache.get(movie_id)
+        if columns is None:
+            return None
+        if columns.generation == generation and time.monotonic() - columns.checked_at < CATALOG_REVALIDATE_SECONDS:
+            return columns
+        if columns.stamp != file_stamp(self.path(movie_id)):
+            return None
+        columns.generation, columns.checked_at = generation, time.monotonic()
+        return columns
+
+    def peek(self, movie_id: str) -> Optional[ReviewColumns]:
+        """Cached columns if they are still current, without loading anything"""
+        columns = self._current(movie_id)
+        if columns is not None:
+            with self._lock:
+                if self._cache.get(movie_id) is columns:
+                    self._cache.move_to_end(movie_id)
+                self.hits += 1
+        return columns
+
+    def stamp(self, movie_id: str) -> Optional[Tuple[int, int, int]]:
+        """Stamp of the movie's CSV, taken from the cached columns while they are current"""
+        columns = self._current(movie_id)
+        return columns.stamp if columns is not None else file_stamp(self.path(movie_id))
+
+    def load(self, movie_id: str) -> ReviewColumns:
+        """Fresh columns from the snapshot or the CSV, bypassing (and not filling) the cache"""
+        path = self.path(movie_id)
+        columns = self.snapshot.columns(movie_id, path) if self.snapshot is not None else None
+        return columns if columns is not None else ReviewColumns.load(movie_id, path)
+
+    def get(self, movie_id: str) -> ReviewColumns:
+        columns = self.peek(movie_id)
+        if columns is not None:
+            return columns
+        with self._lock:
+            self.misses += 1
+
+        generation = generations.current(self.generation_key(movie_id))
+        columns = self.load(movie_id)
+        columns.generation, columns.checked_at = generation, time.monotonic()
+        with self._lock:
+            self._cache[movie_id] = columns
+            self._cache.move_to_end(movie_id)
+            while len(self._cache) > self.max_movies:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return columns
+
+    @timed("reviews.append")
+    def append_many(self, movie_id: str, reviews: List[dict], fsync: bool = True) -> List[int]:
+        """Append review rows to the movie's CSV in one locked write.
+
+        The file is held under an exclusive flock for the write so rows from
+        other threads or worker processes never interleave, and is fsync'ed
+        before returning when `fsync` is set. Cached columns (and their search
+        index) are extended in place; if another process appended since they
+        were loaded, they are re-parsed first while the lock is held.
+        Returns the row numbers of the new reviews.
+        """
+        columns = self.get(movie_id)
+        path = self.path(movie_id)
+        with open(path, "ab") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                st = os.fstat(f.fileno())
+                if columns.stamp != (st.st_ino, st.st_mtime_ns, st.st_size):
+                    columns = ReviewColumns.load(movie_id, path)
+
+                chunks = []
+                if st.st_size == 0:
+                    chunks.append(encode_row(CSV_HEADER))
+                    columns.set_header(CSV_HEADER)
+                offset = st.st_size + sum(len(c) for c in chunks)
+
+                # Write fields in the order this file's header declares them
+                order = sorted(columns.positions, key=columns.positions.__getitem__)
+                rows = []
+                for review in reviews:
+                    row = ["" if review.get(field) is None else str(review[field]) for field in order]
+                    rows.append(row)
+                    chunks.append(encode_row(row))
+                spans = [len(c) for c in chunks[len(chunks) - len(rows):]]
+
+                f.write(b"".join(chunks))
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+                st = os.fstat(f.fileno())
+
+                # Still under the flock, so no other writer can slip in between
+                with self._lock:
+                    row_ids = []
+                    for row, length in zip(rows, spans):
+                        row_ids.append(columns.append_row(row, offset, length))
+                        offset += length
+                    columns.stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+                    self._cache[movie_id] = columns
+                    self._cache.move_to_end(movie_id)
+                # Other workers' cached columns for this movie are now stale
+                columns.generation = generations.bump(self.generation_key(movie_id))
+                columns.checked_at = time.monotonic()
+                for listener in self.on_append:
+                    listener(movie_id, columns, row_ids)
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return row_ids
+
+    def invalidate(self, movie_id: Optional[str] = None) -> None:
+        with self._lock:
+            if movie_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(movie_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "movies": len(self._cache),
+            "rows": sum(len(c) for c in self._cache.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
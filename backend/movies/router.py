@@ -1,63 +1,233 @@
-from fastapi import APIRouter, HTTPException, Query, Depends, status
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from backend.movies import schemas
 from backend.movies import utils as movie_utils
+from backend.movies.pagination import decode_cursor, encode_cursor, query_fingerprint
+from backend.movies.http_cache import conditional
+from backend.movies.reviews import SORT_COLUMNS, OrderView
+from backend.movies.similar import SIMILAR_TOP_K
+from backend.app.ratelimit import admission, rate_limited
 from backend.authentication.security import get_current_user
 from backend.authentication import utils as auth_utils
-import uuid
-from datetime import datetime
+from backend.dashboard.counters import counters
+import asyncio, json
 
 router = APIRouter(prefix="/movies", tags=["movies"])
 
+# sort_by values served from the per-movie review aggregates
+AGGREGATE_SORTS = {
+    "review_count": "rows",
+    "user_rating": "mean",
+    "usefulness": "usefulness_votes",
+}
+
+def render(model, payload: dict, response: Optional[Response] = None) -> Response:
+    """Validate and serialize a payload (keeping `response`'s headers); run it on data_io so
+    large bodies aren't built on the event loop"""
+    headers = dict(response.headers) if response is not None else None
+    return Response(model.model_validate(payload).model_dump_json(), media_type="application/json", headers=headers)
+
+def aggregate_order(movies: list, field: str, order: Optional[str]) -> list:
+    """Movies ordered by a review aggregate; may parse review CSVs, so run it on data_io"""
+    keyed = [(getattr(movie_utils.review_stats.get(m["id"]), field), m) for m in movies]
+    # Movies without rated reviews sort last in either direction
+    keyed.sort(key=lambda km: (km[0] is None, (km[0] or 0) * (-1 if order == "desc" else 1)))
+    return [m for _, m in keyed]
+
 @router.get("/", response_model=schemas.MovieListResponse)
-def get_movies(
+async def get_movies(
+    request: Request,
+    response: Response,
     genre: Optional[str] = None,
+    director: Optional[str] = None,
+    star: Optional[str] = None,
     min_rating: Optional[float] = None,
     max_rating: Optional[float] = None,
-    sort_by: Optional[str] = Query(None, enum=["rating", "date"]),
+    min_duration: Optional[int] = None,  # minutes
+    max_duration: Optional[int] = None,
+    sort_by: Optional[str] = Query(None, enum=["rating", "date"] + list(AGGREGATE_SORTS)),
     order: Optional[str] = Query("asc", enum=["asc", "desc"])
 ):
-    movies = movie_utils.load_movies()
+    await movie_utils.refresh_catalog_async()
+    # Aggregate sorts also depend on every review file, so they are neither validated nor cached
+    if sort_by not in AGGREGATE_SORTS:
+        etag, last_modified = await movie_utils.catalog_version_async()
+        not_modified = conditional(request, response, "catalog", etag, last_modified)
+        if not_modified:
+            return not_modified
+        key = movie_utils.response_cache.key(
+            "movies", genre=genre, director=director, star=star, min_rating=min_rating,
+            max_rating=max_rating, min_duration=min_duration, max_duration=max_duration,
+            sort_by=sort_by, order=order,
+        )
+        cached = movie_utils.response_cache.hit(key, etag, response)
+        if cached:
+            return cached
+
+    def build():
+        movies = movie_utils.catalog_index.get().query(
+            genre=genre,
+            director=director,
+            star=star,
+            min_rating=min_rating,
+            max_rating=max_rating,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            sort_by=None if sort_by in AGGREGATE_SORTS else sort_by,
+            order=order,
+        )
+        if sort_by in AGGREGATE_SORTS:
+            return render(schemas.MovieListResponse, {"movies": aggregate_order(movies, AGGREGATE_SORTS[sort_by], order)})
+        return movie_utils.response_cache.render(key, etag, schemas.MovieListResponse, {"movies": movies}, response)
+
+    # Querying and rendering run on data_io, off the event loop
+    return await movie_utils.data_io.run(build)
+
+@router.post("/batch", response_model=schemas.MovieBatchResponse)
+async def get_movies_batch(batch: schemas.MovieBatchRequest):
+    """Several movies in one round trip, optionally with their most useful reviews and aggregates"""
+    await movie_utils.refresh_catalog_async()
+    movies, missing = [], []
+    for movie_id in dict.fromkeys(batch.ids):
+        movie = movie_utils.catalog.get(movie_id)
+        if movie:
+            movies.append(movie)
+        else:
+            missing.append(movie_id)
+
+    ids = [m["id"] for m in movies]
+    columns = await asyncio.gather(*map(movie_utils.get_reviews_async, ids)) if batch.reviews else []
+    aggregates = await asyncio.gather(*map(movie_utils.get_review_stats_async, ids)) if batch.stats else []
+
+    def build():
+        items = []
+        for n, movie in enumerate(movies):
+            item = {"movie": movie}
+            if batch.reviews:
+                item["reviews"] = columns[n].to_dicts(columns[n].most_useful(batch.reviews))
+            if batch.stats:
+                item["stats"] = aggregates[n].to_dict()
+            items.append(item)
+        return items
+
+    return await movie_utils.data_io.run(
+        lambda: render(schemas.MovieBatchResponse, {"movies": build(), "missing": missing})
+    )
+
+@router.get("/reviews/by-user/{username}", response_model=schemas.UserReviewListResponse)
+async def get_reviews_by_user(
+    username: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=schemas.MAX_PAGE_SIZE),
+):
+    """One user's reviews across every movie, newest first"""
+    await movie_utils.refresh_catalog_async()
+    entries = await movie_utils.data_io.load(("by-user", username.casefold()), movie_utils.user_reviews.lookup, username)
+    page = entries[skip : skip + limit]
 
-    # Filter
-    if genre:
-        movies = [m for m in movies if genre in m["metadata"]["movieGenres"]]
-    if min_rating is not None:
-        movies = [m for m in movies if m["metadata"]["movieIMDbRating"] >= min_rating]
-    if max_rating is not None:
-        movies = [m for m in movies if m["metadata"]["movieIMDbRating"] <= max_rating]
+    by_movie: dict = {}
+    for movie_id, row in page:
+        by_movie.setdefault(movie_id, []).append(row)
+    columns = dict(zip(by_movie, await asyncio.gather(*map(movie_utils.get_reviews_async, by_movie))))
 
-    # Sort
-    if sort_by == "rating":
-        movies.sort(key=lambda m: m["metadata"]["movieIMDbRating"], reverse=(order=="desc"))
-    elif sort_by == "date":
-        movies.sort(key=lambda m: m["metadata"]["datePublished"], reverse=(order=="desc"))
+    def build():
+        texts = {}
+        for movie_id, rows in by_movie.items():
+            rows = [r for r in rows if r < len(columns[movie_id])]
+            texts.update({(movie_id, r): d for r, d in zip(rows, columns[movie_id].to_dicts(rows))})
+        reviews = [dict(texts[e], movie_id=e[0]) for e in page if e in texts]
+        return render(schemas.UserReviewListResponse, {"username": username, "total": len(entries), "reviews": reviews})
 
-    return {"movies": movies}
+    return await movie_utils.data_io.run(build)
 
 @router.get("/{movie_id}", response_model=schemas.Movie)
-def get_movie(movie_id: str):
+async def get_movie(movie_id: str, request: Request, response: Response):
+    await movie_utils.refresh_catalog_async()
+    version = await movie_utils.movie_version_async(movie_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    not_modified = conditional(request, response, "movie", *version)
+    if not_modified:
+        return not_modified
     movie = movie_utils.get_movie_by_id(movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
     return movie
 
+@router.get("/{movie_id}/similar", response_model=schemas.SimilarMoviesResponse)
+async def get_similar_movies(
+    movie_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(10, ge=1, le=SIMILAR_TOP_K),
+):
+    """Movies sharing the most genres, directors, creators and stars, closest in rating first"""
+    await movie_utils.refresh_catalog_async()
+    etag, last_modified = await movie_utils.catalog_version_async()
+    if movie_utils.get_movie_by_id(movie_id) is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    not_modified = conditional(request, response, "catalog", etag, last_modified)
+    if not_modified:
+        return not_modified
+    top = await movie_utils.get_similar_async(movie_id) or []
+
+    def build():
+        similar = []
+        for other, score in top[:limit]:
+            movie = movie_utils.catalog.get(other)
+            if movie is not None:
+                similar.append({"movie": movie, "score": score})
+        return render(schemas.SimilarMoviesResponse, {"movie_id": movie_id, "similar": similar}, response)
+
+    return await movie_utils.data_io.run(build)
+
+@router.get("/{movie_id}/stats", response_model=schemas.MovieStats)
+async def get_movie_stats(movie_id: str, request: Request, response: Response):
+    """Review count, rating distribution and activity for one movie"""
+    await movie_utils.refresh_catalog_async()
+    version = await movie_utils.reviews_version_async(movie_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    not_modified = conditional(request, response, "reviews", *version)
+    if not_modified:
+        return not_modified
+    return (await movie_utils.get_review_stats_async(movie_id)).to_dict()
+
 @router.get("/search/", response_model=schemas.MovieListResponse)
-def search_movies(
-    title: Optional[str] = None,
-    rating: Optional[float] = None
+async def search_movies(
+    request: Request,
+    response: Response,
+    q: Optional[str] = None,  # full text: title, description, directors, stars
+    title: Optional[str] = None,  # case-insensitive substring of the title
+    rating: Optional[float] = None,
+    prefix: bool = False,  # treat the last word of q as a prefix (type-ahead)
+    limit: Optional[int] = Query(None, ge=1, le=schemas.MAX_PAGE_SIZE)
 ):
-    movies = movie_utils.load_movies()
-    if title:
-        movies = [m for m in movies if title.lower() in m["metadata"]["title"].lower()]
-    if rating is not None:
-        movies = [m for m in movies if m["metadata"]["movieIMDbRating"] >= rating]
-    return {"movies": movies}
+    await movie_utils.refresh_catalog_async()
+    etag, last_modified = await movie_utils.catalog_version_async()
+    not_modified = conditional(request, response, "catalog", etag, last_modified)
+    if not_modified:
+        return not_modified
+    key = movie_utils.response_cache.key("search", q=q, title=title, rating=rating, prefix=prefix, limit=limit)
+    cached = movie_utils.response_cache.hit(key, etag, response)
+    if cached:
+        return cached
 
-# --- NEW: Reviews route ---
-@router.get("/{movie_id}/reviews", response_model=schemas.ReviewListResponse)
-def get_reviews(
-    movie_id: str,
+    def build():
+        movies = movie_utils.catalog_search.search(q, prefix=prefix) if q else movie_utils.load_movies()
+        if title:
+            movies = [m for m in movies if title.lower() in m["metadata"]["title"].lower()]
+        if rating is not None:
+            movies = [m for m in movies if m["metadata"]["movieIMDbRating"] >= rating]
+        if limit is not None:
+            movies = movies[:limit]
+        return movie_utils.response_cache.render(key, etag, schemas.MovieListResponse, {"movies": movies}, response)
+
+    # BM25 scoring and rendering run on data_io, off the event loop
+    return await movie_utils.data_io.run(build)
+
+async def review_filters(
     user: Optional[str] = None,
     start_date: Optional[str] = None,  # ISO format: YYYY-MM-DD
     end_date: Optional[str] = None,
@@ -65,39 +235,232 @@ def get_reviews(
     max_rating: Optional[float] = None,
     min_usefulness_vote: Optional[int] = None,
     min_total_votes: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 50  # default max number of reviews returned
+) -> dict:
+    """Review filter query parameters, as ReviewColumns.select keyword arguments"""
+    try:
+        start_day = movie_utils.iso_day(start_date) if start_date else None
+        end_day = movie_utils.iso_day(end_date) if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    return {
+        "user": user,
+        "start_day": start_day,
+        "end_day": end_day,
+        "min_rating": min_rating,
+        "max_rating": max_rating,
+        "min_usefulness_vote": min_usefulness_vote,
+        "min_total_votes": min_total_votes,
+    }
+
+def sort_direction(sort_by: Optional[str], order: Optional[str]) -> bool:
+    """True to list descending. Without sort_by there is no column for `order` to apply to: 400"""
+    if order is not None and not sort_by:
+        raise HTTPException(status_code=400, detail="order requires sort_by")
+    return order != "asc"
+
+def listing_sort(q: Optional[str], sort_by: Optional[str], filters: dict) -> Optional[str]:
+    """The column reviews are listed by: sort_by, else date for a date range without q"""
+    if sort_by or q:
+        return sort_by
+    if filters.get("start_day") is not None or filters.get("end_day") is not None:
+        return "date"  # the range is a slice of the date order; file order would need a sort per request
+    return None
+
+def review_order(
+    columns, index, q: Optional[str], prefix: bool, sort_by: Optional[str] = None, descending: bool = False,
+    filters: Optional[dict] = None,
 ):
-    movie = movie_utils.get_movie_by_id(movie_id)
-    if not movie:
+    """Row ids in the order reviews are listed, and the filters still left to apply.
+
+    Best match first for q (searched in `index`, the columns' search index),
+    by sort_by when given, by date (ascending) for a date range, file order
+    otherwise. Date bounds (and rating bounds when sorting by rating) are
+    answered by bisecting the column's sorted order rather than testing
+    every row. CPU-bound: run it on data_io.
+    """
+    filters = dict(filters or {})
+    listed_by = listing_sort(q, sort_by, filters)
+    if listed_by != sort_by:
+        sort_by, descending = listed_by, False
+    hits = None
+    if q:
+        hits = [row for row, _ in index.search(q, prefix=prefix)]
+        if not sort_by:
+            return hits, filters
+    if sort_by:
+        lo = hi = None
+        if sort_by == "date":
+            lo, hi = filters.pop("start_day", None), filters.pop("end_day", None)
+        elif sort_by == "rating":
+            lo, hi = filters.pop("min_rating", None), filters.pop("max_rating", None)
+        view = columns.order_by(sort_by).view(descending, lo, hi)
+        if hits is not None:
+            wanted = set(hits)
+            return [row for row in view[:] if row in wanted], filters
+        return view, filters
+    return range(len(columns)), filters
+
+def read_cursor(cursor: str, fingerprint: str) -> dict:
+    """Decoded cursor state; 400 unless it was issued for the same query"""
+    try:
+        state = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if state.get("f") != fingerprint:
+        raise HTTPException(status_code=400, detail="Cursor does not match this query")
+    return state
+
+def cursor_start(rows, state: Optional[dict]) -> int:
+    """Index in `rows` (a review_order result) to resume a cursor from"""
+    if state is None:
+        return 0
+    try:
+        # Sorted orders resume after the last (value, row) served, so inserts don't shift pages
+        return rows.position_after(*state["k"]) if isinstance(rows, OrderView) else int(state["p"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def review_page(columns, order, start: int, skip: int, limit: int, filters: dict):
+    rows, resume = columns.scan(order, start=start, skip=skip, limit=limit, **filters)
+    return columns.to_dicts(rows), resume, (rows[-1] if rows else None)
+
+# --- NEW: Reviews route ---
+@router.get("/{movie_id}/reviews", response_model=schemas.ReviewListResponse)
+async def get_reviews(
+    movie_id: str,
+    request: Request,
+    response: Response,
+    q: Optional[str] = None,  # full-text search over review title and text, best match first
+    prefix: bool = False,
+    filters: dict = Depends(review_filters),
+    sort_by: Optional[str] = Query(None, enum=list(SORT_COLUMNS)),
+    order: Optional[str] = Query(None, enum=["asc", "desc"]),  # with sort_by; desc (newest / most useful first) by default
+    cursor: Optional[str] = None,  # next_cursor of the previous page
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=schemas.MAX_PAGE_SIZE)  # default max number of reviews returned
+):
+    await movie_utils.refresh_catalog_async()
+    version = await movie_utils.reviews_version_async(movie_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    # Answered before the review columns are loaded or any row is scanned
+    not_modified = conditional(request, response, "reviews", *version)
+    if not_modified:
+        return not_modified
+    key = movie_utils.response_cache.key(
+        "reviews", movie_id=movie_id, q=q, prefix=prefix, filters=filters, sort_by=sort_by, order=order,
+        cursor=cursor, skip=skip, limit=limit,
+    )
+    cached = movie_utils.response_cache.hit(key, version[0], response)
+    if cached:
+        return cached
+
+    descending = sort_direction(sort_by, order)
+    # A cursor only continues the query it was issued for
+    fingerprint = query_fingerprint(q=q, prefix=prefix, filters=filters, sort_by=sort_by, order=order)
+    state = None
+    if cursor:
+        state = read_cursor(cursor, fingerprint)
+        skip = 0
+
+    columns = await movie_utils.get_reviews_async(movie_id)
+    index = await movie_utils.get_search_index_async(columns) if q else None
+
+    def build():
+        rows, remaining = review_order(columns, index, q, prefix, sort_by, descending, filters)
+        start = cursor_start(rows, state)
+
+        # Filters + pagination, stopping once the page is full
+        reviews, resume, last = review_page(columns, rows, start, skip, limit, remaining)
+        next_cursor = None
+        if resume is not None:
+            if isinstance(rows, OrderView):
+                value = columns.sort_value(listing_sort(q, sort_by, filters), last)
+                cursor_state = {"k": [value, last], "f": fingerprint}
+            else:
+                cursor_state = {"p": resume, "f": fingerprint}
+            next_cursor = encode_cursor(cursor_state)
+        payload = {"reviews": reviews, "next_cursor": next_cursor}
+        return movie_utils.response_cache.render(key, version[0], schemas.ReviewListResponse, payload, response)
+
+    # Ordering, scanning, reading text and rendering all run on data_io, off the event loop
+    return await movie_utils.data_io.run(build)
+
+
+@router.get("/{movie_id}/reviews/top", response_model=schemas.ReviewListResponse)
+async def top_reviews(
+    movie_id: str,
+    request: Request,
+    response: Response,
+    by: str = Query("helpfulness", enum=list(SORT_COLUMNS)),
+    order: str = Query("desc", enum=["asc", "desc"]),  # asc for the least helpful / lowest rated
+    n: int = Query(10, ge=1, le=schemas.MAX_TOP_REVIEWS),
+    filters: dict = Depends(review_filters),
+):
+    """The n highest (or lowest) ranked reviews by helpfulness ratio, useful votes, rating or date.
+
+    Read off the movie's sorted order of that column, which is kept current
+    as reviews are written, so the cost does not grow with the number of
+    reviews unless the filters reject most of them.
+    """
+    await movie_utils.refresh_catalog_async()
+    version = await movie_utils.reviews_version_async(movie_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Movie not found")
+    not_modified = conditional(request, response, "reviews", *version)
+    if not_modified:
+        return not_modified
+    key = movie_utils.response_cache.key("top_reviews", movie_id=movie_id, by=by, order=order, n=n, filters=filters)
+    cached = movie_utils.response_cache.hit(key, version[0], response)
+    if cached:
+        return cached
 
-    reviews = movie_utils.load_reviews(movie_id)
+    columns = await movie_utils.get_reviews_async(movie_id)
 
-    # --- Filters ---
-    if user:
-        reviews = [r for r in reviews if r["user"] and user.lower() in r["user"].lower()]
-    if start_date:
-        reviews = [r for r in reviews if r["date"] and r["date"] >= start_date]
-    if end_date:
-        reviews = [r for r in reviews if r["date"] and r["date"] <= end_date]
-    if min_rating is not None:
-        reviews = [r for r in reviews if r["rating"] is not None and r["rating"] >= min_rating]
-    if max_rating is not None:
-        reviews = [r for r in reviews if r["rating"] is not None and r["rating"] <= max_rating]
-    if min_usefulness_vote is not None:
-        reviews = [r for r in reviews if r["usefulness_vote"] is not None and r["usefulness_vote"] >= min_usefulness_vote]
-    if min_total_votes is not None:
-        reviews = [r for r in reviews if r["total_votes"] is not None and r["total_votes"] >= min_total_votes]
+    def build():
+        rows, remaining = review_order(columns, None, None, False, by, order == "desc", filters)
+        reviews, _, _ = review_page(columns, rows, 0, 0, n, remaining)
+        payload = {"reviews": reviews, "next_cursor": None}
+        return movie_utils.response_cache.render(key, version[0], schemas.ReviewListResponse, payload, response)
 
-    # --- Pagination ---
-    reviews = reviews[skip : skip + limit]
+    return await movie_utils.data_io.run(build)
 
-    return {"reviews": reviews}
 
+@router.get("/{movie_id}/reviews/export")
+async def export_reviews(
+    movie_id: str,
+    q: Optional[str] = None,
+    prefix: bool = False,
+    filters: dict = Depends(review_filters),
+    sort_by: Optional[str] = Query(None, enum=list(SORT_COLUMNS)),
+    order: Optional[str] = Query(None, enum=["asc", "desc"]),  # with sort_by, as on /reviews
+    cursor: Optional[str] = None,  # a next_cursor of the same query on /reviews: export the rest
+):
+    """Every matching review as NDJSON, streamed one batch at a time"""
+    descending = sort_direction(sort_by, order)
+    fingerprint = query_fingerprint(q=q, prefix=prefix, filters=filters, sort_by=sort_by, order=order)
+    state = read_cursor(cursor, fingerprint) if cursor else None
+    movie = await movie_utils.get_movie_async(movie_id)
+    if not movie:
+        raise HTTPException(status_code=404, detail="Movie not found")
+
+    columns = await movie_utils.get_reviews_async(movie_id)
+    index = await movie_utils.get_search_index_async(columns) if q else None
+    rows_order, filters = await movie_utils.data_io.run(
+        review_order, columns, index, q, prefix, sort_by, descending, filters
+    )
+    start = cursor_start(rows_order, state)
+
+    def lines():
+        for _, _, rows in columns.blocks(rows_order, start, **filters):
+            if rows:
+                yield "".join(json.dumps(r) + "\n" for r in columns.to_dicts(rows))
 
-@router.post("/{movie_id}/reviews")
-def add_review(
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/{movie_id}/reviews", dependencies=[Depends(rate_limited("review_write"))])
+async def add_review(
     movie_id: str,
     review_data: dict,
     current_user: dict = Depends(get_current_user)
@@ -107,8 +470,8 @@ def add_review(
     Requires authentication.
     """
 
-    users = auth_utils.load_users()
-    user = next((u for u in users if u['user_id'] == current_user.user_id), None)
+    admission.check("review_write", "user", current_user.user_id)
+    user = await movie_utils.data_io.run(auth_utils.get_user_repository().get_by_id, current_user.user_id)
 
     # Extract review fields from request
     rating = review_data.get("rating")
@@ -121,14 +484,18 @@ def add_review(
             detail="Missing required fields: rating, review_title, review_text"
         )
 
-    # Append review to movie's CSV
-    new_review = movie_utils.append_review_to_csv(
+    if not await movie_utils.get_movie_async(movie_id):
+        raise HTTPException(status_code=404, detail="Movie not found")
+
+    # Append review to movie's CSV; returns once the group commit is on disk
+    new_review = await movie_utils.append_review_async(
         movie_id=movie_id,
         username=user["username"],
         rating=rating,
         title=title,
         review_text=review_text
     )
+    await movie_utils.data_io.run(counters.review_posted)
 
     return {
         "message": "Review added successfully",
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class MovieMetadata(BaseModel):
@@ -24,6 +24,25 @@ class Movie(BaseModel):
 class MovieListResponse(BaseModel):
     movies: List[Movie]
 
+class SimilarMovie(BaseModel):
+    movie: Movie
+    score: float  # 0..1, shared genres and people, scaled down by the rating gap
+
+class SimilarMoviesResponse(BaseModel):
+    movie_id: str
+    similar: List[SimilarMovie]  # most similar first
+
+class MovieStats(BaseModel):
+    movie_id: str
+    review_count: int
+    rated_count: int
+    mean_rating: Optional[float]
+    median_rating: Optional[float]
+    rating_histogram: Dict[str, int]  # rounded rating (0-10) -> number of reviews, empty buckets left out
+    total_usefulness_votes: int
+    total_votes: int
+    reviews_per_month: Dict[str, int]  # "YYYY-MM" -> number of reviews
+
 # --- Reviews ---
 class Review(BaseModel):
     date: str
@@ -34,8 +53,38 @@ class Review(BaseModel):
     title: str
     review: str
 
+# Largest page a listing returns; /reviews/export streams a whole listing
+MAX_PAGE_SIZE = 1000
+
 class ReviewListResponse(BaseModel):
     reviews: List[Review]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+class UserReview(Review):
+    movie_id: str
+
+class UserReviewListResponse(BaseModel):
+    username: str
+    total: int  # reviews by this user across the catalog
+    reviews: List[UserReview]
+
+# --- Batch ---
+MAX_BATCH_MOVIES = 100
+MAX_TOP_REVIEWS = 100
+
+class MovieBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_MOVIES)
+    reviews: int = Field(0, ge=0, le=50)  # most useful reviews to include per movie
+    stats: bool = False  # include each movie's review aggregates
+
+class MovieBatchItem(BaseModel):
+    movie: Movie
+    reviews: Optional[List[Review]] = None
+    stats: Optional[MovieStats] = None
+
+class MovieBatchResponse(BaseModel):
+    movies: List[MovieBatchItem]  # in request order, duplicates dropped
+    missing: List[str] = []  # requested ids that are not in the catalog
 
 class ReviewCreate(BaseModel):
     movie_id: str
@@ -0,0 +1,199 @@
+import math, re, threading
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from backend.movies.cache import MovieCatalog
+
+TOKEN_RE = re.compile(r"\w+")
+PHRASE_RE = re.compile(r'"([^"]*)"')
+MAX_PREFIX_EXPANSIONS = 50
+FIELD_GAP = 100  # position gap between fields so phrases never span two of them
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.casefold())
+
+
+class InvertedIndex:
+    """Positional inverted index with BM25 ranking.
+
+    postings[term][doc] is [weighted term frequency, positions]; field
+    weights are folded into the frequency so a title hit counts more than a
+    description hit.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[Hashable, list]] = {}
+        self.doc_len: Dict[Hashable, float] = {}
+        self.doc_terms: Dict[Hashable, List[str]] = {}
+        self.terms: List[str] = []  # sorted vocabulary, for prefix lookups
+        self.total_len = 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, doc: Hashable, fields: Sequence[Tuple[str, float]]) -> None:
+        if doc in self.doc_len:
+            self.remove(doc)
+        position, length, terms = 0, 0.0, []
+        for text, weight in fields:
+            for token in tokenize(text or ""):
+                entry = self.postings.get(token)
+                if entry is None:
+                    entry = self.postings[token] = {}
+                    insort(self.terms, token)
+                posting = entry.get(doc)
+                if posting is None:
+                    posting = entry[doc] = [0.0, []]
+                    terms.append(token)
+                posting[0] += weight
+                posting[1].append(position)
+                position += 1
+                length += weight
+            position += FIELD_GAP
+        self.doc_len[doc] = length
+        self.doc_terms[doc] = terms
+        self.total_len += length
+
+    def remove(self, doc: Hashable) -> None:
+        for term in self.doc_terms.pop(doc, []):
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            entry.pop(doc, None)
+            if not entry:
+                del self.postings[term]
+                i = bisect_left(self.terms, term)
+                if i < len(self.terms) and self.terms[i] == term:
+                    del self.terms[i]
+        self.total_len -= self.doc_len.pop(doc, 0.0)
+
+    def expand(self, prefix: str) -> List[str]:
+        """Vocabulary terms starting with prefix"""
+        i = bisect_left(self.terms, prefix)
+        out = []
+        while i < len(self.terms) and self.terms[i].startswith(prefix) and len(out) < MAX_PREFIX_EXPANSIONS:
+            out.append(self.terms[i])
+            i += 1
+        return out
+
+    def _bm25(self, term: str, scores: Dict[Hashable, float], docs: Optional[set] = None) -> None:
+        entry = self.postings.get(term, {})
+        n = len(self.doc_len)
+        idf = math.log(1 + (n - len(entry) + 0.5) / (len(entry) + 0.5))
+        avg = self.total_len / n if n else 0.0
+        for doc, (tf, _) in entry.items():
+            if docs is not None and doc not in docs:
+                continue
+            norm = 1 - B + B * (self.doc_len[doc] / avg if avg else 0.0)
+            scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + K1 * norm)
+
+    def _phrase_docs(self, tokens: List[str]) -> set:
+        """Docs containing the tokens at consecutive positions"""
+        entries = [self.postings.get(t) for t in tokens]
+        if not entries or any(e is None for e in entries):
+            return set()
+        docs = set(entries[0])
+        for e in entries[1:]:
+            docs &= e.keys()
+        matched = set()
+        for doc in docs:
+            starts = set(entries[0][doc][1])
+            for offset, e in enumerate(entries[1:], 1):
+                starts &= {p - offset for p in e[doc][1]}
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc)
+        return matched
+
+    def search(self, query: str, prefix: bool = False, limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """Docs matching every query term, best BM25 score first.
+
+        Quoted parts of the query must match as phrases. With prefix=True
+        the last term also matches any vocabulary word it starts (type-ahead).
+        """
+        phrases = [tokenize(p) for p in PHRASE_RE.findall(query)]
+        terms = tokenize(PHRASE_RE.sub(" ", query))
+
+        groups: List[List[str]] = [[t] for p in phrases for t in p] + [[t] for t in terms]
+        if not groups:
+            return []
+        if prefix and terms:
+            groups[-1] = self.expand(terms[-1]) or groups[-1]
+
+        # Every group has to match: intersect candidate docs, smallest first
+        candidates = None
+        for group in sorted(groups, key=lambda g: sum(len(self.postings.get(t, {})) for t in g)):
+            docs = set()
+            for t in group:
+                docs.update(self.postings.get(t, {}))
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return []
+        for phrase in phrases:
+            if len(phrase) > 1:
+                candidates &= self._phrase_docs(phrase)
+
+        scores: Dict[Hashable, float] = {}
+        for group in groups:
+            for t in group:
+                self._bm25(t, scores, candidates)
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        return ranked[:limit] if limit is not None else ranked
+
+
+def movie_fields(movie: dict) -> List[Tuple[str, float]]:
+    meta = movie["metadata"]
+    return [
+        (meta.get("title", ""), 3.0),
+        (" ".join(meta.get("directors", [])), 2.0),
+        (" ".join(meta.get("mainStars", [])), 2.0),
+        (meta.get("description", ""), 1.0),
+    ]
+
+
+def review_fields(title: str, body: str) -> List[Tuple[str, float]]:
+    return [(title, 2.0), (body, 1.0)]
+
+
+class CatalogSearch:
+    """Full-text index over the movie catalog.
+
+    Kept in step with the catalog incrementally: only movies whose cached
+    entry was replaced since the last sync are re-indexed.
+    """
+
+    def __init__(self, catalog: MovieCatalog):
+        self.catalog = catalog
+        self.text = InvertedIndex()
+        self._indexed: Dict[str, dict] = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def sync(self) -> None:
+        """Re-index movies added, changed or removed since the last call"""
+        version, movies = self.catalog.versioned()
+        if self._version is not None and version <= self._version:
+            return
+        with self._lock:
+            if self._version is not None and version <= self._version:
+                return
+            current = {m["id"]: m for m in movies}
+            for movie_id in list(self._indexed):
+                if movie_id not in current:
+                    self.text.remove(movie_id)
+                    del self._indexed[movie_id]
+            for movie_id, movie in current.items():
+                if self._indexed.get(movie_id) is not movie:
+                    self.text.add(movie_id, movie_fields(movie))
+                    self._indexed[movie_id] = movie
+            self._version = version
+
+    def search(self, query: str, prefix: bool = False, limit: Optional[int] = None) -> List[dict]:
+        self.sync()
+        return [self._indexed[doc] for doc, _ in self.text.search(query, prefix, limit)]
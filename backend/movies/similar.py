@@ -0,0 +1,174 @@
+import heapq, math, os, threading
+from typing import Dict, List, Optional, Tuple
+
+from backend.movies.cache import MovieCatalog
+
+# Neighbours computed and kept per movie; GET /movies/{id}/similar serves up to this many
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "50"))
+
+# metadata field -> (feature prefix, weight before IDF)
+FEATURE_FIELDS = {
+    "movieGenres": ("genre", 1.0),
+    "directors": ("director", 2.0),
+    "creators": ("creator", 1.5),
+    "mainStars": ("star", 1.5),
+}
+RATING_WEIGHT = 0.2  # a 10-point rating gap scales the shared-feature score by 0.8
+
+
+def _features(meta: dict) -> Dict[str, float]:
+    features: Dict[str, float] = {}
+    for field, (prefix, weight) in FEATURE_FIELDS.items():
+        for value in meta.get(field) or []:
+            key = f"{prefix}:{value.strip().casefold()}"
+            features[key] = max(features.get(key, 0.0), weight)
+    return features
+
+
+class SimilarMovies:
+    """Nearest neighbours of every movie by shared genres and people, and rating.
+
+    Each movie is a sparse vector of TF-IDF weighted features (genres,
+    directors, creators, stars), L2-normalised, so the dot product of two
+    vectors is their cosine similarity. Vectors are also kept as postings
+    (feature -> {movie: weight}), so one movie's scores against the whole
+    catalog are accumulated from the postings of its own features only. Each
+    score is then scaled down by the rating gap. The top SIMILAR_TOP_K are
+    cached per movie.
+
+    When the catalog changes, only movies whose metadata changed are
+    re-encoded, and only cached neighbour lists that share a feature with
+    them are dropped. IDF weights are recomputed by a full rebuild once more
+    than a tenth of the catalog changed since the last one.
+    """
+
+    def __init__(self, catalog: MovieCatalog, k: int = SIMILAR_TOP_K):
+        self.catalog = catalog
+        self.k = k
+        self.version: Optional[int] = None
+        self.rebuilds = 0
+        self.updates = 0
+        self.hits = 0
+        self.misses = 0
+        self._movies: Dict[str, dict] = {}  # the catalog entries the vectors were built from
+        self._vectors: Dict[str, Dict[str, float]] = {}
+        self._ratings: Dict[str, float] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._idf: Dict[str, float] = {}
+        self._built_size = 0
+        self._changed_since_build = 0
+        self._top: Dict[str, List[Tuple[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def _encode(self, movie: dict) -> None:
+        meta = movie["metadata"]
+        default_idf = math.log(1 + max(1, self._built_size))  # unseen since the last rebuild: rare
+        vector = {f: w * self._idf.get(f, default_idf) for f, w in _features(meta).items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vector = {f: w / norm for f, w in vector.items()}
+        movie_id = movie["id"]
+        self._movies[movie_id] = movie
+        self._vectors[movie_id] = vector
+        self._ratings[movie_id] = float(meta.get("movieIMDbRating") or 0.0)
+        for feature, weight in vector.items():
+            self._postings.setdefault(feature, {})[movie_id] = weight
+
+    def _drop(self, movie_id: str) -> None:
+        for feature in self._vectors.pop(movie_id, {}):
+            posting = self._postings[feature]
+            del posting[movie_id]
+            if not posting:
+                del self._postings[feature]
+        self._movies.pop(movie_id, None)
+        self._ratings.pop(movie_id, None)
+
+    def _forget_neighbours(self, movie_id: str) -> None:
+        # Cached lists that could gain, lose or re-rank movie_id
+        self._top.pop(movie_id, None)
+        for feature in self._vectors.get(movie_id, {}):
+            for other in self._postings[feature]:
+                self._top.pop(other, None)
+
+    def _rebuild(self, movies: List[dict]) -> None:
+        df: Dict[str, int] = {}
+        for movie in movies:
+            for feature in _features(movie["metadata"]):
+                df[feature] = df.get(feature, 0) + 1
+        self._idf = {f: math.log(1 + len(movies) / n) for f, n in df.items()}
+        self._built_size = len(movies)
+        self._changed_since_build = 0
+        self._movies, self._vectors, self._ratings, self._postings, self._top = {}, {}, {}, {}, {}
+        for movie in movies:
+            self._encode(movie)
+        self.rebuilds += 1
+
+    def sync(self) -> None:
+        """Catch up with the catalog; cheap when its version has not moved"""
+        version, movies = self.catalog.versioned()
+        if self.version is not None and version <= self.version:
+            return
+        with self._lock:
+            if self.version is not None and version <= self.version:
+                return
+            current = {m["id"]: m for m in movies}
+            # The catalog re-parses a changed metadata.json into a new dict, so identity is enough
+            changed = [i for i, m in current.items() if self._movies.get(i) is not m]
+            changed += [i for i in self._movies if i not in current]
+            self._changed_since_build += len(changed)
+            if self.version is None or self._changed_since_build * 10 > max(self._built_size, 1):
+                self._rebuild(movies)
+            else:
+                for movie_id in changed:
+                    self._forget_neighbours(movie_id)
+                    self._drop(movie_id)
+                    if movie_id in current:
+                        self._encode(current[movie_id])
+                        self._forget_neighbours(movie_id)
+                    self.updates += 1
+            self.version = version
+
+    def peek(self, movie_id: str) -> Optional[List[Tuple[str, float]]]:
+        """Cached neighbours if the catalog has not changed since, without computing anything"""
+        if self.version != self.catalog.version:
+            return None
+        top = self._top.get(movie_id)
+        if top is not None:
+            self.hits += 1
+        return top
+
+    def neighbours(self, movie_id: str) -> Optional[List[Tuple[str, float]]]:
+        """Up to k (movie id, score) pairs, most similar first; None for an unknown movie"""
+        self.sync()
+        with self._lock:
+            top = self._top.get(movie_id)
+            if top is not None:
+                self.hits += 1
+                return top
+            vector = self._vectors.get(movie_id)
+            if vector is None:
+                return None
+            self.misses += 1
+            scores: Dict[str, float] = {}
+            for feature, weight in vector.items():
+                for other, other_weight in self._postings[feature].items():
+                    scores[other] = scores.get(other, 0.0) + weight * other_weight
+            scores.pop(movie_id, None)
+            rating = self._ratings[movie_id]
+            ratings = self._ratings
+            for other in scores:
+                scores[other] *= 1 - RATING_WEIGHT * min(1.0, abs(ratings[other] - rating) / 10)
+            top = heapq.nlargest(self.k, scores.items(), key=lambda item: item[1])
+            top = [(other, round(score, 4)) for other, score in top]
+            self._top[movie_id] = top
+            return top
+
+    def stats(self) -> dict:
+        return {
+            "movies": len(self._vectors),
+            "features": len(self._postings),
+            "cached": len(self._top),
+            "rebuilds": self.rebuilds,
+            "updates": self.updates,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,236 @@
+"""Compiled binary snapshot of the imdb_reviews dataset.
+
+    python -m backend.movies.snapshot compile [--data PATH] [--out PATH]
+    python -m backend.movies.snapshot bench [--data PATH] [--snapshot PATH]
+
+A snapshot holds the movie catalog, every movie's typed review columns and
+a pool of the user names and review dates they reference. The API loads it
+at startup instead of parsing metadata.json files and CSVs. Each entry keeps
+the stamp of the file it was compiled from, and entries whose file changed
+since are ignored (that movie is parsed from the raw files as before), so a
+stale snapshot is never served. Review titles and bodies are not copied:
+rows still point at their CSV record by byte offset.
+"""
+import argparse, json, mmap, os, struct, sys, tempfile, time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.movies.cache import MovieCatalog, file_stamp
+from backend.movies.reviews import ReviewColumns
+
+MAGIC = b"IMDBSNAP"
+SNAPSHOT_FORMAT = 1
+_PREFIX = struct.Struct("<8sII")  # magic, format, header length
+
+# ReviewColumns arrays copied as-is; users and dates are stored as pool ids
+NUMERIC_COLUMNS = ("day", "usefulness", "total_votes", "rating", "offsets", "lengths")
+
+
+class _Writer:
+    """Snapshot body being assembled: 8-byte aligned array sections plus a string pool"""
+
+    def __init__(self):
+        self.body = bytearray()
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def string_id(self, value: str) -> int:
+        i = self._ids.get(value)
+        if i is None:
+            i = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+        return i
+
+    def section(self, values: array) -> list:
+        self.body.extend(b"\0" * (-len(self.body) % 8))
+        start = len(self.body)
+        self.body.extend(values.tobytes())
+        return [values.typecode, start, len(values)]
+
+    def pool(self) -> dict:
+        encoded = [s.encode("utf-8") for s in self.strings]
+        ends = array("q")
+        total = 0
+        for b in encoded:
+            total += len(b)
+            ends.append(total)
+        return {"ends": self.section(ends), "blob": self.section(array("B", b"".join(encoded)))}
+
+
+def compile_snapshot(data_path: Path, out_path: Path) -> dict:
+    """Parse the dataset once and write it to `out_path` atomically; returns a summary"""
+    catalog = MovieCatalog(data_path)
+    catalog.refresh(force=True)
+    writer = _Writer()
+    movies, reviews = [], {}
+    for movie in catalog.all():
+        movie_id = movie["id"]
+        movies.append({"movie": movie, "stamp": catalog.stamp(movie_id)})
+        columns = ReviewColumns.load(movie_id, data_path / movie_id / "movieReviews.csv")
+        if columns.stamp is None:
+            continue
+        sections = {name: writer.section(getattr(columns, name)) for name in NUMERIC_COLUMNS}
+        sections["users"] = writer.section(array("i", (writer.string_id(u) for u in columns.users)))
+        sections["dates"] = writer.section(array("i", (writer.string_id(d) for d in columns.dates)))
+        reviews[movie_id] = {
+            "stamp": columns.stamp,
+            "positions": columns.positions,
+            "rows": len(columns),
+            "sections": sections,
+        }
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "created": time.time(),
+        "catalog": movies,
+        "reviews": reviews,
+        "strings": writer.pool(),
+    }).encode("utf-8")
+
+    fd, tmp = tempfile.mkstemp(dir=out_path.parent, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, SNAPSHOT_FORMAT, len(header)))
+            f.write(header)
+            f.write(b"\0" * (-(_PREFIX.size + len(header)) % 8))
+            f.write(writer.body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return {"movies": len(movies), "review_files": len(reviews), "rows": sum(r["rows"] for r in reviews.values()),
+            "strings": len(writer.strings), "bytes": out_path.stat().st_size}
+
+
+class Snapshot:
+    """A compiled snapshot, memory-mapped read-only"""
+
+    def __init__(self, path: Path, header: dict, data: mmap.mmap, body: int):
+        self.path = path
+        self.header = header
+        self.loaded = 0  # review columns served from the snapshot
+        self.stale = 0  # review files that changed since it was compiled
+        self._data = data
+        self._body = body
+        self._strings: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["Snapshot"]:
+        """The snapshot at `path`, or None if it is missing or not in this format"""
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        if len(data) < _PREFIX.size:
+            return None
+        magic, fmt, size = _PREFIX.unpack_from(data)
+        if magic != MAGIC or fmt != SNAPSHOT_FORMAT:
+            return None
+        try:
+            header = json.loads(data[_PREFIX.size : _PREFIX.size + size])
+        except ValueError:
+            return None
+        if header.get("byteorder") != sys.byteorder:
+            return None
+        body = _PREFIX.size + size
+        return cls(path, header, data, body + (-body % 8))
+
+    def _array(self, section: list) -> array:
+        typecode, start, count = section
+        values = array(typecode)
+        start += self._body
+        values.frombytes(self._data[start : start + count * values.itemsize])
+        return values
+
+    @property
+    def strings(self) -> List[str]:
+        if self._strings is None:
+            ends = self._array(self.header["strings"]["ends"])
+            blob = self._array(self.header["strings"]["blob"]).tobytes()
+            strings, start = [], 0
+            for end in ends:
+                strings.append(sys.intern(blob[start:end].decode("utf-8")))
+                start = end
+            self._strings = strings
+        return self._strings
+
+    def catalog_entries(self) -> Iterable[Tuple[dict, Tuple[int, int, int]]]:
+        return ((entry["movie"], tuple(entry["stamp"])) for entry in self.header["catalog"])
+
+    def columns(self, movie_id: str, path: Path) -> Optional[ReviewColumns]:
+        """The movie's review columns if its CSV is unchanged since compile time"""
+        entry = self.header["reviews"].get(movie_id)
+        if entry is None:
+            return None
+        stamp = file_stamp(path)
+        if stamp is None or tuple(entry["stamp"]) != stamp:
+            self.stale += 1
+            return None
+        columns = ReviewColumns(movie_id, path)
+        columns.stamp = stamp
+        columns.positions = dict(entry["positions"])
+        sections = entry["sections"]
+        for name in NUMERIC_COLUMNS:
+            setattr(columns, name, self._array(sections[name]))
+        strings = self.strings
+        columns.users = [strings[i] for i in self._array(sections["users"])]
+        columns.dates = [strings[i] for i in self._array(sections["dates"])]
+        self.loaded += 1
+        return columns
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "created": self.header["created"],
+            "review_files": len(self.header["reviews"]),
+            "loaded": self.loaded,
+            "stale": self.stale,
+        }
+
+
+def cold_start(data_path: Path, snapshot: Optional[Snapshot]) -> float:
+    """Seconds to build the catalog and every movie's review columns from scratch"""
+    started = time.perf_counter()
+    catalog = MovieCatalog(data_path)
+    if snapshot is not None:
+        catalog.seed(snapshot.catalog_entries())
+    catalog.refresh(force=True)
+    for movie in catalog.all():
+        path = data_path / movie["id"] / "movieReviews.csv"
+        if snapshot is None or snapshot.columns(movie["id"], path) is None:
+            ReviewColumns.load(movie["id"], path)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    from backend.movies import utils
+
+    parser = argparse.ArgumentParser(description="Compile or benchmark the dataset snapshot")
+    parser.add_argument("command", choices=["compile", "bench"])
+    parser.add_argument("--data", type=Path, default=utils.DATA_PATH, help="imdb_reviews directory")
+    parser.add_argument("--out", "--snapshot", dest="snapshot", type=Path, default=utils.SNAPSHOT_PATH,
+                        help="snapshot file")
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        started = time.perf_counter()
+        summary = compile_snapshot(args.data, args.snapshot)
+        print(f"Wrote {args.snapshot} in {time.perf_counter() - started:.2f}s: {summary}")
+        return
+
+    snapshot = Snapshot.open(args.snapshot)
+    raw = cold_start(args.data, None)
+    print(f"raw files: {raw * 1000:.1f} ms")
+    if snapshot is None:
+        print(f"no usable snapshot at {args.snapshot}; run the compile command first")
+        return
+    snap = cold_start(args.data, Snapshot.open(args.snapshot))
+    print(f"snapshot:  {snap * 1000:.1f} ms ({raw / snap:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
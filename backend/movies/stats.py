@@ -0,0 +1,118 @@
+import math, threading, weakref
+from datetime import date
+from typing import Dict, List, Optional
+
+from backend.movies.cache import file_stamp
+from backend.movies.reviews import MISSING, ReviewColumns, ReviewStore
+
+
+class ReviewAggregate:
+    """Running totals over one movie's reviews; each added review is O(1)"""
+
+    def __init__(self, movie_id: str):
+        self.movie_id = movie_id
+        self.stamp = None  # stamp of the CSV these totals cover
+        self.source: Optional[weakref.ref] = None  # the ReviewColumns they were built from
+        self.rows = 0  # how many rows of `source` have been added
+        self.rated = 0
+        self.rating_sum = 0.0
+        self.histogram = [0] * 11  # index = rating rounded to 0..10
+        self.usefulness_votes = 0
+        self.total_votes = 0
+        self.per_month: Dict[str, int] = {}
+
+    def add(self, columns: ReviewColumns, i: int) -> None:
+        rating = columns.rating[i]
+        if not math.isnan(rating):
+            self.rated += 1
+            self.rating_sum += rating
+            self.histogram[min(10, max(0, int(round(rating))))] += 1
+        if columns.usefulness[i] != MISSING:
+            self.usefulness_votes += columns.usefulness[i]
+        if columns.total_votes[i] != MISSING:
+            self.total_votes += columns.total_votes[i]
+        day = columns.day[i]
+        if day:
+            month = date.fromordinal(day).strftime("%Y-%m")
+            self.per_month[month] = self.per_month.get(month, 0) + 1
+        self.rows += 1
+
+    def catch_up(self, columns: ReviewColumns) -> None:
+        for i in range(self.rows, len(columns)):
+            self.add(columns, i)
+        self.stamp = columns.stamp
+
+    @property
+    def mean(self) -> Optional[float]:
+        return round(self.rating_sum / self.rated, 2) if self.rated else None
+
+    @property
+    def median(self) -> Optional[float]:
+        """Median rating, read off the histogram"""
+        if not self.rated:
+            return None
+        middle = [(self.rated - 1) // 2, self.rated // 2]
+        values, seen = [], 0
+        for rating, n in enumerate(self.histogram):
+            while middle and middle[0] < seen + n:
+                values.append(rating)
+                middle.pop(0)
+            seen += n
+        return sum(values) / 2
+
+    def to_dict(self) -> dict:
+        return {
+            "movie_id": self.movie_id,
+            "review_count": self.rows,
+            "rated_count": self.rated,
+            "mean_rating": self.mean,
+            "median_rating": self.median,
+            "rating_histogram": {str(r): n for r, n in enumerate(self.histogram) if n},
+            "total_usefulness_votes": self.usefulness_votes,
+            "total_votes": self.total_votes,
+            "reviews_per_month": dict(sorted(self.per_month.items())),
+        }
+
+
+class AggregateStore:
+    """Per-movie ReviewAggregates, kept for every movie once computed.
+
+    Aggregates outlive the ReviewStore's LRU: while the CSV stamp is unchanged
+    they are served without touching the review columns. New rows written
+    through the store are folded in as they are appended.
+    """
+
+    def __init__(self, store: ReviewStore):
+        self.store = store
+        self.rebuilds = 0
+        self._aggregates: Dict[str, ReviewAggregate] = {}
+        self._lock = threading.Lock()
+        store.on_append.append(self._on_append)
+
+    def _on_append(self, movie_id: str, columns: ReviewColumns, rows: List[int]) -> None:
+        with self._lock:
+            agg = self._aggregates.get(movie_id)
+            if agg is not None and agg.source is not None and agg.source() is columns:
+                agg.catch_up(columns)
+
+    def peek(self, movie_id: str) -> Optional[ReviewAggregate]:
+        """The aggregate if it covers the CSV as it is now, without loading anything"""
+        agg = self._aggregates.get(movie_id)
+        if agg is not None and agg.stamp == file_stamp(self.store.path(movie_id)):
+            return agg
+        return None
+
+    def get(self, movie_id: str) -> ReviewAggregate:
+        agg = self.peek(movie_id)
+        if agg is not None:
+            return agg
+        columns = self.store.get(movie_id)
+        with self._lock:
+            agg = self._aggregates.get(movie_id)
+            if agg is None or agg.source is None or agg.source() is not columns:
+                agg = ReviewAggregate(movie_id)
+                agg.source = weakref.ref(columns)
+                self._aggregates[movie_id] = agg
+                self.rebuilds += 1
+            agg.catch_up(columns)
+            return agg
@@ -0,0 +1,196 @@
+import threading
+from array import array
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from backend.app.coherence import generations
+from backend.movies.cache import MovieCatalog
+from backend.movies.reviews import ReviewColumns, ReviewStore
+
+# Appends queued for the index before the oldest are dropped (their movies are re-indexed instead)
+USER_INDEX_PENDING = 10000
+
+
+class _Index:
+    """The index proper; built and changed by UserReviewIndex"""
+
+    def __init__(self):
+        self.movie_ids: List[str] = []
+        self.movie_no: Dict[str, int] = {}
+        self.by_user: Dict[str, Tuple[array, array, array]] = {}
+        self.movie_users: Dict[str, Set[str]] = {}
+        self.covered: Dict[str, Tuple[int, int]] = {}  # movie -> (reviews generation, rows indexed)
+
+    def number(self, movie_id: str) -> int:
+        no = self.movie_no.get(movie_id)
+        if no is None:
+            no = self.movie_no[movie_id] = len(self.movie_ids)
+            self.movie_ids.append(movie_id)
+        return no
+
+    def add(self, movie_id: str, entries: List[Tuple[str, int, int]]) -> None:
+        """Index (user, day, row id) entries of one movie"""
+        no = self.number(movie_id)
+        users = self.movie_users.setdefault(movie_id, set())
+        for user, day, row in entries:
+            key = user.casefold()
+            entry = self.by_user.get(key)
+            if entry is None:
+                entry = self.by_user[key] = (array("i"), array("i"), array("i"))
+            entry[0].append(day)
+            entry[1].append(no)
+            entry[2].append(row)
+            users.add(key)
+
+    def remove(self, movie_id: str) -> None:
+        no = self.movie_no.get(movie_id)
+        for key in self.movie_users.pop(movie_id, ()):
+            days, movies, rows = self.by_user[key]
+            keep = [j for j in range(len(movies)) if movies[j] != no]
+            if keep:
+                self.by_user[key] = (
+                    array("i", (days[j] for j in keep)),
+                    array("i", (movies[j] for j in keep)),
+                    array("i", (rows[j] for j in keep)),
+                )
+            else:
+                del self.by_user[key]
+        self.covered.pop(movie_id, None)
+
+
+def _entries(columns: ReviewColumns, rows) -> List[Tuple[str, int, int]]:
+    return [(columns.users[i], columns.day[i], i) for i in rows]
+
+
+class UserReviewIndex:
+    """Every review a user wrote, across the whole catalog.
+
+    For each user (case-folded name) three parallel arrays hold the review
+    day, the movie (as a small integer) and the row id in that movie's
+    ReviewColumns, so a lookup never opens a CSV. Each movie is indexed
+    together with its reviews generation (see backend.app.coherence); a
+    movie is re-indexed once that generation moves on, so an append from
+    another worker is picked up by the next lookup, and a CSV edited by hand
+    after `python -m backend.app.coherence bump reviews:<path>`.
+
+    Reviews appended through this process's store are queued by the writer
+    and added by the next lookup, so writers never wait for the index.
+    Building, the first time or after a change, reads the CSVs without
+    holding the index lock; lookups meanwhile keep using the previous index.
+    """
+
+    def __init__(self, catalog: MovieCatalog, store: ReviewStore, max_pending: int = USER_INDEX_PENDING):
+        self.catalog = catalog
+        self.store = store
+        self.reindexed = 0
+        self.dropped = 0
+        self._index = _Index()
+        self._keys: Dict[str, str] = {}  # movie -> generation key
+        # (movie, generation, first row id, entries) queued by _on_append
+        self._pending: Deque[Tuple[str, int, int, List[Tuple[str, int, int]]]] = deque(maxlen=max_pending)
+        self._lock = threading.Lock()  # guards _index; held only for in-memory work
+        self._build_lock = threading.Lock()  # one sync reads CSVs at a time
+        store.on_append.append(self._on_append)
+
+    def _key(self, movie_id: str) -> str:
+        key = self._keys.get(movie_id)
+        if key is None:
+            key = self._keys[movie_id] = self.store.generation_key(movie_id)
+        return key
+
+    def _on_append(self, movie_id: str, columns: ReviewColumns, rows: List[int]) -> None:
+        # Runs on the writer, under the CSV's flock: queue and return
+        if movie_id not in self._index.covered or not rows:
+            return  # not indexed yet; the next sync reads the whole file
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1  # the movie's generation has moved on, so it gets re-indexed
+        self._pending.append((movie_id, columns.generation, rows[0], _entries(columns, rows)))
+
+    def _drain(self) -> None:
+        # Called with self._lock held
+        index = self._index
+        while self._pending:
+            movie_id, generation, first, entries = self._pending.popleft()
+            covered = index.covered.get(movie_id)
+            if covered is None:
+                continue
+            indexed_generation, indexed = covered
+            if first == indexed:
+                index.add(movie_id, entries)
+                index.covered[movie_id] = (max(indexed_generation, generation), indexed + len(entries))
+            elif first + len(entries) <= indexed:
+                # Already read from the CSV by the build that was running when it was appended
+                index.covered[movie_id] = (max(indexed_generation, generation), indexed)
+            else:
+                index.covered[movie_id] = (-1, indexed)  # missed rows in between; re-index
+
+    def _stale(self) -> Tuple[List[str], List[str]]:
+        """Movies to (re-)index and indexed movies no longer in the catalog"""
+        movie_ids = [m["id"] for m in self.catalog.all()]
+        with self._lock:
+            self._drain()
+            covered = dict(self._index.covered)
+        current = set(movie_ids)
+        stale = [i for i in movie_ids if i not in covered or covered[i][0] != generations.current(self._key(i))]
+        return stale, [i for i in covered if i not in current]
+
+    def _read(self, movie_id: str) -> Tuple[int, List[Tuple[str, int, int]]]:
+        # Generation first: an append racing with the read then only costs another re-index
+        generation = generations.current(self._key(movie_id))
+        columns = self.store.peek(movie_id) or self.store.load(movie_id)
+        return generation, _entries(columns, range(len(columns)))
+
+    def sync(self) -> None:
+        stale, gone = self._stale()
+        if not stale and not gone:
+            return
+        with self._build_lock:
+            stale, gone = self._stale()  # another sync may have just done it
+            if not stale and not gone:
+                return
+            if not self._index.covered:
+                index = _Index()
+                for movie_id in stale:
+                    generation, entries = self._read(movie_id)
+                    index.add(movie_id, entries)
+                    index.covered[movie_id] = (generation, len(entries))
+                with self._lock:
+                    self._index = index
+                    self._drain()
+                self.reindexed += len(stale)
+                return
+            read = {movie_id: self._read(movie_id) for movie_id in stale}
+            with self._lock:
+                index = self._index
+                for movie_id in gone:
+                    index.remove(movie_id)
+                for movie_id, (generation, entries) in read.items():
+                    index.remove(movie_id)
+                    index.add(movie_id, entries)
+                    index.covered[movie_id] = (generation, len(entries))
+                self._drain()
+            self.reindexed += len(read)
+
+    def lookup(self, username: str) -> List[Tuple[str, int]]:
+        """(movie_id, row id) of the user's reviews, newest first"""
+        self.sync()
+        with self._lock:
+            self._drain()
+            index = self._index
+            entry = index.by_user.get(username.casefold())
+            if entry is None:
+                return []
+            days, movies, rows = entry
+            order = sorted(range(len(rows)), key=lambda j: (-days[j], movies[j], rows[j]))
+            return [(index.movie_ids[movies[j]], rows[j]) for j in order]
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            "users": len(index.by_user),
+            "movies": len(index.covered),
+            "reviews": sum(covered[1] for covered in index.covered.values()),
+            "pending": len(self._pending),
+            "dropped": self.dropped,
+            "reindexed": self.reindexed,
+        }
@@ -1,64 +1,134 @@
-import json, csv, os
+import asyncio, json, csv, os
 from pathlib import Path
 from datetime import datetime
+from backend.app.metrics import timed
+from backend.movies.cache import MovieCatalog
+from backend.movies.http_cache import make_etag
+from backend.movies.response_cache import ResponseCache
+from backend.movies.index import CatalogIndexCache
+from backend.movies.loader import SingleFlight
+from backend.movies.search import CatalogSearch
+from backend.movies.similar import SimilarMovies
+from backend.movies.snapshot import Snapshot
+from backend.movies.reviews import ReviewStore, iso_day
+from backend.movies.stats import AggregateStore
+from backend.movies.user_index import UserReviewIndex
+from backend.movies.writer import ReviewWriter
 
-DATA_PATH = Path("backend/data/imdb_reviews")
+DATA_PATH = Path(os.getenv("IMDB_DATA_PATH", "backend/data/imdb_reviews"))
 REVIEWS_FILE = Path("backend/data/user_reviews.json")
 
+# Compiled with `python -m backend.movies.snapshot compile`; optional
+SNAPSHOT_PATH = Path(os.getenv("IMDB_SNAPSHOT_PATH", f"{DATA_PATH}.snapshot"))
+
+catalog = MovieCatalog(DATA_PATH)
+review_store = ReviewStore(DATA_PATH)
+review_writer = ReviewWriter(review_store)
+review_stats = AggregateStore(review_store)
+catalog_index = CatalogIndexCache(catalog)
+catalog_search = CatalogSearch(catalog)
+similar_movies = SimilarMovies(catalog)
+user_reviews = UserReviewIndex(catalog, review_store)
+response_cache = ResponseCache()
+data_io = SingleFlight()
+
+def load_snapshot():
+    """Seed the catalog and review store from SNAPSHOT_PATH; None if there is no usable snapshot"""
+    snapshot = Snapshot.open(SNAPSHOT_PATH)
+    if snapshot is not None:
+        catalog.seed(snapshot.catalog_entries())
+        review_store.snapshot = snapshot
+    return snapshot
+
+# --- Async access for the routes: blocking loads run on data_io and are shared ---
+def _refresh_catalog():
+    catalog.refresh()
+    catalog_index.get()
+    catalog_search.sync()
+
+async def refresh_catalog_async():
+    """Make sure the catalog and its indexes are current; the scan runs off the event loop"""
+    if not catalog.is_fresh():
+        await data_io.load("catalog", _refresh_catalog)
+
+async def get_movie_async(movie_id: str):
+    await refresh_catalog_async()
+    return catalog.get(movie_id)
+
+async def get_reviews_async(movie_id: str):
+    """The movie's ReviewColumns; concurrent cold loads of one movie share a single parse"""
+    columns = review_store.peek(movie_id)
+    if columns is None:
+        columns = await data_io.load(("reviews", movie_id), review_store.get, movie_id)
+    return columns
+
+async def get_search_index_async(columns):
+    if columns.search_ready:
+        return columns.search_index()
+    return await data_io.load(("review-search", columns.movie_id, id(columns)), columns.search_index)
+
+async def get_similar_async(movie_id: str):
+    """(movie id, score) neighbours of a movie, None if it is unknown; computed once per catalog change"""
+    top = similar_movies.peek(movie_id)
+    if top is None:
+        top = await data_io.load(("similar", movie_id), similar_movies.neighbours, movie_id)
+    return top
+
+async def get_review_stats_async(movie_id: str):
+    agg = review_stats.peek(movie_id)
+    if agg is None:
+        agg = await data_io.load(("stats", movie_id), review_stats.get, movie_id)
+    return agg
+
+# The version helpers refresh the catalog when it is stale, so the routes run them on data_io
+async def catalog_version_async():
+    return await data_io.run(catalog_version)
+
+async def movie_version_async(movie_id: str):
+    return await data_io.run(movie_version, movie_id)
+
+async def reviews_version_async(movie_id: str):
+    return await data_io.run(reviews_version, movie_id)
+
+@timed("load_movies")
 def load_movies():
-    movies = []
-    for movie_dir in DATA_PATH.iterdir():
-        if movie_dir.is_dir():
-            metadata_file = movie_dir / "metadata.json"
-            if metadata_file.exists():
-                with open(metadata_file, "r", encoding="utf-8") as f:
-                    metadata = json.load(f)
-                movies.append({
-                    "id": movie_dir.name,
-                    "metadata": metadata
-                })
-    return movies
+    # Fresh list so callers can filter/sort in place without touching the cache
+    return list(catalog.all())
 
 def get_movie_by_id(movie_id: str):
-    movie_dir = DATA_PATH / movie_id
-    metadata_file = movie_dir / "metadata.json"
-    if metadata_file.exists():
-        with open(metadata_file, "r", encoding="utf-8") as f:
-            return {"id": movie_id, "metadata": json.load(f)}
-    return None
+    return catalog.get(movie_id)
 
-def load_reviews(movie_id: str):
-    """Load all reviews for a given movie from movieReviews.csv"""
-    movie_dir = DATA_PATH / movie_id
-    reviews_file = movie_dir / "movieReviews.csv"
-
-    if not reviews_file.exists():
-        return []
-
-    reviews = []
-    with open(reviews_file, newline="", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            reviews.append({
-                "date": row.get("Date of Review"),
-                "user": row.get("User"),
-                "usefulness_vote": int(row["Usefulness Vote"]) if row.get("Usefulness Vote") else None,
-                "total_votes": int(row["Total Votes"]) if row.get("Total Votes") else None,
-                "rating": float(row["User's rating out of 10"]) if row.get("User's rating out of 10") else None,
-                "title": row.get("Review Title"),
-                "review": row.get("Review")
-            })
-    return reviews
+# --- Data versions for conditional GET; built from file stamps so every worker agrees ---
+def catalog_version():
+    """(etag, last_modified) of the whole catalog"""
+    catalog.refresh()
+    return make_etag("catalog", catalog.etag), catalog.last_modified
 
-# backend/movies/utils.py
-def append_review_to_csv(movie_id: str, username: str, rating: int, title: str, review_text: str):
-    """Append a new review to the movie's CSV file."""
-    csv_file = Path(f"backend/data/imdb_reviews/{movie_id}/movieReviews.csv")
-    file_exists = os.path.exists(csv_file)
+def movie_version(movie_id: str):
+    """(etag, last_modified) of one movie's metadata, or None if it does not exist"""
+    stamp = catalog.stamp(movie_id)
+    if stamp is None:
+        return None
+    return make_etag("movie", movie_id, stamp[1:]), stamp[1] / 1e9
 
-    fieldnames = ["date", "user", "usefulness_vote", "total_votes", "rating", "title", "review"]
+def reviews_version(movie_id: str):
+    """(etag, last_modified) of one movie's reviews; moves on every append"""
+    stamp = catalog.stamp(movie_id)
+    if stamp is None:
+        return None
+    csv_stamp = review_store.stamp(movie_id)
+    csv_mtime = csv_stamp[1] if csv_stamp else 0
+    etag = make_etag("reviews", movie_id, stamp[1:], csv_stamp[1:] if csv_stamp else None)
+    return etag, max(stamp[1], csv_mtime) / 1e9
 
-    new_review = {
+@timed("load_reviews")
+def load_reviews(movie_id: str):
+    """Load all reviews for a given movie from movieReviews.csv"""
+    columns = review_store.get(movie_id)
+    return columns.to_dicts(list(range(len(columns))))
+
+def new_review(username: str, rating: int, title: str, review_text: str) -> dict:
+    return {
         "date": datetime.utcnow().strftime("%d %B %Y"),  # e.g. "01 October 2025"
         "user": username,
         "usefulness_vote": 0,
@@ -68,11 +138,13 @@ def append_review_to_csv(movie_id: str, username: str, rating: int, title: str,
         "review": review_text
     }
 
-    # Append the new review
-    with open(csv_file, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        if not file_exists:  # write header if first time
-            writer.writeheader()
-        writer.writerow(new_review)
+# backend/movies/utils.py
+def append_review_to_csv(movie_id: str, username: str, rating: int, title: str, review_text: str):
+    """Append a new review to the movie's CSV file (blocks until it is durable)."""
+    review = new_review(username, rating, title, review_text)
+    return review_writer.submit(movie_id, review).result()
 
-    return new_review
+async def append_review_async(movie_id: str, username: str, rating: int, title: str, review_text: str):
+    """append_review_to_csv for async routes: waits on the group commit without blocking the loop"""
+    review = new_review(username, rating, title, review_text)
+    return await asyncio.wrap_future(review_writer.submit(movie_id, review))
@@ -0,0 +1,126 @@
+import os, queue, threading, time
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, List, Optional, Tuple
+
+from backend.movies.reviews import ReviewStore
+
+# Group commit: reviews arriving within this window share one write + fsync
+REVIEW_BATCH_WINDOW_MS = float(os.getenv("REVIEW_BATCH_WINDOW_MS", "5"))
+REVIEW_BATCH_MAX = int(os.getenv("REVIEW_BATCH_MAX", "256"))
+# "batch": fsync every commit before acknowledging (durable); "none": leave it to the OS
+REVIEW_FSYNC = os.getenv("REVIEW_FSYNC", "batch")
+
+
+class ReviewWriter:
+    """Batches new reviews into periodic group commits.
+
+    submit() queues a review and returns a Future. A single background thread
+    drains the queue, writes each movie's share of the batch with one locked
+    append_many (fsync'ed per REVIEW_FSYNC), and only then resolves the
+    futures, so a client is acknowledged once its review is on disk and
+    already visible in the in-memory caches. A review whose waiter is
+    cancelled (e.g. the client disconnected) before its batch is written is
+    dropped.
+    """
+
+    def __init__(
+        self,
+        store: ReviewStore,
+        window_ms: float = REVIEW_BATCH_WINDOW_MS,
+        max_batch: int = REVIEW_BATCH_MAX,
+        fsync: bool = REVIEW_FSYNC != "none",
+    ):
+        self.store = store
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.commits = 0
+        self.written = 0
+        self.failed = 0
+        self.cancelled = 0
+        self._queue: "queue.Queue[Optional[Tuple[str, dict, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="review-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Flush everything queued so far and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def submit(self, movie_id: str, review: dict) -> Future:
+        future: Future = Future()
+        self.start()
+        self._queue.put((movie_id, review, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            stopping = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._commit(batch)
+            except Exception as exc:
+                # The thread must outlive any bad batch, or every later submit() would hang
+                for _, _, future in batch:
+                    try:
+                        future.set_exception(exc)
+                    except InvalidStateError:
+                        pass  # already resolved, or cancelled by its waiter
+            if stopping:
+                return
+
+    def _commit(self, batch: List[Tuple[str, dict, Future]]) -> None:
+        by_movie: Dict[str, List[Tuple[dict, Future]]] = {}
+        for movie_id, review, future in batch:
+            # False once the waiter was cancelled (client went away): that review is dropped.
+            # Otherwise the future can no longer be cancelled, so resolving it below is safe.
+            if future.set_running_or_notify_cancel():
+                by_movie.setdefault(movie_id, []).append((review, future))
+            else:
+                self.cancelled += 1
+        for movie_id, items in by_movie.items():
+            try:
+                self.store.append_many(movie_id, [review for review, _ in items], fsync=self.fsync)
+            except Exception as exc:
+                self.failed += len(items)
+                for _, future in items:
+                    future.set_exception(exc)
+                continue
+            self.written += len(items)
+            for review, future in items:
+                future.set_result(review)
+        self.commits += 1
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "commits": self.commits,
+            "written": self.written,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "avg_batch": round(self.written / self.commits, 2) if self.commits else 0.0,
+            "fsync": self.fsync,
+        }
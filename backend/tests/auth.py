@@ -0,0 +1,19 @@
+"""Helpers for tests that need a registered, logged-in user"""
+import uuid
+
+
+def register(client, role="user"):
+    name = f"u{uuid.uuid4().hex[:10]}"
+    body = {"username": name, "email": f"{name}@example.com", "password": "Secret-pass1", "role": role}
+    assert client.post("/auth/register", json=body).status_code == 200, body
+    return name
+
+
+def login(client, name):
+    response = client.post("/auth/login", data={"username": name, "password": "Secret-pass1"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
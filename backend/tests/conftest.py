@@ -0,0 +1,35 @@
+"""Shared setup: every test run works on scratch copies of the data.
+
+The app reads its paths from the environment at import time, so they are
+set here, before any backend module is imported.
+"""
+import os, shutil, tempfile
+from pathlib import Path
+
+import pytest
+
+DATA = Path(__file__).resolve().parent.parent / "data" / "imdb_reviews"
+
+_scratch = tempfile.mkdtemp(prefix="backend-tests-")
+shutil.copytree(DATA, os.path.join(_scratch, "imdb_reviews"))
+os.environ.update(
+    IMDB_DATA_PATH=os.path.join(_scratch, "imdb_reviews"),
+    USER_STORE="sqlite",
+    USERS_DB=os.path.join(_scratch, "users.db"),
+    SESSIONS_DB=os.path.join(_scratch, "sessions.db"),
+    GENERATIONS_FILE=os.path.join(_scratch, ".generations"),
+    RATE_LIMIT_ENABLED="0",  # tests enable admission themselves
+)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_scratch, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,9 @@
+"""Helpers for tests that need a whole review listing, past the page size cap"""
+import json
+
+
+def every_review(client, movie_id, **params):
+    """The listing for `params`, read from the NDJSON export"""
+    export = client.get(f"/movies/{movie_id}/reviews/export", params=params)
+    assert export.status_code == 200, export.text
+    return [json.loads(line) for line in export.text.splitlines()]
@@ -0,0 +1,81 @@
+import threading, time
+
+from backend.app.coherence import generations
+from backend.movies.reviews import CSV_HEADER, ReviewStore, encode_row
+from backend.movies.user_index import UserReviewIndex
+from backend.tests.auth import bearer, login, register
+
+
+def test_batch_returns_movies_in_request_order(client):
+    ids = ["Morbius", "Nope", "Pulp Fiction", "Morbius"]
+    body = client.post("/movies/batch", json={"ids": ids, "reviews": 3, "stats": True}).json()
+    assert [item["movie"]["id"] for item in body["movies"]] == ["Morbius", "Pulp Fiction"]
+    assert body["missing"] == ["Nope"]
+
+    for item in body["movies"]:
+        votes = [r["usefulness_vote"] for r in item["reviews"]]
+        assert len(votes) == 3 and votes == sorted(votes, reverse=True)
+        assert item["stats"] == client.get(f"/movies/{item['movie']['id']}/stats").json()
+
+    plain = client.post("/movies/batch", json={"ids": ["Morbius"]}).json()["movies"][0]
+    assert plain["reviews"] is None and plain["stats"] is None
+    assert client.post("/movies/batch", json={"ids": []}).status_code == 422
+
+
+def test_reviews_by_user_span_movies_newest_first(client):
+    name = register(client)
+    headers = bearer(login(client, name))
+    assert client.get(f"/movies/reviews/by-user/{name}").json()["total"] == 0
+    for movie in ("Forrest Gump", "Thor Ragnarok"):
+        body = {"rating": 5, "review_title": f"On {movie}", "review_text": "x"}
+        assert client.post(f"/movies/{movie}/reviews", json=body, headers=headers).status_code == 200
+
+    listed = client.get(f"/movies/reviews/by-user/{name.upper()}").json()
+    assert listed["total"] == 2
+    assert {r["movie_id"] for r in listed["reviews"]} == {"Forrest Gump", "Thor Ragnarok"}
+    assert all(r["user"] == name for r in listed["reviews"])
+    page = client.get(f"/movies/reviews/by-user/{name}", params={"skip": 1, "limit": 1}).json()
+    assert page["total"] == 2 and page["reviews"] == listed["reviews"][1:]
+
+
+class Catalog:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def all(self):
+        return [{"id": i} for i in self.ids]
+
+
+def test_writes_do_not_wait_for_an_index_build(tmp_path):
+    for movie in ("a", "b"):
+        (tmp_path / movie).mkdir()
+        (tmp_path / movie / "movieReviews.csv").write_bytes(
+            encode_row(CSV_HEADER) + encode_row(["1 May 2020", "ann", "1", "2", "5", "t", "r"])
+        )
+    store = ReviewStore(tmp_path)
+    index = UserReviewIndex(Catalog(["a", "b"]), store)
+    assert index.lookup("ann") and index.stats()["movies"] == 2
+
+    # Force a re-index of "b" that reads slowly, and append to "a" (already parsed) meanwhile
+    store.get("a")
+    load = store.load
+
+    def slow_load(movie_id):
+        time.sleep(0.5)
+        return load(movie_id)
+
+    store.load = slow_load
+    store.invalidate("b")
+    with open(store.path("b"), "ab") as f:
+        f.write(encode_row(["2 May 2020", "ann", "1", "2", "6", "t2", "r2"]))
+    generations.bump(store.generation_key("b"))
+    build = threading.Thread(target=index.lookup, args=("ann",))
+    build.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    store.append_many("a", [{"user": "bob", "rating": 9, "title": "t", "review": "r"}], fsync=False)
+    assert time.perf_counter() - started < 0.3
+    build.join()
+
+    assert index.lookup("bob") == [("a", 1)]
+    assert sorted(index.lookup("ann")) == [("a", 0), ("b", 0), ("b", 1)]
@@ -0,0 +1,77 @@
+import json, threading
+
+import pytest
+
+from backend.app.coherence import Generations, generations
+from backend.authentication import repository
+from backend.benchmarks.coherence_check import main
+from backend.movies import reviews
+from backend.movies.reviews import CSV_HEADER, ReviewStore, encode_row
+
+
+@pytest.fixture
+def no_stat_fallback(monkeypatch):
+    """Trust cached data until its generation moves, as coherence_check does"""
+    monkeypatch.setattr(reviews, "CATALOG_REVALIDATE_SECONDS", 3600)
+    monkeypatch.setattr(repository, "CATALOG_REVALIDATE_SECONDS", 3600)
+
+
+def test_generations_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / ".generations")
+    a, b = Generations(path, slots=64), Generations(path, slots=64)
+    assert a.current("k") == b.current("k") == 0
+
+    assert a.bump("k") == 1
+    assert b.current("k") == 1
+    with b.writing("k"):
+        assert a.current("k") == 1
+    assert a.current("k") == 2
+    assert Generations(path, slots=64).current("k") == 2
+
+
+def test_review_cache_follows_a_bump_not_the_clock(tmp_path, no_stat_fallback):
+    (tmp_path / "m").mkdir()
+    path = tmp_path / "m" / "movieReviews.csv"
+    path.write_bytes(encode_row(CSV_HEADER) + encode_row(["1 May 2020", "ann", "1", "2", "5", "t", "r"]))
+    warm = ReviewStore(tmp_path)
+    assert len(warm.get("m")) == 1
+
+    # Another worker appends through its own store: the bump reaches the warm cache at once
+    ReviewStore(tmp_path).append_many("m", [{"user": "bob", "rating": 7, "title": "t", "review": "r"}], fsync=False)
+    assert len(warm.get("m")) == 2
+
+    # An edit made outside the app is only seen once its key is bumped
+    with open(path, "ab") as f:
+        f.write(encode_row(["3 May 2020", "cy", "0", "0", "1", "t", "r"]))
+    assert len(warm.get("m")) == 2
+    generations.bump(warm.generation_key("m"))
+    assert len(warm.get("m")) == 3
+
+
+def test_json_users_keep_every_worker_update(tmp_path, no_stat_fallback):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps([
+        {"user_id": "u", "username": "u", "email": "u@example.com", "hashed_password": "", "role": "user"},
+    ]))
+    workers = [repository.JsonUserRepository(str(path)) for _ in range(4)]
+    for users in workers:
+        users.get_by_id("u")  # every worker starts warm
+
+    def write(n, users):
+        for i in range(20):
+            users.update("u", **{f"w{n}": i})
+
+    threads = [threading.Thread(target=write, args=(n, users)) for n, users in enumerate(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    on_disk = json.loads(path.read_text())[0]
+    assert [on_disk[f"w{n}"] for n in range(4)] == [19] * 4
+    workers[0].create({"user_id": "v", "username": "v", "email": "v@example.com", "hashed_password": "", "role": "user"})
+    assert workers[1].get_by_username("v") is not None
+
+
+def test_worker_processes_never_serve_stale_or_lost_writes():
+    assert main(workers=2, rounds=10) == 0
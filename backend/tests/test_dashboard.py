@@ -0,0 +1,67 @@
+from backend.dashboard.counters import DashboardCounters
+from backend.tests.auth import bearer, login, register
+
+
+def system_stats(client, headers):
+    response = client.get("/dashboard/admin", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_admin_dashboard_follows_writes(client):
+    admin = bearer(login(client, register(client, role="admin")))
+    before = system_stats(client, admin)["system_stats"]
+
+    name = register(client)
+    tokens = login(client, name)
+    body = {"rating": 6, "review_title": "Counted", "review_text": "once"}
+    assert client.post("/movies/Morbius/reviews", json=body, headers=bearer(tokens)).status_code == 200
+    during = system_stats(client, admin)
+    assert during["system_stats"]["total_users"] == before["total_users"] + 1
+    assert during["system_stats"]["users_by_role"]["user"] == before["users_by_role"].get("user", 0) + 1
+    assert during["system_stats"]["active_sessions"] == before["active_sessions"] + 1
+    assert during["system_stats"]["reviews_posted"] == before["reviews_posted"] + 1
+    assert during["trends"]["registrations"][-1]["count"] >= 1
+
+    assert client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert system_stats(client, admin)["system_stats"]["active_sessions"] == before["active_sessions"]
+
+
+def test_admin_dashboard_is_admin_only(client):
+    assert client.get("/dashboard/admin", headers=bearer(login(client, register(client)))).status_code == 403
+
+
+class Source:
+    """Stand-in user repository and token store for seeding"""
+
+    def __init__(self, users, sessions):
+        self.users, self.sessions = users, sessions
+
+    def all(self):
+        return self.users
+
+    def count_active(self):
+        return self.sessions
+
+
+def test_workers_share_the_totals(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    one, two = DashboardCounters(path), DashboardCounters(path)
+    # Events before the first seeding are already included in it
+    one.user_registered("user")
+    source = Source([{"role": "user", "penalties": [1]}, {"role": "admin"}], 3)
+    one.seed(source, source)
+
+    two.user_registered("user")
+    one.session_started(displaced=1)
+    two.sessions_ended(5)
+    one.review_posted()
+
+    for counters in (one, two):
+        assert counters.snapshot() == {
+            "total_users": 3,
+            "users_by_role": {"user": 2, "admin": 1},
+            "active_penalties": 1,
+            "active_sessions": 0,
+            "reviews_posted": 1,
+        }
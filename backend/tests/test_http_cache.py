@@ -0,0 +1,35 @@
+from backend.tests.auth import bearer, login, register
+from backend.tests.listing import every_review
+
+MOVIE = "Thor Ragnarok"
+
+
+def test_unchanged_resources_answer_304(client):
+    for path in ("/movies/", f"/movies/{MOVIE}", f"/movies/{MOVIE}/reviews", f"/movies/{MOVIE}/stats"):
+        first = client.get(path)
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"]
+        again = client.get(path, headers={"If-None-Match": etag})
+        assert again.status_code == 304, path
+        assert again.headers["etag"] == etag and again.content == b""
+        assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_modified_since(client):
+    first = client.get(f"/movies/{MOVIE}/reviews")
+    since = first.headers["last-modified"]
+    assert client.get(f"/movies/{MOVIE}/reviews", headers={"If-Modified-Since": since}).status_code == 304
+    old = "Mon, 01 Jan 1990 00:00:00 GMT"
+    assert client.get(f"/movies/{MOVIE}/reviews", headers={"If-Modified-Since": old}).status_code == 200
+
+
+def test_a_new_review_changes_the_etag(client):
+    path = f"/movies/{MOVIE}/reviews"
+    etag = client.get(path).headers["etag"]
+    body = {"rating": 7, "review_title": "Fresh", "review_text": "new"}
+    assert client.post(path, json=body, headers=bearer(login(client, register(client)))).status_code == 200
+
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert every_review(client, MOVIE)[-1]["title"] == "Fresh"
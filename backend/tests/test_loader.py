@@ -0,0 +1,83 @@
+import asyncio, threading, time
+
+from backend.movies.loader import SingleFlight
+
+
+def test_concurrent_loads_of_one_key_run_once():
+    calls = []
+
+    def parse(key):
+        calls.append(key)
+        time.sleep(0.05)
+        return f"parsed {key}"
+
+    async def burst():
+        flight = SingleFlight(workers=2)
+        try:
+            results = await asyncio.gather(*(flight.load("m", parse, "m") for _ in range(20)), flight.load("n", parse, "n"))
+        finally:
+            flight.shutdown()
+        return flight, results
+
+    flight, results = asyncio.run(burst())
+    assert sorted(calls) == ["m", "n"]
+    assert results == ["parsed m"] * 20 + ["parsed n"]
+    assert flight.stats()["coalesced"] == 19 and flight.stats()["in_flight"] == 0
+
+
+def test_a_cancelled_waiter_does_not_cancel_the_shared_load():
+    release = threading.Event()
+
+    async def scenario():
+        flight = SingleFlight(workers=1)
+        try:
+            first = asyncio.ensure_future(flight.load("m", lambda: release.wait(5) and "done"))
+            second = asyncio.ensure_future(flight.load("m", lambda: "never called"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            release.set()
+            return await second
+        finally:
+            flight.shutdown()
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_a_slow_search_does_not_hold_up_other_requests(client, monkeypatch):
+    from backend.movies import utils as movie_utils
+
+    search = movie_utils.catalog_search.search
+
+    def slow_search(*args, **kwargs):
+        time.sleep(0.5)
+        return search(*args, **kwargs)
+
+    monkeypatch.setattr(movie_utils.catalog_search, "search", slow_search)
+    slow = threading.Thread(target=client.get, args=("/movies/search/",), kwargs={"params": {"q": "slow probe"}})
+    slow.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    assert client.get("/movies/Joker").status_code == 200
+    elapsed = time.perf_counter() - started
+    slow.join()
+    assert elapsed < 0.3
+
+
+def test_a_slow_catalog_rescan_does_not_hold_up_other_requests(client, monkeypatch):
+    from backend.movies import utils as movie_utils
+
+    catalog_version = movie_utils.catalog_version
+
+    def slow_version():
+        time.sleep(0.5)  # a stale catalog is re-scanned inside catalog_version
+        return catalog_version()
+
+    monkeypatch.setattr(movie_utils, "catalog_version", slow_version)
+    slow = threading.Thread(target=client.get, args=("/movies/search/",), kwargs={"params": {"q": "rescan probe"}})
+    slow.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    assert client.get("/movies/Joker").status_code == 200
+    elapsed = time.perf_counter() - started
+    slow.join()
+    assert elapsed < 0.3
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from backend.movies.pagination import decode_cursor, encode_cursor, query_fingerprint
+from backend.tests.listing import every_review
+
+MOVIE = "Pulp Fiction"
+
+
+def pages(client, path, **params):
+    """Every review of a paginated listing, following next_cursor to the end"""
+    reviews, cursor = [], None
+    while True:
+        page = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert page.status_code == 200, page.text
+        body = page.json()
+        reviews += body["reviews"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return reviews
+
+
+def test_cursor_round_trip_is_url_safe():
+    state = {"p": 1234, "f": "abc", "k": ["x/y+z?", 5]}
+    cursor = encode_cursor(state)
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == state
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "bm90IGpzb24", encode_cursor({"p": 1})[:-3] + "!", "WzFd"])
+def test_malformed_cursors_raise_value_error(cursor):
+    # "WzFd" is valid base64 JSON, but a list rather than a state dict
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_fingerprint_covers_every_parameter():
+    base = dict(q=None, prefix=False, filters={"min_rating": 5, "user": None}, sort_by=None, order=None)
+    assert query_fingerprint(**base) == query_fingerprint(**dict(reversed(list(base.items()))))
+    for change in ({"q": "x"}, {"prefix": True}, {"filters": {"min_rating": 6, "user": None}}, {"order": "asc"}):
+        assert query_fingerprint(**{**base, **change}) != query_fingerprint(**base)
+
+
+def test_cursor_pages_cover_the_listing_once(client):
+    path = f"/movies/{MOVIE}/reviews"
+    whole = every_review(client, MOVIE, min_rating=7)
+    assert len(whole) > 40
+    assert pages(client, path, min_rating=7, limit=17) == whole
+
+
+@pytest.mark.parametrize("change", [
+    {"min_rating": 8}, {"user": "someone"}, {"q": "great"}, {"prefix": True},
+    {"start_date": "2010-01-01"}, {"sort_by": "date"},
+])
+def test_cursor_is_rejected_for_another_query(client, change):
+    path = f"/movies/{MOVIE}/reviews"
+    cursor = client.get(path, params={"min_rating": 7, "limit": 10}).json()["next_cursor"]
+    assert client.get(path, params={"min_rating": 7, **change, "cursor": cursor}).status_code == 400
+    assert client.get(f"{path}/export", params={"min_rating": 7, **change, "cursor": cursor}).status_code == 400
+    assert client.get(path, params={"min_rating": 7, "cursor": cursor}).status_code == 200
+
+
+def test_export_streams_the_whole_listing(client):
+    path = f"/movies/{MOVIE}/reviews"
+    export = client.get(f"{path}/export", params={"min_rating": 7})
+    assert export.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in export.text.splitlines()] == pages(client, path, min_rating=7, limit=100)
+
+
+def test_export_resumes_from_a_page_cursor(client):
+    path = f"/movies/{MOVIE}/reviews"
+    first = client.get(path, params={"sort_by": "usefulness", "limit": 25}).json()
+    export = client.get(f"{path}/export", params={"sort_by": "usefulness"})
+    rest = client.get(f"{path}/export", params={"sort_by": "usefulness", "cursor": first["next_cursor"]})
+    full = [json.loads(line) for line in export.text.splitlines()]
+    assert [json.loads(line) for line in rest.text.splitlines()] == full[25:]
+    assert first["reviews"] == full[:25]
+
+
+def test_invalid_cursor_is_a_bad_request(client):
+    assert client.get(f"/movies/{MOVIE}/reviews", params={"cursor": "%%%"}).status_code == 400
+    assert client.get(f"/movies/{MOVIE}/reviews", params={"cursor": encode_cursor({"p": 0})}).status_code == 400
+
+
+@pytest.mark.parametrize("path, params", [
+    *[(path, params) for path in (f"/movies/{MOVIE}/reviews", "/movies/reviews/by-user/someone")
+      for params in ({"skip": -300}, {"limit": 0}, {"limit": 1001})],
+    *[("/movies/search/", params) for params in ({"limit": 0}, {"limit": -1}, {"limit": 1001})],
+])
+def test_skip_and_limit_are_validated(client, path, params):
+    assert client.get(path, params={"min_rating": 1, "max_rating": 1, **params}).status_code == 422
+
+
+def test_skip_past_the_matches_is_an_empty_page(client):
+    params = {"min_rating": 1, "max_rating": 1, "skip": 300}
+    body = client.get(f"/movies/{MOVIE}/reviews", params=params).json()
+    assert body == {"reviews": [], "next_cursor": None}
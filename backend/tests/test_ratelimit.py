@@ -0,0 +1,50 @@
+import pytest
+from fastapi import HTTPException
+
+from backend.app.ratelimit import Admission, TokenBuckets, admission
+from backend.tests.auth import register
+
+
+@pytest.fixture
+def limits_on(monkeypatch):
+    monkeypatch.setattr(admission, "enabled", True)
+    monkeypatch.setattr(admission, "buckets", TokenBuckets())
+
+
+def test_login_storm_for_one_user_gets_429_with_retry_after(client, limits_on):
+    name = register(client)
+    form = {"username": name, "password": "wrong-Pass1"}
+    statuses = [client.post("/auth/login", data=form).status_code for _ in range(5)]
+    assert statuses == [401] * 5  # the per-username burst
+
+    limited = client.post("/auth/login", data={"username": name.upper(), "password": "wrong-Pass1"})
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    # Read-only routes are not limited
+    assert client.get("/movies/Pulp Fiction").status_code == 200
+    assert admission.stats()["login.limited_user"] >= 1
+
+
+def test_buckets_refill_and_stay_bounded(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("backend.app.ratelimit.time.monotonic", lambda: clock[0])
+    buckets = TokenBuckets(max_keys=2)
+    assert [buckets.take(("r", "ip", "a"), 1.0, 2) for _ in range(2)] == [0.0, 0.0]
+    assert buckets.take(("r", "ip", "a"), 1.0, 2) == pytest.approx(1.0)
+    clock[0] += 1
+    assert buckets.take(("r", "ip", "a"), 1.0, 2) == 0.0
+
+    buckets.take(("r", "ip", "b"), 1.0, 2)
+    buckets.take(("r", "ip", "c"), 1.0, 2)
+    assert len(buckets) == 2 and buckets.evictions == 1
+
+
+def test_concurrency_cap_answers_503():
+    gate = Admission(concurrency=1, enabled=True)
+    with gate.slot("login"):
+        with pytest.raises(HTTPException) as busy:
+            with gate.slot("login"):
+                pass
+    assert busy.value.status_code == 503 and busy.value.headers["Retry-After"] == "1"
+    with gate.slot("login"):
+        assert gate.stats()["in_flight"] == 1
@@ -0,0 +1,43 @@
+from backend.movies import utils as movie_utils
+from backend.movies.response_cache import ResponseCache
+from backend.tests.auth import bearer, login, register
+
+MOVIE = "John Wick Chapter 3  Parabellum"
+
+
+def test_repeated_listings_are_served_from_the_cache(client):
+    path = f"/movies/{MOVIE}/reviews"
+    params = {"min_rating": 5, "limit": 20}
+    first = client.get(path, params=params)
+    hits = movie_utils.response_cache.hits
+    again = client.get(path, params=dict(reversed(list(params.items()))))
+    assert movie_utils.response_cache.hits == hits + 1
+    assert again.content == first.content
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_an_append_invalidates_cached_listings(client):
+    path = f"/movies/{MOVIE}/reviews"
+    tail = {"skip": 2000, "limit": 1000}  # the movie has about 2400 reviews
+    before = client.get(path, params=tail).json()["reviews"]
+    assert client.get(path, params=tail).json()["reviews"] == before  # now cached
+
+    body = {"rating": 9, "review_title": "Probe", "review_text": "invalidates"}
+    assert client.post(path, json=body, headers=bearer(login(client, register(client)))).status_code == 200
+
+    after = client.get(path, params=tail).json()["reviews"]
+    assert after[:-1] == before
+    assert after[-1]["title"] == "Probe"
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("a", "v1", b"x" * 20)
+    cache.put("b", "v1", b"x" * 20)
+    cache.put("too big", "v1", b"x" * 26)
+    assert cache.get("too big", "v1") is None
+    assert cache.get("a", "v2") is None  # another data version
+    for n in range(5):
+        cache.put(n, "v1", b"x" * 20)
+    assert cache.bytes <= 100
+    assert cache.get("a", "v1") is None and cache.get(4, "v1") == b"x" * 20
@@ -0,0 +1,138 @@
+import math
+from array import array
+
+import pytest
+
+from backend.movies.reviews import CSV_HEADER, RowOrder, ReviewStore, encode_row, parse_day
+from backend.tests.listing import every_review
+
+MOVIE = "Pulp Fiction"
+
+
+def row_order(values):
+    return RowOrder(array("d", values), math.isnan)
+
+
+def keyset_pages(order, values, descending, size, between_pages=lambda: None):
+    """Page through an order by (value, row) keysets, as the reviews cursor does"""
+    served, last = [], None
+    while True:
+        view = order.view(descending)
+        start = 0 if last is None else view.position_after(*last)
+        page = view[start:start + size]
+        if not page:
+            return served
+        served += page
+        value = values[page[-1]]
+        last = (None if math.isnan(value) else value, page[-1])
+        between_pages()
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_views_list_value_then_row_with_missing_last(descending):
+    nan = math.nan
+    order = row_order([3, nan, 1, 3, 2, nan, 1])
+    view = order.view(descending)
+    if descending:
+        assert list(view) == [3, 0, 4, 6, 2, 1, 5]
+    else:
+        assert list(view) == [2, 6, 4, 0, 3, 1, 5]
+    assert view[1:4] == list(view)[1:4]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_position_after_resumes_past_ties(descending):
+    values = [2, 2, 1, 2, math.nan, 1, math.nan]
+    view = row_order(values).view(descending)
+    rows = list(view)
+    for i, row in enumerate(rows):
+        value = None if math.isnan(values[row]) else values[row]
+        assert view.position_after(value, row) == i + 1
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_neither_skip_nor_repeat_across_inserts(descending):
+    values = [4.0, 2.0, math.nan, 4.0, 1.0, 3.0, 2.0]
+    order = row_order(values)
+    # Rows on both sides of every page boundary, one after each page
+    inserts = [0.5, 2.0, math.nan, 5.0, 4.0, 1.0]
+
+    def insert():
+        if inserts:
+            values.append(inserts.pop(0))
+            order.add(values[-1], len(values) - 1)
+
+    served = keyset_pages(order, values, descending, 3, insert)
+    assert len(set(served)) == len(served)
+    # Everything present before paging started is served exactly once
+    assert set(range(7)) <= set(served)
+    # and the pages stay in the view's order
+    assert served == [row for row in order.view(descending) if row in set(served)]
+
+
+def test_bounded_view_bisects_the_range():
+    order = row_order([5, 1, 9, 3, 7, math.nan])
+    assert list(order.view(False, 3, 7)) == [3, 0, 4]
+    assert list(order.view(True, 3, 7)) == [4, 0, 3]
+    assert list(order.view(False, 10, None)) == []
+    assert 5 not in order.view(False, 3, 7)
+    with pytest.raises(IndexError):
+        order.view(False, 3, 7)[3]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_views_keep_their_rows_while_rows_are_appended(tmp_path, descending):
+    (tmp_path / "m").mkdir()
+    rows = [encode_row(["1 May 2020", f"u{i}", "1", "2", str(i % 10 + 1), "t", "r"]) for i in range(100)]
+    (tmp_path / "m" / "movieReviews.csv").write_bytes(encode_row(CSV_HEADER) + b"".join(rows))
+    store = ReviewStore(tmp_path)
+    columns = store.get("m")
+    view = columns.order_by("rating").view(descending)
+    expected = list(view)
+
+    # Consume the view the way the export does, with reviews of every rating written in between
+    served = []
+    for start in range(0, len(view), 7):
+        served += view[start:start + 7]
+        served.append(view[start])
+        new = [{"user": "w", "rating": r, "title": "t", "review": "r"} for r in (1, 5, 10, None)]
+        store.append_many("m", new, fsync=False)
+    assert store.get("m") is columns
+    assert served == [row for start in range(0, len(expected), 7) for row in expected[start:start + 7] + [expected[start]]]
+    assert len(columns.order_by("rating").view(descending)) == len(expected) + 4 * len(range(0, len(expected), 7))
+
+def test_sorted_listing_pages_match_the_whole_listing(client):
+    path = f"/movies/{MOVIE}/reviews"
+    for sort_by, order in (("date", "desc"), ("rating", "asc"), ("usefulness", "desc")):
+        params = {"sort_by": sort_by, "order": order}
+        whole = every_review(client, MOVIE, **params)
+        served, cursor = [], None
+        while True:
+            body = client.get(path, params={**params, "limit": 50, **({"cursor": cursor} if cursor else {})}).json()
+            served += body["reviews"]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert served == whole
+
+
+def test_sort_by_date_orders_both_ways(client):
+    path = f"/movies/{MOVIE}/reviews"
+    newest = every_review(client, MOVIE, sort_by="date")
+    oldest = every_review(client, MOVIE, sort_by="date", order="asc")
+    days = [parse_day(r["date"]) for r in oldest if parse_day(r["date"])]
+    assert days == sorted(days)
+    assert [r for r in newest if parse_day(r["date"])] == [r for r in oldest if parse_day(r["date"])][::-1]
+
+
+def test_date_range_is_listed_by_date(client):
+    reviews = every_review(client, MOVIE, start_date="2005-01-01", end_date="2012-12-31")
+    days = [parse_day(r["date"]) for r in reviews]
+    assert days and days == sorted(days)
+    assert min(days) >= parse_day("2005-01-01") and max(days) <= parse_day("2012-12-31")
+
+
+def test_order_requires_sort_by(client):
+    assert client.get(f"/movies/{MOVIE}/reviews", params={"order": "asc"}).status_code == 400
+    assert client.get(f"/movies/{MOVIE}/reviews/export", params={"order": "desc"}).status_code == 400
+    assert client.get(f"/movies/{MOVIE}/reviews", params={"order": "asc", "sort_by": "date"}).status_code == 200
@@ -0,0 +1,77 @@
+from backend.movies.search import InvertedIndex, tokenize
+
+
+def index_of(titles):
+    index = InvertedIndex()
+    for doc, title in titles.items():
+        index.add(doc, [(title, 1.0)])
+    return index
+
+
+TITLES = {
+    "pulp": "Pulp Fiction",
+    "endgame": "Avengers: Endgame",
+    "avengers": "The Avengers",
+    "fight": "Fight Club",
+}
+
+
+def test_tokenize_casefolds_and_drops_punctuation():
+    assert tokenize("Avengers: ENDGAME!") == ["avengers", "endgame"]
+
+
+def test_prefix_matches_the_start_of_the_last_token_only():
+    index = index_of(TITLES)
+    assert {doc for doc, _ in index.search("aven", prefix=True)} == {"endgame", "avengers"}
+    assert {doc for doc, _ in index.search("avengers end", prefix=True)} == {"endgame"}
+    assert {doc for doc, _ in index.search("pulp fi", prefix=True)} == {"pulp"}
+    # Earlier tokens must match whole words, and a prefix never matches mid-word
+    assert index.search("pul fiction", prefix=True) == []
+    assert index.search("ulp", prefix=True) == []
+
+
+def test_without_prefix_tokens_match_whole_words():
+    index = index_of(TITLES)
+    assert index.search("aven") == []
+    assert [doc for doc, _ in index.search("fight club")] == ["fight"]
+
+
+def test_quoted_phrases_match_consecutive_words():
+    index = index_of({**TITLES, "club": "Club Fight Night"})
+    assert {doc for doc, _ in index.search("fight club")} == {"fight", "club"}
+    assert [doc for doc, _ in index.search('"fight club"')] == ["fight"]
+
+
+def test_bm25_ranks_weighted_fields_first():
+    index = InvertedIndex()
+    index.add("title", [("space odyssey", 3.0), ("a long description", 1.0)])
+    index.add("body", [("odyssey", 1.0), ("space is mentioned in a much longer description here", 1.0)])
+    assert [doc for doc, _ in index.search("space")] == ["title", "body"]
+    assert len(index.search("space", limit=1)) == 1
+
+
+def test_prefix_expansion_follows_adds_and_removes():
+    index = index_of(TITLES)
+    index.add("fiction2", [("Fictional Tales", 1.0)])
+    assert {doc for doc, _ in index.search("fict", prefix=True)} == {"pulp", "fiction2"}
+    index.remove("pulp")
+    assert {doc for doc, _ in index.search("fict", prefix=True)} == {"fiction2"}
+    assert "pulp" not in index.expand("p")
+
+
+def titles(client, **params):
+    response = client.get("/movies/search/", params=params)
+    assert response.status_code == 200, response.text
+    return [m["metadata"]["title"] for m in response.json()["movies"]]
+
+
+def test_title_is_a_case_insensitive_substring(client):
+    assert titles(client, title="man") == ["SpiderMan No Way Home"]
+    assert sorted(titles(client, title="AVENGERS")) == ["Avengers Endgame", "The Avengers"]
+    assert titles(client, title="venge", rating=8.1) == ["Avengers Endgame"]
+
+
+def test_prefix_applies_to_q_only(client):
+    assert "Avengers Endgame" in titles(client, q="aven", prefix=True)
+    assert titles(client, q="aven") == []
+    assert titles(client, q="russo", title="endgame") == ["Avengers Endgame"]
@@ -0,0 +1,59 @@
+import time
+
+from backend.authentication.token_store import RefreshTokenStore
+from backend.tests.auth import bearer, login, register
+
+
+def test_login_rejects_a_wrong_password(client):
+    name = register(client)
+    assert client.post("/auth/login", data={"username": name, "password": "nope"}).status_code == 401
+
+
+def test_refresh_rotates_and_rejects_replay(client):
+    tokens = login(client, register(client))
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200
+    fresh = rotated.json()
+    assert fresh["refresh_token"] != tokens["refresh_token"]
+
+    # The old refresh token was consumed by the rotation
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": fresh["refresh_token"]}).status_code == 200
+
+
+def test_logout_ends_only_that_session(client):
+    name = register(client)
+    first, second = login(client, name), login(client, name)
+    for tokens in (first, second):
+        assert client.get("/dashboard/user", headers=bearer(tokens)).status_code == 200  # cached as verified
+
+    logout = client.post("/auth/logout", json={"refresh_token": first["refresh_token"]}, headers=bearer(first))
+    assert logout.status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]}).status_code == 401
+    assert client.get("/dashboard/user", headers=bearer(first)).status_code == 401
+
+    # The other device keeps both of its tokens
+    assert client.get("/dashboard/user", headers=bearer(second)).status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": second["refresh_token"]}).status_code == 200
+
+
+def test_logout_ignores_another_users_access_token(client):
+    mine, theirs = login(client, register(client)), login(client, register(client))
+    logout = client.post("/auth/logout", json={"refresh_token": mine["refresh_token"]}, headers=bearer(theirs))
+    assert logout.status_code == 200
+    assert client.get("/dashboard/user", headers=bearer(theirs)).status_code == 200
+
+
+def test_store_caps_sessions_and_prunes_expired(tmp_path):
+    store = RefreshTokenStore(str(tmp_path / "sessions.db"), max_sessions=2)
+    now = time.time()
+    for n in range(3):
+        store.issue("u1", f"t{n}", now + 60)
+    store.issue("u2", "expired", now - 1)
+    assert not store.is_valid("t0")
+    assert store.is_valid("t1") and store.is_valid("t2")
+    assert not store.is_valid("expired")
+    assert store.prune() == 1
+    assert store.rotate("t1", "u1", "t3", now + 60)
+    assert not store.rotate("t1", "u1", "t4", now + 60)
+    assert store.is_valid("t3") and not store.is_valid("t4")
@@ -0,0 +1,64 @@
+from backend.movies.similar import SimilarMovies, _features
+
+
+class Catalog:
+    """MovieCatalog stand-in: a list of movies and a version bumped on change"""
+
+    def __init__(self, movies):
+        self.movies = list(movies)
+        self.version = 1
+
+    def versioned(self):
+        return self.version, self.movies
+
+    def replace(self, movie):
+        self.movies = [m for m in self.movies if m["id"] != movie["id"]] + [movie]
+        self.version += 1
+
+
+def movie(movie_id, rating=7.0, genres=(), directors=(), stars=()):
+    meta = {"movieIMDbRating": rating, "movieGenres": list(genres), "directors": list(directors), "mainStars": list(stars)}
+    return {"id": movie_id, "metadata": meta}
+
+
+def test_similar_movies_share_features_best_first(client):
+    body = client.get("/movies/The Avengers/similar").json()
+    assert body["movie_id"] == "The Avengers"
+    ids = [s["movie"]["id"] for s in body["similar"]]
+    scores = [s["score"] for s in body["similar"]]
+    assert "The Avengers" not in ids
+    assert scores == sorted(scores, reverse=True)
+    assert ids[0] == "Avengers Endgame"  # same genres, stars and directing franchise
+
+    own = _features(client.get("/movies/The Avengers").json()["metadata"])
+    for entry in body["similar"]:
+        assert own.keys() & _features(entry["movie"]["metadata"]).keys()
+
+    assert len(client.get("/movies/The Avengers/similar", params={"limit": 2}).json()["similar"]) == 2
+
+
+def test_similar_validates_and_is_conditional(client):
+    assert client.get("/movies/No Such Movie/similar").status_code == 404
+    assert client.get("/movies/Joker/similar", params={"limit": 0}).status_code == 422
+    first = client.get("/movies/Joker/similar")
+    again = client.get("/movies/Joker/similar", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_neighbours_follow_catalog_changes():
+    catalog = Catalog(
+        [movie("a", directors=["Ann"], genres=["Drama"])]
+        + [movie(f"x{i}", genres=["Drama"]) for i in range(20)]
+        + [movie("b", directors=["Bo"], genres=["Comedy"])]
+    )
+    similar = SimilarMovies(catalog, k=3)
+    assert "b" not in dict(similar.neighbours("a"))
+
+    catalog.replace(movie("b", directors=["Ann"], genres=["Comedy"]))
+    top = similar.neighbours("a")
+    assert top[0][0] == "b"
+    assert similar.stats()["updates"] == 1 and similar.stats()["rebuilds"] == 1
+
+    catalog.replace(movie("b", rating=0.0, directors=["Ann"], genres=["Comedy"]))
+    assert similar.neighbours("a")[0][1] < top[0][1]  # the rating gap scales the score down
+    assert similar.neighbours("zzz") is None
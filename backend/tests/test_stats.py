@@ -0,0 +1,59 @@
+import statistics
+from collections import Counter
+
+from backend.movies.reviews import CSV_HEADER, ReviewStore, encode_row
+from backend.movies.stats import ReviewAggregate
+from backend.tests.auth import bearer, login, register
+from backend.tests.listing import every_review
+
+MOVIE = "Forrest Gump"
+
+
+def test_stats_match_the_reviews(client):
+    stats = client.get(f"/movies/{MOVIE}/stats").json()
+    reviews = every_review(client, MOVIE)
+    ratings = [r["rating"] for r in reviews if r["rating"] is not None]
+
+    assert stats["review_count"] == len(reviews)
+    assert stats["rated_count"] == len(ratings)
+    assert stats["mean_rating"] == round(sum(ratings) / len(ratings), 2)
+    assert stats["median_rating"] == statistics.median(round(r) for r in ratings)
+    assert stats["rating_histogram"] == dict(Counter(str(round(r)) for r in ratings))
+    assert sum(stats["rating_histogram"].values()) == stats["rated_count"]
+    assert stats["total_usefulness_votes"] == sum(r["usefulness_vote"] or 0 for r in reviews)
+    assert sum(stats["reviews_per_month"].values()) <= len(reviews)
+
+
+def test_stats_follow_new_reviews(client):
+    # No shipped reviews: the first post creates the CSV
+    movie = "The Dark Knight"
+    before = client.get(f"/movies/{movie}/stats").json()
+    headers = bearer(login(client, register(client)))
+    body = {"rating": 10, "review_title": "Stats", "review_text": "counted"}
+    assert client.post(f"/movies/{movie}/reviews", json=body, headers=headers).status_code == 200
+
+    after = client.get(f"/movies/{movie}/stats").json()
+    assert after["review_count"] == before["review_count"] + 1
+    assert after["rated_count"] == before["rated_count"] + 1
+    assert after["rating_histogram"]["10"] == before["rating_histogram"].get("10", 0) + 1
+
+
+def test_histogram_keeps_zero_ratings(tmp_path):
+    (tmp_path / "m").mkdir()
+    rows = [["1 May 2020", f"u{n}", "0", "0", rating, "t", "r"] for n, rating in enumerate(["0", "0", "7", ""])]
+    (tmp_path / "m" / "movieReviews.csv").write_bytes(encode_row(CSV_HEADER) + b"".join(map(encode_row, rows)))
+    aggregate = ReviewAggregate("m")
+    aggregate.catch_up(ReviewStore(tmp_path).get("m"))
+    stats = aggregate.to_dict()
+    assert stats["rating_histogram"] == {"0": 2, "7": 1}
+    assert stats["rated_count"] == 3 and stats["review_count"] == 4
+
+
+def test_movies_sort_by_review_aggregates(client):
+    movies = client.get("/movies/", params={"sort_by": "review_count", "order": "desc"}).json()["movies"]
+    counts = [client.get(f"/movies/{m['id']}/stats").json()["review_count"] for m in movies]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_stats_of_an_unknown_movie_is_404(client):
+    assert client.get("/movies/No Such Movie/stats").status_code == 404
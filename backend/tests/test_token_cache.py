@@ -0,0 +1,59 @@
+import time
+
+from backend.authentication import schemas
+from backend.authentication.token_cache import VerifiedTokenCache
+from backend.authentication.token_store import AccessRevocations
+
+
+def data(user_id):
+    return schemas.TokenData(user_id=user_id, role="user")
+
+
+def test_hits_until_the_token_expires():
+    cache = VerifiedTokenCache()
+    cache.put("live", data("u1"), time.time() + 60, "j1")
+    cache.put("stale", data("u1"), time.time() - 1, "j2")
+    user, jti = cache.get("live")
+    assert user.user_id == "u1" and jti == "j1"
+    assert cache.get("stale") is None
+    assert cache.get("unknown") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = VerifiedTokenCache(max_entries=2)
+    exp = time.time() + 60
+    cache.put("a", data("u1"), exp, None)
+    cache.put("b", data("u2"), exp, None)
+    cache.get("a")
+    cache.put("c", data("u3"), exp, None)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_revoked_jtis_reach_every_process_until_they_expire(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    here, elsewhere = AccessRevocations(path), AccessRevocations(path)
+    assert not elsewhere.is_revoked("j1")
+
+    here.revoke("j1", time.time() + 60)
+    here.revoke("gone", time.time() - 1)  # already expired: nothing to deny
+    assert elsewhere.is_revoked("j1")
+    assert not elsewhere.is_revoked("j2") and not elsewhere.is_revoked("gone")
+    assert not elsewhere.is_revoked(None)  # tokens without a jti can't be listed
+
+    here.revoke("short", time.time() + 0.2)
+    time.sleep(0.3)
+    here.revoke("j3", time.time() + 60)  # every write drops expired rows
+    later = AccessRevocations(path)
+    assert not later.is_revoked("short")
+    assert later.stats()["tokens"] == 2
+
+
+def test_discard_forgets_one_token():
+    cache = VerifiedTokenCache()
+    exp = time.time() + 60
+    cache.put("a1", data("a"), exp, None)
+    cache.put("a2", data("a"), exp, None)
+    cache.discard("a1")
+    assert cache.get("a1") is None and cache.get("a2") is not None
@@ -0,0 +1,50 @@
+import pytest
+
+from backend.tests.listing import every_review
+
+MOVIE = "Forrest Gump"
+
+
+def helpfulness(review):
+    useful, total = review["usefulness_vote"], review["total_votes"]
+    return useful / total if useful is not None and total else None
+
+
+KEYS = {
+    "helpfulness": helpfulness,
+    "usefulness": lambda r: r["usefulness_vote"],
+    "rating": lambda r: r["rating"],
+}
+
+
+@pytest.fixture(scope="module")
+def reviews(client):
+    return every_review(client, MOVIE)
+
+
+@pytest.mark.parametrize("by", list(KEYS))
+@pytest.mark.parametrize("order", ["desc", "asc"])
+def test_top_matches_a_full_sort(client, reviews, by, order):
+    key = KEYS[by]
+    response = client.get(f"/movies/{MOVIE}/reviews/top", params={"by": by, "order": order, "n": 15})
+    assert response.status_code == 200
+    top = response.json()["reviews"]
+
+    values = sorted((key(r) for r in reviews if key(r) is not None), reverse=order == "desc")
+    assert len(top) == 15
+    assert [key(r) for r in top] == values[:15]
+    assert response.json()["next_cursor"] is None
+
+
+def test_top_applies_the_review_filters(client, reviews):
+    params = {"by": "helpfulness", "n": 100, "max_rating": 3}
+    top = client.get(f"/movies/{MOVIE}/reviews/top", params=params).json()["reviews"]
+    expected = [r for r in reviews if r["rating"] is not None and r["rating"] <= 3 and helpfulness(r) is not None]
+    assert top and all(r["rating"] <= 3 for r in top)
+    assert [helpfulness(r) for r in top] == sorted(map(helpfulness, expected), reverse=True)[:100]
+
+
+def test_top_limits_and_unknown_movie(client):
+    assert client.get(f"/movies/{MOVIE}/reviews/top", params={"n": 0}).status_code == 422
+    assert client.get(f"/movies/{MOVIE}/reviews/top", params={"n": 101}).status_code == 422
+    assert client.get("/movies/No Such Movie/reviews/top").status_code == 404
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from backend.authentication.repository import (
+    JsonUserRepository, SqliteUserRepository, UserExistsError, migrate_json_to_sqlite,
+)
+
+
+def user(n, **fields):
+    return {
+        "user_id": f"id-{n}", "username": f"user{n}", "email": f"user{n}@example.com",
+        "hashed_password": "x", "role": "user", "penalties": [], **fields,
+    }
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def repo(request, tmp_path):
+    if request.param == "json":
+        return JsonUserRepository(str(tmp_path / "users.json"))
+    return SqliteUserRepository(str(tmp_path / "users.db"))
+
+
+def test_lookups_by_every_key(repo):
+    repo.create(user(1))
+    repo.create(user(2, role="admin"))
+    assert repo.get_by_id("id-2")["username"] == "user2"
+    assert repo.get_by_username("user1")["user_id"] == "id-1"
+    assert repo.get_by_email("user2@example.com")["role"] == "admin"
+    assert repo.get_by_username("nobody") is None
+    assert repo.count() == 2
+    assert sorted(u["user_id"] for u in repo.all()) == ["id-1", "id-2"]
+
+
+def test_duplicate_username_or_email_is_rejected(repo):
+    repo.create(user(1))
+    with pytest.raises(UserExistsError):
+        repo.create(user(2, username="user1"))
+    with pytest.raises(UserExistsError):
+        repo.create(user(3, email="user1@example.com"))
+    assert repo.count() == 1
+
+
+def test_update_keeps_extra_fields(repo):
+    repo.create(user(1))
+    updated = repo.update("id-1", role="admin", penalties=[{"reason": "spam"}])
+    assert updated["role"] == "admin"
+    stored = repo.get_by_id("id-1")
+    assert stored["role"] == "admin" and stored["penalties"] == [{"reason": "spam"}]
+    assert repo.update("missing", role="admin") is None
+
+
+def test_json_store_reloads_after_an_outside_write(tmp_path):
+    path = tmp_path / "users.json"
+    repo = JsonUserRepository(str(path))
+    repo.create(user(1))
+    # Another process rewrites the file (different size, so a different stamp)
+    path.write_text(json.dumps([user(1), user(22)]))
+    assert repo.get_by_username("user22")["user_id"] == "id-22"
+
+
+def test_migration_copies_users_once(tmp_path):
+    (tmp_path / "users.json").write_text(json.dumps([user(1), user(2)]))
+    db = str(tmp_path / "users.db")
+    assert migrate_json_to_sqlite(str(tmp_path / "users.json"), db) == 2
+    assert migrate_json_to_sqlite(str(tmp_path / "users.json"), db) == 0
+    assert SqliteUserRepository(db).get_by_email("user2@example.com")["user_id"] == "id-2"
@@ -0,0 +1,62 @@
+import threading
+
+from backend.movies.reviews import CSV_HEADER, ReviewColumns, ReviewStore, encode_row
+from backend.movies.writer import ReviewWriter
+from backend.tests.auth import bearer, login, register
+from backend.tests.listing import every_review
+
+
+def store_with_movie(tmp_path):
+    (tmp_path / "m").mkdir()
+    (tmp_path / "m" / "movieReviews.csv").write_bytes(encode_row(CSV_HEADER))
+    return ReviewStore(tmp_path)
+
+
+def review(n):
+    return {"user": f"user{n}", "rating": n % 10, "title": f"t{n}", "review": f"r{n}"}
+
+
+def test_concurrent_submits_share_commits(tmp_path):
+    store = store_with_movie(tmp_path)
+    writer = ReviewWriter(store, window_ms=20, fsync=False)
+    futures = []
+    threads = [threading.Thread(target=lambda n=n: futures.append(writer.submit("m", review(n)))) for n in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    acknowledged = sorted(f.result(timeout=5)["user"] for f in futures)
+    writer.stop()
+
+    assert acknowledged == sorted(f"user{n}" for n in range(50))
+    assert writer.commits < 50
+    on_disk = ReviewColumns.load("m", store.path("m"))
+    assert sorted(on_disk.users) == sorted(f"user{n}" for n in range(50))
+
+
+def test_a_cancelled_waiter_is_dropped_and_the_writer_keeps_going(tmp_path):
+    store = store_with_movie(tmp_path)
+    writer = ReviewWriter(store, window_ms=200, fsync=False)
+    gone = writer.submit("m", review(1))
+    assert gone.cancel()
+    kept = writer.submit("m", review(2))
+    assert kept.result(timeout=5)["user"] == "user2"
+    assert writer.submit("m", review(3)).result(timeout=5)["user"] == "user3"
+    writer.stop()
+
+    assert writer.cancelled == 1
+    assert ReviewColumns.load("m", store.path("m")).users == ["user2", "user3"]
+
+
+def test_posted_reviews_are_listed_once_acknowledged(client):
+    headers = bearer(login(client, register(client)))
+    body = {"rating": 8, "review_title": "Posted", "review_text": "line one\nline two"}
+
+    assert client.post("/movies/No Such Movie/reviews", json=body, headers=headers).status_code == 404
+    assert client.post("/movies/Joker/reviews", json={"rating": 8}, headers=headers).status_code == 400
+    assert client.post("/movies/Joker/reviews", json=body).status_code in (401, 403)
+    posted = client.post("/movies/Joker/reviews", json=body, headers=headers)
+    assert posted.status_code == 200, posted.text
+
+    listed = every_review(client, "Joker")
+    assert listed[-1]["title"] == "Posted" and listed[-1]["review"] == "line one\nline two"